@@ -0,0 +1,4 @@
+"""
+Benchmarks for sortdx: synthetic datasets (benchmarks.datasets) and a
+runner tracking regressions against a baseline (benchmarks.run).
+"""
@@ -0,0 +1,206 @@
+"""
+Deterministic synthetic datasets for the sortdx benchmarks.
+
+A DatasetSpec names a dataset completely: generating the same spec twice
+gives byte-identical files, so results of different runs and machines
+compare like with like.
+
+Every record has an 'id', a 'key' column of the spec's key type and a
+random 'payload' padding it to about row_size bytes. Plain text datasets
+hold the key alone on each line (with the payload after it for string
+keys, which still sort as a whole line).
+"""
+
+import csv
+import gzip
+import io
+import json
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Union
+
+from sortdx.utils import parse_memory_size
+
+# Handle optional zstandard dependency
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+FORMATS = ("csv", "tsv", "jsonl", "txt")
+KEY_TYPES = ("num", "date", "nat", "str", "locale")
+COMPRESSIONS = ("none", "gz", "zst")
+
+# Letters of 'str' and 'locale' keys, in code point order
+_ALPHABET = "abcdefghijklmnopqrstuvwxyzàéöü"
+_PAYLOAD_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789"
+_EPOCH = datetime(2000, 1, 1)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    Description of a synthetic dataset.
+
+    Attributes:
+        file_format: 'csv', 'tsv', 'jsonl' or 'txt'
+        key_type: 'num', 'date', 'nat', 'str' or 'locale' (accented strings
+            sorted with locale collation)
+        size: Uncompressed size (e.g. '10M', '10G')
+        cardinality: Distinct key values (0 = about one per record)
+        presorted: Fraction of records already in key order (0 = random,
+            1 = sorted)
+        compression: 'none', 'gz' or 'zst'
+        row_size: Approximate bytes per record
+        seed: Random seed
+    """
+
+    file_format: str = "jsonl"
+    key_type: str = "num"
+    size: str = "10M"
+    cardinality: int = 0
+    presorted: float = 0.0
+    compression: str = "none"
+    row_size: int = 100
+    seed: int = 42
+
+    def __post_init__(self):
+        if self.file_format not in FORMATS:
+            raise ValueError(f"Unknown format: {self.file_format}")
+        if self.key_type not in KEY_TYPES:
+            raise ValueError(f"Unknown key type: {self.key_type}")
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {self.compression}")
+        if not 0.0 <= self.presorted <= 1.0:
+            raise ValueError(f"presorted must be within [0, 1]: {self.presorted}")
+
+    @property
+    def name(self) -> str:
+        """File name identifying the dataset."""
+        cardinality = f"c{self.cardinality}" if self.cardinality else "unique"
+        name = (
+            f"{self.key_type}-{self.size}-{cardinality}-p{self.presorted:g}"
+            f"-r{self.row_size}-s{self.seed}.{self.file_format}"
+        )
+        if self.compression != "none":
+            name += f".{self.compression}"
+        return name
+
+    @property
+    def key_spec(self) -> str:
+        """Key specification sorting the dataset (as given to the CLI)."""
+        column = "line" if self.file_format == "txt" else "key"
+        if self.key_type == "locale":
+            return f"{column}:str:locale=C.UTF-8"
+        return f"{column}:{self.key_type}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the spec as JSON-serializable data."""
+        return asdict(self)
+
+
+def _key_value(key_type: str, bucket: int) -> Any:
+    """Get the key value of a bucket; values increase with the bucket."""
+    if key_type == "num":
+        return round(bucket * 1.25, 2)
+    if key_type == "date":
+        return (_EPOCH + timedelta(seconds=bucket * 37)).isoformat()
+    if key_type == "nat":
+        return f"file{bucket}.txt"
+    alphabet = _ALPHABET if key_type == "locale" else _ALPHABET[:26]
+    letters = []
+    for _ in range(6):
+        bucket, digit = divmod(bucket, len(alphabet))
+        letters.append(alphabet[digit])
+    return "".join(reversed(letters))
+
+
+def _format_row(file_format: str, key_type: str, row: Dict[str, Any]) -> str:
+    if file_format == "jsonl":
+        return json.dumps(row, ensure_ascii=False) + "\n"
+    if file_format == "txt":
+        if key_type in ("num", "date"):
+            return f"{row['key']}\n"
+        return f"{row['key']} {row['payload']}\n"
+    buffer = io.StringIO()
+    delimiter = "\t" if file_format == "tsv" else ","
+    csv.writer(buffer, delimiter=delimiter, lineterminator="\n").writerow(row.values())
+    return buffer.getvalue()
+
+
+def iter_rows(spec: DatasetSpec) -> Iterator[str]:
+    """
+    Generate the formatted rows of a dataset (without a CSV header).
+
+    Record i gets the key of position i / expected_records with probability
+    presorted and a random position otherwise, so presorted=1 gives keys in
+    order and presorted=0 a random permutation of the key distribution.
+    """
+    rng = random.Random(spec.seed)
+    target = parse_memory_size(spec.size)
+    records = max(1, target // spec.row_size)
+    cardinality = spec.cardinality or records
+    padding = max(0, spec.row_size - 40)
+
+    written = 0
+    index = 0
+    while written < target:
+        position = index if rng.random() < spec.presorted else rng.randrange(records)
+        bucket = min(position, records - 1) * cardinality // records
+        payload = "".join(rng.choices(_PAYLOAD_CHARS, k=padding))
+        row = {
+            "id": index,
+            "key": _key_value(spec.key_type, bucket),
+            "payload": payload,
+        }
+        line = _format_row(spec.file_format, spec.key_type, row)
+        written += len(line.encode("utf-8"))
+        index += 1
+        yield line
+
+
+def _opener(compression: str) -> Callable[..., Any]:
+    if compression == "gz":
+        # mtime=0 keeps the gzip header, and so the file, deterministic
+        return lambda path: gzip.GzipFile(path, "wb", compresslevel=6, mtime=0)
+    if compression == "zst":
+        if zstd is None:
+            raise ImportError(
+                "zstandard not installed. Install with: pip install zstandard"
+            )
+        return lambda path: zstd.open(path, "wb", cctx=zstd.ZstdCompressor(level=3))
+    return lambda path: open(path, "wb")
+
+
+def generate(spec: DatasetSpec, directory: Union[str, Path]) -> Path:
+    """
+    Write a dataset into a directory, unless it is already there.
+
+    Args:
+        spec: Dataset to generate
+        directory: Directory of generated datasets
+
+    Returns:
+        Path of the dataset file
+    """
+    path = Path(directory) / spec.name
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    partial = path.with_name(path.name + ".partial")
+    with _opener(spec.compression)(partial) as output:
+        if spec.file_format in ("csv", "tsv"):
+            delimiter = "\t" if spec.file_format == "tsv" else ","
+            output.write(f"id{delimiter}key{delimiter}payload\n".encode("utf-8"))
+        batch = []
+        for line in iter_rows(spec):
+            batch.append(line)
+            if len(batch) == 10_000:
+                output.write("".join(batch).encode("utf-8"))
+                batch = []
+        output.write("".join(batch).encode("utf-8"))
+    partial.replace(path)
+    return path
@@ -0,0 +1,278 @@
+"""
+Run the sortdx benchmarks and compare them with a baseline.
+
+Each case sorts one generated dataset with one target in a fresh process,
+so peak RSS belongs to that case alone:
+
+    sort_iter   parse the records into a list and sort them with sort_iter
+    memory      sort_file(mode='memory')
+    external    sort_file(mode='external') with a memory limit of an eighth
+                of the dataset, so it spills several runs
+    cli         the sortdx command in a subprocess
+
+Usage (from the repository root):
+
+    python -m benchmarks.run --suite quick --output results.json
+    python -m benchmarks.run --suite quick --save-baseline
+    python -m benchmarks.run --suite full --baseline benchmarks/baseline.json \\
+        --threshold 0.15
+
+Results hold throughput (MB/s and records/s of uncompressed input), peak
+RSS and temporary bytes. With a baseline, a case regresses when its
+throughput drops, or its peak RSS or temporary bytes grow, by more than the
+threshold; the run then exits with status 1.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import sortdx
+from sortdx import sort_file, sort_iter
+from sortdx.parsers import parse_file
+from sortdx.utils import parse_key_spec, parse_memory_size, peak_rss
+
+from .datasets import COMPRESSIONS, FORMATS, DatasetSpec, generate
+
+TARGETS = ("sort_iter", "memory", "external", "cli")
+DEFAULT_THRESHOLD = 0.10
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DATA_DIR = Path(__file__).parent / "data"
+
+# Metrics compared with the baseline: name -> True when higher is better
+METRICS = {
+    "mb_per_s": True,
+    "records_per_s": True,
+    "peak_rss": False,
+    "temp_bytes": False,
+}
+
+
+def quick_suite() -> List[DatasetSpec]:
+    """A few 10 MB datasets covering every key type and format."""
+    return [
+        DatasetSpec("jsonl", "num"),
+        DatasetSpec("csv", "date", cardinality=1000),
+        DatasetSpec("tsv", "nat", presorted=0.9),
+        DatasetSpec("txt", "str"),
+        DatasetSpec("jsonl", "locale", compression="gz"),
+    ]
+
+
+def full_suite() -> List[DatasetSpec]:
+    """Key types, cardinalities, presortedness, compressions and sizes."""
+    specs = []
+    for key_type in ("num", "date", "nat", "str", "locale"):
+        for cardinality in (0, 100):
+            for presorted in (0.0, 0.9, 1.0):
+                specs.append(
+                    DatasetSpec("jsonl", key_type, "100M", cardinality, presorted)
+                )
+    for file_format in FORMATS:
+        for compression in COMPRESSIONS:
+            specs.append(
+                DatasetSpec(file_format, "num", "100M", compression=compression)
+            )
+    for size in ("10M", "1G", "10G"):
+        specs.append(DatasetSpec("csv", "num", size))
+    return specs
+
+
+SUITES = {"quick": quick_suite, "full": full_suite}
+
+
+def _case_name(spec: DatasetSpec, target: str) -> str:
+    return f"{spec.name}/{target}"
+
+
+def _sort_iter_case(path: Path, spec: DatasetSpec) -> Dict[str, Any]:
+    keys = [parse_key_spec(spec.key_spec)]
+    with parse_file(path) as reader:
+        records = list(reader)
+    count = sum(1 for _ in sort_iter(records, keys))
+    return {"records": count, "temp_bytes": 0}
+
+
+def _sort_file_case(
+    path: Path, spec: DatasetSpec, target: str, output: Path
+) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"mode": target}
+    if target == "external":
+        options["memory_limit"] = str(max(1, parse_memory_size(spec.size) // 8))
+    stats = sort_file(
+        path, output, [parse_key_spec(spec.key_spec)], stats=True, **options
+    )
+    return {"records": stats.lines_processed, "temp_bytes": stats.temp_bytes}
+
+
+def _cli_case(path: Path, spec: DatasetSpec, output: Path) -> Dict[str, Any]:
+    stats_path = output.with_name("stats.json")
+    command = [sys.executable, "-m", "sortdx.cli", "main", str(path)]
+    command += ["-o", str(output), "-k", spec.key_spec]
+    command += ["--stats-json", str(stats_path)]
+    subprocess.run(command, check=True, capture_output=True)
+    stats = json.loads(stats_path.read_text())
+    return {
+        "records": stats["lines_processed"],
+        "temp_bytes": stats["temp_bytes"],
+        "peak_rss": stats["peak_rss"],
+    }
+
+
+def run_case(path: Path, spec: DatasetSpec, target: str) -> Dict[str, Any]:
+    """
+    Run one benchmark case in this process.
+
+    Returns:
+        Case result with seconds, records, throughput, peak RSS and
+        temporary bytes
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output = Path(temp_dir) / f"sorted.{spec.file_format}"
+        start = time.perf_counter()
+        if target == "sort_iter":
+            result = _sort_iter_case(path, spec)
+        elif target == "cli":
+            result = _cli_case(path, spec, output)
+        else:
+            result = _sort_file_case(path, spec, target, output)
+        seconds = time.perf_counter() - start
+
+    size = parse_memory_size(spec.size)
+    result.setdefault("peak_rss", peak_rss())
+    result.update(
+        name=_case_name(spec, target),
+        dataset=spec.to_dict(),
+        target=target,
+        seconds=round(seconds, 4),
+        mb_per_s=round(size / seconds / 1024**2, 3),
+        records_per_s=round(result["records"] / seconds, 1),
+    )
+    return result
+
+
+def run_suite(
+    specs: List[DatasetSpec],
+    targets: List[str],
+    data_dir: Path = DATA_DIR,
+    log=print,
+) -> Dict[str, Any]:
+    """
+    Generate the datasets and run every target on each, one process per case.
+
+    Returns:
+        Results with the sortdx version and platform
+    """
+    results = []
+    context = get_context("spawn")
+    for spec in specs:
+        path = generate(spec, data_dir)
+        for target in targets:
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                result = pool.submit(run_case, path, spec, target).result()
+            log(
+                f"{result['name']}: {result['seconds']:.2f}s, "
+                f"{result['mb_per_s']:.1f} MB/s, "
+                f"{result['records_per_s']:,.0f} records/s"
+            )
+            results.append(result)
+    return {
+        "sortdx_version": sortdx.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Args:
+        results: Output of run_suite()
+        baseline: Earlier output of run_suite()
+        threshold: Allowed relative change in the worse direction
+
+    Returns:
+        One message per regressed metric (cases missing from the baseline
+        are skipped)
+    """
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(
+                    f"{result['name']}: {metric} {old:,} -> {new:,} ({change:+.1%})"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the sortdx benchmarks.")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument(
+        "--target",
+        action="append",
+        choices=TARGETS,
+        help="Target to run (repeatable, default: all)",
+    )
+    parser.add_argument(
+        "--filter", default="", help="Only run datasets whose name contains this"
+    )
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, help="Write results to this file")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Write the results as the new baseline instead of comparing",
+    )
+    args = parser.parse_args(argv)
+
+    specs = [spec for spec in SUITES[args.suite]() if args.filter in spec.name]
+    results = run_suite(specs, args.target or list(TARGETS), args.data_dir)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline")
+        return 0
+
+    regressions = compare(
+        results, json.loads(args.baseline.read_text()), args.threshold
+    )
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,7 +14,8 @@ Example usage:
     [{"name": "Alice", "age": 25}, {"name": "Bob", "age": 30}]
 """
 
-from .core import key, sort_file, sort_iter
+from .core import key, merge_files, resume_sort, sort_file, sort_iter, update_file
+from .search import query
 from .utils import SortKey, SortStats
 
 __version__ = "0.1.1"
@@ -23,8 +24,12 @@ __email__ = "dev@sortdx.io"
 
 __all__ = [
     "key",
+    "merge_files",
+    "query",
+    "resume_sort",
     "sort_file",
     "sort_iter",
+    "update_file",
     "SortKey",
     "SortStats",
 ]
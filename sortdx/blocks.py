@@ -0,0 +1,269 @@
+"""
+Block-compressed outputs and key indexes for sortdx.
+
+A sorted output can be written as a sequence of independently compressed
+blocks cut on record boundaries: concatenated gzip members (like BGZF) or
+zstd frames, so any gzip/zstd tool still reads the whole file. A small JSON
+key index (.sdxidx) next to the output records each block's byte offsets
+and the sort key of its first record, so readers can seek straight to the
+blocks that can hold a key range instead of reading from the start.
+Uncompressed outputs are indexed the same way, with blocks stored as is.
+"""
+
+import bisect
+import gzip
+import json
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from .parsers import compression_level, output_codec
+
+try:
+    import zstandard as zstd
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+BLOCK_INDEX_SUFFIX = ".sdxidx"
+BLOCK_INDEX_VERSION = 1
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+# Uncompressed outputs need no large blocks to compress well, so their key
+# index gets an entry every INDEX_INTERVAL bytes
+INDEX_INTERVAL = 64 * 1024
+# Formats whose quoted fields may hold newlines (see _record_end)
+QUOTED_FORMATS = ("csv", "tsv")
+
+
+def block_index_path(file_path: Union[str, Path]) -> Path:
+    """Get the path of the block index written next to an output file."""
+    return Path(str(file_path) + BLOCK_INDEX_SUFFIX)
+
+
+def default_block_size(file_path: Union[str, Path]) -> int:
+    """Get the block size used to index an output (see sort_file index)."""
+    if output_codec(file_path) == "none":
+        return INDEX_INTERVAL
+    return DEFAULT_BLOCK_SIZE
+
+
+def _record_end(
+    data: Union[bytes, bytearray], start: int, quoted: bool, min_length: int = 1
+) -> int:
+    """
+    Find the newline ending a record that starts at data[start] (or -1).
+
+    Records after the first are skipped until min_length bytes are covered.
+    With quoted, newlines inside double quotes (multi-line CSV fields) do
+    not end records: quotes within fields are doubled, so a newline is
+    outside fields when an even number of quotes precedes it.
+    """
+    end = data.find(b"\n", start + min_length - 1)
+    if quoted:
+        quotes = data.count(b'"', start, end)
+        while end != -1 and quotes % 2:
+            previous, end = end, data.find(b"\n", end + 1)
+            quotes += data.count(b'"', previous, end)
+    return end
+
+
+def _split_records(data: bytes, quoted: bool) -> Iterator[bytes]:
+    """Split whole records (see _record_end) into single records."""
+    if not quoted or b'"' not in data:
+        yield from data.splitlines(keepends=True)
+        return
+    start = 0
+    while start < len(data):
+        end = _record_end(data, start, quoted)
+        stop = len(data) if end == -1 else end + 1
+        yield data[start:stop]
+        start = stop
+
+
+class BlockWriter:
+    """
+    Binary sink that writes a stream as independently compressed blocks.
+
+    Data is buffered until a block of at least block_size bytes ends on a
+    record boundary, which is then compressed on its own. Records are
+    lines, except that CSV/TSV outputs (metadata format) may have quoted
+    fields spanning lines. The index entry of each block stores the
+    first_key of its first record (the previous block's key if it cannot be
+    computed; the first block always has the empty key). first_key sees the
+    first record of every block in order, starting with the first record of
+    the file.
+
+    Args:
+        file_path: Output file path
+        codec: 'gzip', 'zstd' or 'none'
+        level: Compression level
+        block_size: Uncompressed block size in bytes
+        first_key: Sort key of a line, as bytes
+        metadata: Extra fields stored in the block index (format: output
+            format)
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        codec: str = "gzip",
+        level: Optional[int] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        first_key: Optional[Callable[[bytes], bytes]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.file_path = Path(file_path)
+        self.codec = codec
+        self.level = compression_level(codec, level)
+        self.block_size = max(1, block_size)
+        self.first_key = first_key
+        self.metadata = metadata or {}
+        self.blocks: List[Dict[str, Any]] = []
+        self._buffer = bytearray()
+        self._offset = 0
+        self._start = 0
+        self._quoted = self.metadata.get("format") in QUOTED_FORMATS
+        self._file = open(self.file_path, "wb")
+
+        self._compress: Callable[[bytes], bytes]
+        if codec == "zstd":
+            self._compress = zstd.ZstdCompressor(level=self.level).compress
+        elif codec == "gzip":
+            self._compress = self._gzip_member
+        else:
+            self._compress = bytes
+
+    def _gzip_member(self, block: bytes) -> bytes:
+        return gzip.compress(block, compresslevel=self.level, mtime=0)
+
+    def write(self, data) -> int:
+        buffer = self._buffer
+        buffer += data
+        while len(buffer) >= self.block_size:
+            end = _record_end(buffer, 0, self._quoted, self.block_size)
+            if end == -1:
+                break
+            self._emit(bytes(buffer[: end + 1]))
+            del buffer[: end + 1]
+        return len(data)
+
+    def _block_key(self, block: bytes) -> str:
+        previous = self.blocks[-1]["key"] if self.blocks else ""
+        if self.first_key is None:
+            return previous
+        try:
+            # Called for the first block too, so keys can read a CSV header
+            end = _record_end(block, 0, self._quoted)
+            key = self.first_key(block[: end + 1]).hex()
+        except Exception:
+            # Any lower bound works: the previous block's first key does
+            return previous
+        return key if self.blocks else ""
+
+    def _emit(self, block: bytes) -> None:
+        compressed = self._compress(block)
+        self.blocks.append(
+            {
+                "key": self._block_key(block),
+                "offset": self._offset,
+                "length": len(compressed),
+                "start": self._start,
+                "size": len(block),
+            }
+        )
+        self._file.write(compressed)
+        self._offset += len(compressed)
+        self._start += len(block)
+
+    def close(self) -> None:
+        """Write the last block, then the block index."""
+        if self._file.closed:
+            return
+        if self._buffer:
+            self._emit(bytes(self._buffer))
+            self._buffer.clear()
+        self._file.close()
+
+        index = {
+            "version": BLOCK_INDEX_VERSION,
+            "codec": self.codec,
+            "block_size": self.block_size,
+            **self.metadata,
+            "blocks": self.blocks,
+        }
+        with open(block_index_path(self.file_path), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+
+
+class BlockIndex:
+    """
+    Random access to a block-compressed output through its block index.
+
+    Args:
+        file_path: Block-compressed output file
+        index: Parsed block index (default: loaded from the sidecar file)
+
+    Example:
+        >>> index = BlockIndex("sorted.jsonl.gz")
+        >>> for line in index.iter_lines(start_key):
+        ...     ...
+    """
+
+    def __init__(
+        self, file_path: Union[str, Path], index: Optional[Dict[str, Any]] = None
+    ):
+        self.file_path = Path(file_path)
+        if index is None:
+            with open(block_index_path(self.file_path), encoding="utf-8") as f:
+                index = json.load(f)
+        if index.get("version") != BLOCK_INDEX_VERSION:
+            raise ValueError(f"Unsupported block index version: {index.get('version')}")
+        self.index = index
+        self.codec = index["codec"]
+        self.blocks = index["blocks"]
+        self._quoted = index.get("format") in QUOTED_FORMATS
+        self._keys = [bytes.fromhex(block["key"]) for block in self.blocks]
+
+    @classmethod
+    def exists(cls, file_path: Union[str, Path]) -> bool:
+        """Check whether an output has a block index."""
+        return block_index_path(file_path).exists()
+
+    def find(self, key: bytes) -> int:
+        """Get the number of the first block that can hold key."""
+        # Lines equal to a block's first key may also end the block before
+        return max(0, bisect.bisect_left(self._keys, key) - 1)
+
+    def read_block(self, number: int) -> bytes:
+        """Read and decompress one block."""
+        block = self.blocks[number]
+        with open(self.file_path, "rb") as f:
+            f.seek(block["offset"])
+            data = f.read(block["length"])
+        return self._decompress(data)
+
+    def _decompress(self, data: bytes) -> bytes:
+        if self.codec == "gzip":
+            return zlib.decompress(data, wbits=31)
+        if self.codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise ImportError(
+                    "zstandard not installed. Install with: pip install zstandard"
+                )
+            return zstd.ZstdDecompressor().decompress(data)
+        return data
+
+    def iter_lines(self, start_key: bytes = b"") -> Iterator[bytes]:
+        """
+        Yield output records from the first block that can hold start_key.
+
+        Records are lines, or for CSV/TSV outputs possibly several lines
+        (quoted fields with newlines). Records before start_key in that
+        block are included; callers filter them (and stop) by key.
+        """
+        with open(self.file_path, "rb") as f:
+            for block in self.blocks[self.find(start_key) :]:
+                f.seek(block["offset"])
+                data = self._decompress(f.read(block["length"]))
+                yield from _split_records(data, self._quoted)
@@ -0,0 +1,214 @@
+"""
+Result cache for repeated sorts of unchanged inputs.
+
+With a cache directory, sort_file() looks its job up by a digest of the
+input fingerprints (path, size, mtime and optionally a content hash), the
+normalized sort keys and every option that changes the output. On a hit the
+cached output files are hardlinked (or copied across file systems) into
+place instead of sorting again; on a miss the fresh output is added to the
+cache, and the least recently used entries are evicted to keep the cache
+under its size limit.
+
+Hardlinked outputs share their data with the cache, so an output rewritten
+in place invalidates its entry: every entry records the size and mtime of
+its files and is dropped when they no longer match.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_SIZE = 4 * 1024 * 1024 * 1024
+ENTRY_MANIFEST = "entry.json"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def input_fingerprint(
+    file_path: Union[str, Path], content_hash: bool = False
+) -> List[Any]:
+    """
+    Fingerprint an input file for cache lookups.
+
+    Args:
+        file_path: Input file
+        content_hash: Also hash the file content (BLAKE2b), so a rewrite
+            that keeps size and mtime is detected
+
+    Returns:
+        [resolved path, size, mtime in ns, content digest or None]
+    """
+    path = Path(file_path)
+    stat = path.stat()
+    digest = None
+    if content_hash:
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+    return [str(path.resolve()), stat.st_size, stat.st_mtime_ns, digest]
+
+
+def _place(source: Path, target: Path) -> None:
+    """Hardlink source to target, or copy it if linking is not possible."""
+    if target.exists() or target.is_symlink():
+        target.unlink()
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of sort outputs.
+
+    Each entry is a directory named after the job digest holding the output
+    files by position ('0', '1', ...) and a manifest with their sizes and
+    the statistics of the sort that produced them.
+
+    Args:
+        cache_dir: Cache directory (created if missing)
+        max_size: Total size of cached files in bytes before entries are
+            evicted
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], max_size: Optional[int] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = DEFAULT_CACHE_SIZE if max_size is None else max_size
+
+    @staticmethod
+    def digest(job: Dict[str, Any]) -> str:
+        """Get the cache key of a JSON-serializable job description."""
+        from . import __version__
+
+        payload = json.dumps(
+            {"version": CACHE_VERSION, "sortdx": __version__, "job": job},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load(self, entry: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(entry / ENTRY_MANIFEST, encoding="utf-8") as f:
+                manifest: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest
+
+    def _valid(self, entry: Path, manifest: Dict[str, Any]) -> bool:
+        for name, (size, mtime_ns) in manifest["files"].items():
+            try:
+                stat = (entry / name).stat()
+            except OSError:
+                return False
+            if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                return False
+        return True
+
+    def fetch(self, key: str, targets: List[Path]) -> Optional[Dict[str, Any]]:
+        """
+        Place the cached output files of a job.
+
+        Targets the entry does not hold (e.g. an index that was not
+        written) are removed, so no file of an earlier job is left.
+
+        Args:
+            key: Job digest
+            targets: Output file paths, in the order they were stored
+
+        Returns:
+            The statistics stored with the entry on a hit, None on a miss
+        """
+        entry = self.cache_dir / key
+        manifest = self._load(entry)
+        if manifest is None:
+            return None
+        if not self._valid(entry, manifest):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        for i, target in enumerate(targets):
+            if str(i) in manifest["files"]:
+                _place(entry / str(i), target)
+            elif target.exists():
+                target.unlink()
+        # Entry directories are ordered by mtime for eviction
+        os.utime(entry)
+        stats: Dict[str, Any] = manifest["stats"]
+        return stats
+
+    def store(self, key: str, targets: List[Path], stats: Dict[str, Any]) -> None:
+        """
+        Add the output files of a job to the cache.
+
+        Targets that do not exist (e.g. an index that was not written) are
+        skipped. Outputs larger than the whole cache are not stored.
+        """
+        files = {str(i): path for i, path in enumerate(targets) if path.exists()}
+        if sum(path.stat().st_size for path in files.values()) > self.max_size:
+            return
+
+        staging = Path(tempfile.mkdtemp(prefix=".store-", dir=self.cache_dir))
+        try:
+            sizes = {}
+            for name, path in files.items():
+                _place(path, staging / name)
+                stat = (staging / name).stat()
+                sizes[name] = [stat.st_size, stat.st_mtime_ns]
+            with open(staging / ENTRY_MANIFEST, "w", encoding="utf-8") as f:
+                json.dump({"files": sizes, "stats": stats}, f)
+
+            entry = self.cache_dir / key
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(staging, entry)
+            except OSError:
+                # Stored concurrently by another job
+                pass
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict(keep=key)
+
+    def entries(self) -> List[Path]:
+        """Get the entry directories, least recently used first."""
+        entries = [
+            path
+            for path in self.cache_dir.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        ]
+        return sorted(entries, key=lambda path: path.stat().st_mtime)
+
+    def size(self) -> int:
+        """Get the total size of the cached files in bytes."""
+        return sum(self._entry_size(entry) for entry in self.entries())
+
+    def _entry_size(self, entry: Path) -> int:
+        manifest = self._load(entry)
+        if manifest is None:
+            return 0
+        return sum(size for size, _ in manifest["files"].values())
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used entries until the cache fits its size."""
+        entries = self.entries()
+        total = sum(self._entry_size(entry) for entry in entries)
+        for entry in entries:
+            if total <= self.max_size:
+                break
+            if entry.name == keep:
+                continue
+            total -= self._entry_size(entry)
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for entry in self.entries():
+            shutil.rmtree(entry, ignore_errors=True)
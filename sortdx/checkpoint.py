@@ -0,0 +1,169 @@
+"""
+Checkpoints for resumable external sorts.
+
+With a work directory, an external sort keeps its runs there instead of in
+a temporary directory and records its progress in a small JSON job
+manifest: the runs written so far, how many input records they cover and
+which merge passes are done. Running the same job again (or
+``sortdx resume``) skips the finished work. The manifest is rewritten
+atomically once per run, so checkpointing costs next to nothing.
+
+A work directory is trusted input: runs hold pickled records, which can
+run arbitrary code when loaded, so only resume directories written by
+your own sorts. Manifests naming runs outside the directory are ignored.
+"""
+
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .parsers import RUN_SUFFIX
+
+JOB_MANIFEST = "job.json"
+CHECKPOINT_VERSION = 1
+
+PHASE_RUNS = "runs"
+PHASE_MERGE = "merge"
+
+
+def load_job(work_dir: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Load the job description recorded in a work directory.
+
+    Raises:
+        FileNotFoundError: If the directory holds no job manifest
+    """
+    with open(Path(work_dir) / JOB_MANIFEST, encoding="utf-8") as f:
+        job: Dict[str, Any] = json.load(f)["job"]
+    return job
+
+
+class Checkpoint:
+    """
+    Job manifest of a resumable external sort.
+
+    A manifest left by a different job (other inputs, input versions or
+    options) is discarded together with its runs. The work directory
+    should be dedicated to one job.
+
+    Args:
+        work_dir: Directory holding the runs and the manifest
+        job: JSON-serializable description of the job (arguments and input
+            fingerprints)
+    """
+
+    def __init__(self, work_dir: Union[str, Path], job: Dict[str, Any]):
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.work_dir / JOB_MANIFEST
+
+        state = self._load()
+        if state is None or state.get("job") != job:
+            if state is not None:
+                self._remove(state.get("runs", []))
+            state = {
+                "version": CHECKPOINT_VERSION,
+                "job": job,
+                "phase": PHASE_RUNS,
+                "runs": [],
+                "records": 0,
+                "engines": {},
+                "fieldnames": None,
+                "merged": 0,
+            }
+            self._save(state)
+        self.state = state
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != CHECKPOINT_VERSION:
+            return None
+        # Runs are plain file names in the work directory
+        for name in state.get("runs", []):
+            if Path(name).name != name or not name.endswith(RUN_SUFFIX):
+                return None
+        return state
+
+    def _save(self, state: Dict[str, Any]) -> None:
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
+
+    def _remove(self, names: List[str]) -> None:
+        for name in names:
+            try:
+                (self.work_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+
+    @property
+    def phase(self) -> str:
+        """'runs' while runs are generated, then 'merge'."""
+        return str(self.state["phase"])
+
+    @property
+    def records(self) -> int:
+        """Number of input records covered by the recorded runs."""
+        return int(self.state["records"])
+
+    @property
+    def runs(self) -> List[Path]:
+        """Recorded run files, in merge order."""
+        return [self.work_dir / name for name in self.state["runs"]]
+
+    @property
+    def engines(self) -> Counter:
+        """Count of recorded runs per sort engine."""
+        return Counter(self.state["engines"])
+
+    @property
+    def fieldnames(self) -> Optional[List[str]]:
+        """Input CSV/TSV header, once run generation is done."""
+        fieldnames: Optional[List[str]] = self.state["fieldnames"]
+        return fieldnames
+
+    def add_run(self, run_file: Path, engine: str, records: int) -> None:
+        """Record a finished run covering the input up to records."""
+        self.state["runs"].append(run_file.name)
+        self.state["engines"][engine] = self.state["engines"].get(engine, 0) + 1
+        self.state["records"] = records
+        self._save(self.state)
+
+    def finish_runs(
+        self,
+        run_files: List[Path],
+        engines: Counter,
+        fieldnames: Optional[List[str]] = None,
+    ) -> None:
+        """Record the complete list of runs and move on to the merge."""
+        self.state.update(
+            phase=PHASE_MERGE,
+            runs=[path.name for path in run_files],
+            engines=dict(engines),
+            fieldnames=fieldnames,
+        )
+        self._save(self.state)
+
+    def merged_run(self) -> Path:
+        """Get a fresh file name for a run produced by a merge pass."""
+        self.state["merged"] += 1
+        return self.work_dir / f"merged_{self.state['merged']:06d}{RUN_SUFFIX}"
+
+    def replace_runs(self, run_files: List[Path], merged: Path) -> None:
+        """Record that consecutive runs were merged into one."""
+        names = self.state["runs"]
+        start = names.index(run_files[0].name)
+        names[start : start + len(run_files)] = [merged.name]
+        self._save(self.state)
+
+    def complete(self) -> None:
+        """Remove the runs and the manifest of a finished job."""
+        self._remove(self.state["runs"])
+        self.path.unlink()
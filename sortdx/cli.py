@@ -5,7 +5,9 @@ This module provides the CLI using Typer for a modern command-line experience
 with rich help formatting and validation.
 """
 
+import json
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 from typing import List, Optional
 
@@ -26,11 +28,20 @@ except ImportError:
     console = Console()
 
 from .core import sort_iter
-from .utils import SortKey, parse_key_spec
+from .instrument import profiled
+from .parsers import expand_inputs
+from .utils import SortKey, SortStats, parse_key_spec
 
 if TYPER_AVAILABLE:
-    from .core import sort_file
-    from .utils import parse_memory_size, validate_sort_keys
+    from .cardinality import DEFAULT_PRECISION, count_distinct
+    from .core import (
+        MERGE_FAN_IN,
+        merge_files,
+        resume_sort,
+        sort_file,
+        update_file,
+    )
+    from .utils import ProgressTracker, parse_memory_size, validate_sort_keys
 
     # Create Typer app
     app = typer.Typer(
@@ -101,6 +112,118 @@ if TYPER_AVAILABLE:
                 raise typer.Exit(1)
 
 
+def _expand_inputs(input_files: List[str]) -> List[Path]:
+    """Expand input paths and glob patterns."""
+    try:
+        return expand_inputs(input_files)
+    except FileNotFoundError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+
+class _ProgressReporter:
+    """
+    Show sort progress from instrument events.
+
+    Reading is tracked by bytes of the input files, merging by records
+    written against the records in the runs (including the runs of a
+    resumed sort). On a terminal a Rich progress bar is drawn on stderr;
+    otherwise ProgressTracker writes a key=value log line at most every
+    LOG_INTERVAL seconds.
+    """
+
+    LOG_INTERVAL = 10.0
+
+    def __init__(self):
+        self.progress = None
+        self.task = None
+        self.tracker = None
+        self.run_records = 0
+        if sys.stderr.isatty():
+            from rich.progress import Progress, TimeRemainingColumn
+
+            self.progress = Progress(
+                *Progress.get_default_columns()[:-1],
+                TimeRemainingColumn(),
+                console=Console(stderr=True),
+            )
+
+    def __call__(self, event) -> None:
+        data = event.data
+        if event.name == "sort_started":
+            self._stage("Reading", data["input_size"], "B")
+        elif event.name == "progress" and data["phase"] == "read":
+            self._advance(data["bytes_read"])
+        elif event.name in ("run_finished", "runs_resumed"):
+            self.run_records += data["records"]
+        elif event.name == "merge_started":
+            self._stage("Merging", self.run_records, "records")
+        elif event.name == "progress" and data["phase"] == "merge":
+            self._advance(data["records"])
+        elif event.name == "sort_finished":
+            self.close()
+
+    def _stage(self, description: str, total: int, unit: str) -> None:
+        self._finish_stage()
+        if self.progress is not None:
+            self.progress.start()
+            self.task = self.progress.add_task(description, total=total or None)
+        else:
+            self.tracker = ProgressTracker(
+                total, description, unit=unit, interval=self.LOG_INTERVAL
+            )
+
+    def _advance(self, current: int) -> None:
+        if self.progress is not None and self.task is not None:
+            self.progress.update(self.task, completed=current)
+        elif self.tracker is not None:
+            self.tracker.set_current(current)
+
+    def _finish_stage(self) -> None:
+        if self.progress is not None and self.task is not None:
+            total = self.progress.tasks[self.task].total
+            if total:
+                self.progress.update(self.task, completed=total)
+            self.task = None
+        elif self.tracker is not None:
+            self.tracker.finish()
+            self.tracker = None
+
+    def close(self) -> None:
+        """Complete the current stage and stop drawing."""
+        self._finish_stage()
+        if self.progress is not None:
+            self.progress.stop()
+
+
+def _explain_plan(
+    input_paths: List[Path], output: str, sort_keys: List[SortKey], **options
+) -> None:
+    """Print the plan of a sort."""
+    from .planner import plan_sort
+
+    try:
+        plan = plan_sort(
+            input_paths,
+            sort_keys,
+            output_path=None if output == "-" else output,
+            **options,
+        )
+    except Exception as e:
+        console.print(f"[red]Error:[/red] Planning failed: {e}")
+        raise typer.Exit(1)
+    console.print(str(plan), markup=False, highlight=False)
+
+
+def _write_stats_json(result_stats: SortStats, target: str) -> None:
+    """Write sorting statistics as JSON to a file, or to stdout for '-'."""
+    data = json.dumps(result_stats.to_dict(), indent=2)
+    if target == "-":
+        print(data)
+    else:
+        Path(target).write_text(data + "\n", encoding="utf-8")
+
+
 def _parse_sort_keys(
     keys: List[str], locale: Optional[str], natural: bool
 ) -> List[SortKey]:
@@ -172,7 +295,9 @@ def _display_operation_summary(
 
 @app.command()
 def main(
-    input_file: str = typer.Argument(..., help="Input file path", metavar="INPUT"),
+    input_files: List[str] = typer.Argument(
+        ..., help="Input file paths or glob patterns", metavar="INPUT..."
+    ),
     output: Optional[str] = typer.Option(
         None,
         "-o",
@@ -209,7 +334,108 @@ def main(
     natural: bool = typer.Option(
         False, "--natural", help="Use natural sorting for all string columns"
     ),
+    mode: Optional[str] = typer.Option(
+        None,
+        "--mode",
+        help="Sorting strategy: memory, external or mmap (default: by file size)",
+        metavar="MODE",
+    ),
+    engine: Optional[str] = typer.Option(
+        None,
+        "--engine",
+        help="Sort engine: auto, bytes, tuple, numpy or radix (default: auto)",
+        metavar="ENGINE",
+    ),
+    encoding: Optional[str] = typer.Option(
+        None,
+        "--encoding",
+        help="Input encoding (default: detected)",
+        metavar="ENCODING",
+    ),
+    delimiter: Optional[str] = typer.Option(
+        None,
+        "--delimiter",
+        help="Input CSV/TSV delimiter (default: detected)",
+        metavar="CHAR",
+    ),
+    compress_level: Optional[int] = typer.Option(
+        None,
+        "--compress-level",
+        help="Compression level for .gz/.zst output (default: 6 gzip, 3 zstd)",
+        metavar="LEVEL",
+    ),
+    workers: Optional[int] = typer.Option(
+        None,
+        "--workers",
+        help="Processes parsing large JSONL/text inputs or input files "
+        "(0 = all CPUs, default: planned)",
+        metavar="N",
+    ),
+    block_size: Optional[str] = typer.Option(
+        None,
+        "--block-size",
+        help="Write the output as seekable compressed blocks (e.g., 1M)",
+        metavar="SIZE",
+    ),
+    index: bool = typer.Option(
+        False, "--index", help="Write a key index (.sdxidx) for range queries"
+    ),
+    partitions: Optional[int] = typer.Option(
+        None,
+        "--partitions",
+        help="Split the output into N files with a manifest of key bounds",
+        metavar="N",
+    ),
+    partition_by: str = typer.Option(
+        "range",
+        "--partition-by",
+        help="Partitioning: range (ordered shards) or hash:COLUMN",
+        metavar="MODE",
+    ),
+    work_dir: Optional[str] = typer.Option(
+        None,
+        "--work-dir",
+        help="Keep external sort runs here so an interrupted sort can resume",
+        metavar="DIR",
+    ),
+    cache_dir: Optional[str] = typer.Option(
+        None,
+        "--cache-dir",
+        help="Reuse outputs of identical sorts of unchanged inputs from here",
+        metavar="DIR",
+    ),
+    cache_size: Optional[str] = typer.Option(
+        None,
+        "--cache-size",
+        help="Size limit of the result cache (default: 4G)",
+        metavar="SIZE",
+    ),
+    cache_hash: bool = typer.Option(
+        False, "--cache-hash", help="Also fingerprint inputs by content hash"
+    ),
     stats: bool = typer.Option(False, "--stats", help="Show sorting statistics"),
+    stats_json: Optional[str] = typer.Option(
+        None,
+        "--stats-json",
+        help="Write statistics with per-phase timings as JSON ('-' for stdout)",
+        metavar="FILE",
+    ),
+    explain: bool = typer.Option(
+        False,
+        "--explain",
+        help="Show how the input would be sorted, and why, without sorting",
+    ),
+    progress: bool = typer.Option(
+        False,
+        "--progress",
+        help="Show progress and ETA (progress lines when not on a terminal)",
+    ),
+    profile: Optional[str] = typer.Option(
+        None,
+        "--profile",
+        help="Profile the sort with cProfile and write the stats (.pstats)",
+        metavar="FILE",
+    ),
     version: bool = typer.Option(False, "--version", help="Show version information"),
 ) -> None:
     """
@@ -228,6 +454,44 @@ def main(
 
     Sort with uniqueness constraint:
         sortdx users.jsonl -o unique.jsonl -k created_at:date --unique=id
+
+    Sort all shards of an export into one file (4 worker processes):
+        sortdx "part-*.csv.gz" -o sorted.csv -k id:num --workers=4
+
+    Find hot spots with cProfile (view with python -m pstats sort.pstats):
+        sortdx big.jsonl -o sorted.jsonl -k ts:num --profile=sort.pstats
+
+    Record per-phase timings for later analysis:
+        sortdx big.jsonl -o sorted.jsonl -k ts:num --stats-json=stats.json
+
+    Sort into 8 range partitions for parallel downstream jobs:
+        sortdx events.jsonl -o sorted.jsonl -k ts:num --partitions=8
+
+    Resume an interrupted external sort (or run the same command again):
+        sortdx big.jsonl -o sorted.jsonl -k ts:num --mode=external --work-dir=sort.tmp
+        sortdx resume sort.tmp
+
+    Skip re-sorting unchanged inputs with a result cache:
+        sortdx events.jsonl -o sorted.jsonl -k ts:num --cache-dir=.sortdx-cache
+
+    Sort a large uncompressed JSONL file through a memory-mapped offset index:
+        sortdx events.jsonl -o sorted.jsonl -k ts:num --mode=mmap
+
+    Write gzip output as 1 MB blocks that can be read by key range:
+        sortdx events.jsonl -o sorted.jsonl.gz -k ts:num --block-size=1M
+
+    Measure what each sort key costs on the first 10,000 records:
+        sortdx bench-keys events.jsonl -k ts:date -k user:str
+
+    Show the sort plan (mode, engine, workers, chunk size) and its reasons:
+        sortdx events.jsonl.gz -o sorted.jsonl -k ts:num --explain
+
+    Estimate the distinct values of columns in one pass:
+        sortdx stats events.jsonl.gz -k user -k country
+
+    Index the output, then read only the rows of a key range:
+        sortdx events.jsonl -o sorted.jsonl -k ts:num --index
+        sortdx query sorted.jsonl --from 1700000000 --to 1700003600
     """
     # Handle version flag
     if version:
@@ -237,7 +501,10 @@ def main(
         raise typer.Exit()
 
     # Validate inputs
-    _validate_inputs(input_file, memory_limit)
+    input_paths = _expand_inputs(input_files)
+    for input_path in input_paths:
+        _validate_inputs(str(input_path), memory_limit)
+    input_file = ", ".join(str(path) for path in input_paths)
 
     # Set default output to stdout if not specified
     if not output:
@@ -246,6 +513,24 @@ def main(
     # Parse and validate sort keys
     sort_keys = _parse_sort_keys(keys, locale, natural)
 
+    if explain:
+        _explain_plan(
+            input_paths,
+            output,
+            sort_keys,
+            memory_limit=memory_limit,
+            mode=mode,
+            engine=engine,
+            workers=workers,
+            reverse=reverse,
+            unique=unique,
+            partitions=partitions,
+            work_dir=work_dir,
+            encoding=encoding,
+            delimiter=delimiter,
+        )
+        raise typer.Exit()
+
     # Display operation summary if stats requested
     if stats:
         _display_operation_summary(input_file, output, sort_keys, memory_limit)
@@ -259,17 +544,37 @@ def main(
             raise typer.Exit(1)
         else:
             # Sort to file
-            result_stats = sort_file(
-                input_path=input_file,
-                output_path=output,
-                keys=sort_keys,
-                memory_limit=memory_limit,
-                stable=stable,
-                reverse=reverse,
-                unique=unique,
-                stats=stats,
-            )
-
+            profiler = profiled(profile) if profile else nullcontext()
+            reporter = _ProgressReporter() if progress else None
+            with profiler:
+                result_stats = sort_file(
+                    input_path=input_paths,
+                    output_path=output,
+                    keys=sort_keys,
+                    memory_limit=memory_limit,
+                    stable=stable,
+                    reverse=reverse,
+                    unique=unique,
+                    stats=stats or bool(stats_json),
+                    mode=mode,
+                    engine=engine,
+                    encoding=encoding,
+                    delimiter=delimiter,
+                    compress_level=compress_level,
+                    workers=workers,
+                    block_size=parse_memory_size(block_size) if block_size else None,
+                    index=index,
+                    partitions=partitions,
+                    partition_by=partition_by,
+                    work_dir=work_dir,
+                    cache_dir=cache_dir,
+                    cache_size=parse_memory_size(cache_size) if cache_size else None,
+                    cache_hash=cache_hash,
+                    on_event=reporter,
+                )
+
+            if stats_json and result_stats is not None:
+                _write_stats_json(result_stats, stats_json)
             if stats and result_stats:
                 console.print("\n" + str(result_stats))
             else:
@@ -284,6 +589,344 @@ def main(
         raise typer.Exit(1)
 
 
+@app.command(name="merge")
+def merge_sorted_files(
+    input_files: List[str] = typer.Argument(
+        ...,
+        help="Input files or glob patterns, each already sorted",
+        metavar="INPUT...",
+    ),
+    output: str = typer.Option(
+        ..., "-o", "--output", help="Output file path", metavar="FILE"
+    ),
+    keys: List[str] = typer.Option(
+        [],
+        "-k",
+        "--key",
+        help="Sort key specification the inputs are sorted by",
+        metavar="KEY_SPEC",
+    ),
+    reverse: bool = typer.Option(
+        False, "--reverse", help="Inputs are sorted in reverse"
+    ),
+    verify: bool = typer.Option(
+        True, "--verify/--no-verify", help="Check that every input is sorted"
+    ),
+    fan_in: int = typer.Option(
+        MERGE_FAN_IN, "--fan-in", help="Most files merged at once", metavar="N"
+    ),
+    encoding: Optional[str] = typer.Option(
+        None,
+        "--encoding",
+        help="Input encoding (default: detected)",
+        metavar="ENCODING",
+    ),
+    delimiter: Optional[str] = typer.Option(
+        None,
+        "--delimiter",
+        help="Input CSV/TSV delimiter (default: detected)",
+        metavar="CHAR",
+    ),
+    compress_level: Optional[int] = typer.Option(
+        None,
+        "--compress-level",
+        help="Compression level for .gz/.zst output (default: 6 gzip, 3 zstd)",
+        metavar="LEVEL",
+    ),
+    index: bool = typer.Option(
+        False, "--index", help="Write a key index (.sdxidx) for range queries"
+    ),
+    stats: bool = typer.Option(False, "--stats", help="Show sorting statistics"),
+) -> None:
+    """Merge files that are each already sorted, without re-sorting them."""
+    input_paths = _expand_inputs(input_files)
+    for input_path in input_paths:
+        _validate_inputs(str(input_path), None)
+    sort_keys = _parse_sort_keys(keys, None, False)
+
+    try:
+        result_stats = merge_files(
+            input_paths,
+            output,
+            sort_keys,
+            reverse=reverse,
+            verify=verify,
+            stats=stats,
+            encoding=encoding,
+            delimiter=delimiter,
+            compress_level=compress_level,
+            index=index,
+            fan_in=fan_in,
+        )
+    except Exception as e:
+        console.print(f"[red]Error:[/red] Merge failed: {e}")
+        raise typer.Exit(1)
+
+    if stats and result_stats:
+        console.print("\n" + str(result_stats))
+    else:
+        console.print(f"[green]✓[/green] Merged data written to {output}")
+
+
+@app.command(name="update")
+def update_sorted_file(
+    sorted_file: str = typer.Argument(
+        ..., help="Sorted file to update in place", metavar="SORTED"
+    ),
+    delta_file: str = typer.Argument(
+        ..., help="File with new records", metavar="DELTA"
+    ),
+    keys: List[str] = typer.Option(
+        [],
+        "-k",
+        "--key",
+        help="Sort key specification the file is sorted by",
+        metavar="KEY_SPEC",
+    ),
+    reverse: bool = typer.Option(False, "--reverse", help="File is sorted in reverse"),
+    memory_limit: Optional[str] = typer.Option(
+        None,
+        "--memory-limit",
+        help="Memory limit for sorting the delta (e.g., 512M, 2G)",
+        metavar="SIZE",
+    ),
+    encoding: Optional[str] = typer.Option(
+        None,
+        "--encoding",
+        help="Input encoding (default: detected)",
+        metavar="ENCODING",
+    ),
+    delimiter: Optional[str] = typer.Option(
+        None,
+        "--delimiter",
+        help="Input CSV/TSV delimiter (default: detected)",
+        metavar="CHAR",
+    ),
+    compress_level: Optional[int] = typer.Option(
+        None,
+        "--compress-level",
+        help="Compression level for .gz/.zst files (default: 6 gzip, 3 zstd)",
+        metavar="LEVEL",
+    ),
+    index: Optional[bool] = typer.Option(
+        None,
+        "--index/--no-index",
+        help="Write a key index (default: keep the existing one)",
+    ),
+    stats: bool = typer.Option(False, "--stats", help="Show sorting statistics"),
+) -> None:
+    """Merge new records into an already sorted file without a full re-sort."""
+    _validate_inputs(sorted_file, memory_limit)
+    _validate_inputs(delta_file, None)
+    sort_keys = _parse_sort_keys(keys, None, False)
+
+    try:
+        result_stats = update_file(
+            sorted_file,
+            delta_file,
+            sort_keys,
+            memory_limit=memory_limit,
+            reverse=reverse,
+            stats=stats,
+            encoding=encoding,
+            delimiter=delimiter,
+            compress_level=compress_level,
+            index=index,
+        )
+    except Exception as e:
+        console.print(f"[red]Error:[/red] Update failed: {e}")
+        raise typer.Exit(1)
+
+    if stats and result_stats:
+        console.print("\n" + str(result_stats))
+    else:
+        console.print(f"[green]✓[/green] Merged {delta_file} into {sorted_file}")
+
+
+@app.command(name="query")
+def query_file(
+    input_file: str = typer.Argument(
+        ..., help="Sorted file written with --index", metavar="INPUT"
+    ),
+    lo: Optional[str] = typer.Option(
+        None, "--from", help="Lower bound of the first sort key", metavar="VALUE"
+    ),
+    hi: Optional[str] = typer.Option(
+        None, "--to", help="Upper bound of the first sort key", metavar="VALUE"
+    ),
+    output: Optional[str] = typer.Option(
+        None,
+        "-o",
+        "--output",
+        help="Output file path (default: stdout)",
+        metavar="FILE",
+    ),
+) -> None:
+    """Print the rows of an indexed sorted file within a key range."""
+    from .search import query_lines
+
+    try:
+        target = open(output, "wb") if output else sys.stdout.buffer
+        try:
+            for line, _ in query_lines(input_file, lo, hi):
+                target.write(line)
+        finally:
+            if output:
+                target.close()
+            else:
+                target.flush()
+    except Exception as e:
+        console.print(f"[red]Error:[/red] Query failed: {e}")
+        raise typer.Exit(1)
+
+
+@app.command(name="bench-keys")
+def bench_sort_keys(
+    input_files: List[str] = typer.Argument(
+        ..., help="Input file paths or glob patterns", metavar="INPUT..."
+    ),
+    keys: List[str] = typer.Option(
+        [],
+        "-k",
+        "--key",
+        help="Sort key specification (format: column:type[:options])",
+        metavar="KEY_SPEC",
+    ),
+    sample: int = typer.Option(
+        10_000, "--sample", help="Records to sample", metavar="N"
+    ),
+    locale: Optional[str] = typer.Option(
+        None,
+        "--locale",
+        help="Locale for string sorting (e.g., fr_FR.UTF-8)",
+        metavar="LOCALE",
+    ),
+    natural: bool = typer.Option(
+        False, "--natural", help="Use natural sorting for all string columns"
+    ),
+) -> None:
+    """Measure the conversion cost of sort keys on sample records."""
+    from .keybench import bench_keys
+
+    input_paths = _expand_inputs(input_files)
+    sort_keys = _parse_sort_keys(keys, locale, natural)
+    try:
+        report = bench_keys(input_paths, sort_keys, sample_size=sample)
+    except Exception as e:
+        console.print(f"[red]Error:[/red] Key benchmark failed: {e}")
+        raise typer.Exit(1)
+
+    console.print(
+        f"\n[bold]Key costs over {report.records:,} records[/bold] (ns/record)\n"
+    )
+    table = Table()
+    table.add_column("Key", style="cyan", no_wrap=True)
+    for column in ("Extract", "Convert", "Encode", "Failed", "Empty", "Distinct"):
+        table.add_column(column, justify="right", no_wrap=True)
+    table.add_column("Dict")
+
+    records = max(1, report.records)
+    for cost in report.keys:
+        distinct = "-" if cost.distinct is None else f"{cost.distinct:,}"
+        table.add_row(
+            f"{cost.column}:{cost.data_type}",
+            f"{cost.extract_ns:,.0f}",
+            f"{cost.convert_ns:,.0f}",
+            f"{cost.encode_ns:,.0f}",
+            f"{cost.failures / records:.1%}",
+            f"{cost.empty / records:.1%}",
+            distinct,
+            "yes" if cost.dictionary else "no",
+        )
+    console.print(table)
+
+    for cost in report.keys:
+        for note in cost.notes:
+            console.print(f"[yellow]Note:[/yellow] {cost.column}: {note}")
+    engine = report.engine
+    if report.sample_engine != engine:
+        engine += f" (sample sorted by {report.sample_engine})"
+    console.print(f"Engine: {engine}, sort {report.sort_ns:,.0f} ns/record")
+
+
+@app.command(name="stats")
+def column_stats(
+    input_files: List[str] = typer.Argument(
+        ..., help="Input file paths or glob patterns", metavar="INPUT..."
+    ),
+    keys: List[str] = typer.Option(
+        [],
+        "-k",
+        "--key",
+        help="Column to count (column or key specification)",
+        metavar="KEY_SPEC",
+    ),
+    sample: Optional[int] = typer.Option(
+        None, "--sample", help="Only read this many records", metavar="N"
+    ),
+    precision: int = typer.Option(
+        DEFAULT_PRECISION,
+        "--precision",
+        help="HyperLogLog precision (2^P registers)",
+        metavar="P",
+    ),
+) -> None:
+    """Estimate the distinct values of columns with HyperLogLog."""
+    input_paths = _expand_inputs(input_files)
+    if not keys:
+        console.print("[red]Error:[/red] At least one column (-k) is required")
+        raise typer.Exit(1)
+    columns = [sort_key.column for sort_key in _parse_sort_keys(keys, None, False)]
+    try:
+        records, sketches = count_distinct(
+            input_paths, columns, sample_size=sample, precision=precision
+        )
+    except Exception as e:
+        console.print(f"[red]Error:[/red] Counting failed: {e}")
+        raise typer.Exit(1)
+
+    console.print(f"\n[bold]Distinct values over {records:,} records[/bold]\n")
+    table = Table()
+    table.add_column("Column", style="cyan", no_wrap=True)
+    table.add_column("Distinct", justify="right", no_wrap=True)
+    table.add_column("Of records", justify="right", no_wrap=True)
+    for column, sketch in sketches.items():
+        distinct = min(sketch.count(), records)
+        table.add_row(
+            str(column), f"~{distinct:,}", f"{distinct / max(1, records):.1%}"
+        )
+    console.print(table)
+    error = next(iter(sketches.values())).error
+    console.print(f"Estimates within about {error:.1%} (one standard error)")
+
+
+@app.command(name="resume")
+def resume_sort_job(
+    work_dir: str = typer.Argument(
+        ..., help="Work directory of an interrupted sort", metavar="WORK_DIR"
+    ),
+    stats: bool = typer.Option(False, "--stats", help="Show sorting statistics"),
+) -> None:
+    """
+    Resume an interrupted external sort started with --work-dir.
+
+    Runs are unpickled, so only resume work directories you created.
+    """
+    try:
+        result_stats = resume_sort(work_dir, stats=stats)
+    except FileNotFoundError:
+        console.print(f"[red]Error:[/red] No unfinished sort in {work_dir}")
+        raise typer.Exit(1)
+    except Exception as e:
+        console.print(f"[red]Error:[/red] Sorting failed: {e}")
+        raise typer.Exit(1)
+
+    if stats and result_stats:
+        console.print("\n" + str(result_stats))
+    else:
+        console.print("[green]✓[/green] Sort resumed and finished")
+
+
 @app.command(name="examples")
 def show_examples() -> None:
     """Show usage examples for sortdx."""
@@ -309,8 +952,25 @@ def show_examples() -> None:
             "sortdx events.jsonl -o sorted.jsonl -k date:date --reverse",
         ),
         (
-            "Sort TSV with custom delimiter",
-            "sortdx data.tsv -o sorted.tsv -k price:num -k category:str",
+            "Sort CSV with custom delimiter and encoding",
+            "sortdx data.csv -o sorted.csv -k price:num --delimiter=';' "
+            "--encoding=latin-1",
+        ),
+        (
+            "Merge already sorted per-host files",
+            "sortdx merge host1.jsonl.gz host2.jsonl.zst -o all.jsonl.gz " "-k ts:date",
+        ),
+        (
+            "Merge new records into a sorted file",
+            "sortdx update events.jsonl new_events.jsonl -k ts:num",
+        ),
+        (
+            "Query a key range of an indexed output",
+            "sortdx query sorted.jsonl --from 2024-01-01 --to 2024-01-31",
+        ),
+        (
+            "Resume an interrupted external sort",
+            "sortdx resume sort.tmp",
         ),
     ]
 
@@ -355,6 +1015,11 @@ def show_data_types() -> None:
         "Use specific locale for strings",
         "name:str:locale=fr_FR.UTF-8",
     )
+    options_table.add_row(
+        "dict=true|false",
+        "Force dictionary encoding on/off (default: sampled)",
+        "country:str:dict",
+    )
 
     console.print(options_table)
 
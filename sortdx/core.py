@@ -6,10 +6,34 @@ for in-memory and file-based sorting operations.
 """
 
 import heapq
+import itertools
+import json
 import locale
+import os
+import struct
 import tempfile
+import zlib
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Callable, Iterator, List, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 try:
     from dateutil import parser as date_parser
@@ -42,8 +66,77 @@ except ImportError:
 
     ns = NS()
 
-from .parsers import detect_format, parse_file, write_file
-from .utils import SortKey, SortStats, parse_memory_size
+from . import instrument
+from .blocks import BlockIndex, block_index_path, default_block_size
+from .cache import ResultCache, input_fingerprint
+from .cardinality import HyperLogLog
+from .checkpoint import PHASE_MERGE, Checkpoint, load_job
+from .encoding import (
+    dictionary_ranks,
+    encode_datetime,
+    encode_natural,
+    encode_number,
+    encode_str,
+    invert,
+)
+from .engines import NUMPY_AVAILABLE, RADIX_TYPES, VECTOR_TYPES, vector_sort_order
+from .parsers import (
+    RUN_SUFFIX,
+    MappedLineReader,
+    MultiFileReader,
+    RecordWriter,
+    RunWriter,
+    count_run,
+    detect_format,
+    expand_inputs,
+    line_parser,
+    open_output,
+    open_writer,
+    parse_file,
+    parse_files,
+    read_run,
+    supports_line_index,
+    write_file,
+    write_run,
+)
+from .utils import (
+    PhaseStats,
+    PhaseTimer,
+    SortKey,
+    SortStats,
+    format_key_spec,
+    parse_key_spec,
+    parse_memory_size,
+    peak_rss,
+)
+
+SORT_MODES = ("memory", "external", "mmap")
+SORT_ENGINES = ("auto", "bytes", "tuple", "numpy", "radix")
+PARTITION_MODES = ("range", "hash")
+MANIFEST_SUFFIX = ".manifest.json"
+
+# Input sequence numbers appended to run keys by external --unique; with
+# several input files, the file's position goes above the low 40 bits
+_SEQUENCE = struct.Struct(">Q")
+_SHARD_SEQUENCE_BITS = 40
+# External --unique on a column other than the first sort key hash-partitions
+# records to disk; partition files are written with small buffers
+UNIQUE_MAX_PARTITIONS = 64
+# Partitions over the chunk size are split again, this many levels deep
+_PARTITION_MAX_DEPTH = 8
+_PARTITION_BUFFER_SIZE = 64 * 1024
+# Most runs or input files merged at once; more are merged in passes
+MERGE_FAN_IN = 256
+
+# Automatic dictionary encoding of 'str'/'nat' keys: a strided sample of up
+# to DICT_SAMPLE_SIZE values must hold at most DICT_MAX_DISTINCT distinct
+# values, each seen DICT_MIN_REPEAT times on average
+DICT_SAMPLE_SIZE = 4096
+DICT_MIN_SAMPLE = 256
+DICT_MAX_DISTINCT = 1024
+DICT_MIN_REPEAT = 4
+# Upper bound on memoized encodings per dictionary-encoded key
+DICT_CACHE_SIZE = 1 << 16
 
 
 def key(
@@ -89,10 +182,28 @@ def _extract_value(item: Any, column: Union[str, int]) -> Any:
         return str(item)
 
 
+def _extract_column(items: List[Any], column: Union[str, int]) -> List[Any]:
+    """Extract the values of one column from a list of items."""
+    if items and isinstance(items[0], dict):
+        try:
+            return [item.get(column, "") for item in items]
+        except AttributeError:
+            pass
+    return [_extract_value(item, column) for item in items]
+
+
 def _convert_value(
-    value: Any, data_type: str, locale_name: Optional[str] = None
+    value: Any,
+    data_type: str,
+    locale_name: Optional[str] = None,
+    on_error: Optional[Callable[[Any], None]] = None,
 ) -> Any:
-    """Convert a value to the appropriate type for sorting."""
+    """
+    Convert a value to the appropriate type for sorting.
+
+    Values that fail to convert get a default (-inf for numbers, 1900-01-01
+    for dates) and are passed to on_error, if given.
+    """
     if value is None or value == "":
         # Handle empty values - they sort first
         if data_type == "num":
@@ -119,6 +230,8 @@ def _convert_value(
         else:
             return str(value)
     except (ValueError, TypeError):
+        if on_error is not None:
+            on_error(value)
         # If conversion fails, return a default value
         if data_type == "num":
             return float("-inf")
@@ -128,55 +241,488 @@ def _convert_value(
             return str(value)
 
 
-def _create_sort_function(keys: List[SortKey]) -> Callable[[Any], tuple]:
-    """Create a sorting key function for multiple sort keys."""
+def _sort_key_value(
+    value: Any, sort_key: SortKey, on_error: Optional[Callable[[Any], None]] = None
+) -> Any:
+    """Convert an extracted value into its sort key component."""
+    converted = _convert_value(
+        value, sort_key.data_type, sort_key.locale_name, on_error=on_error
+    )
+
+    # Handle natural sorting
+    if sort_key.data_type == "nat":
+        # For natural sorting, we use natsort but need to handle desc
+        nat_key = natsorted([str(converted)], alg=ns.IGNORECASE)[0]
+        converted = nat_key
+
+    # Handle locale-specific string sorting
+    elif sort_key.data_type == "str" and sort_key.locale_name:
+        try:
+            locale.setlocale(locale.LC_COLLATE, sort_key.locale_name)
+            converted = locale.strxfrm(str(converted))
+        except locale.Error:
+            # Fall back to regular string sorting if locale not available
+            converted = str(converted).lower()
+    elif sort_key.data_type == "str":
+        converted = str(converted).lower()
+
+    # Handle descending order by negating numbers or reversing strings
+    if sort_key.desc:
+        if isinstance(converted, (int, float)):
+            converted = -converted
+        elif hasattr(converted, "__reversed__"):
+            # For strings, we'll use a custom comparator approach
+            # This is a simple approach - for better locale support,
+            # we'd need more sophisticated handling
+            pass
+
+    return converted
+
+
+def _create_tuple_sort_function(keys: List[SortKey]) -> Callable[[Any], tuple]:
+    """Create a tuple sorting key function (used by the 'tuple' engine)."""
+    counters = [(k, instrument.conversion_counter(k.column)) for k in keys]
 
     def sort_key_func(item: Any) -> tuple:
-        result = []
-        for sort_key in keys:
-            value = _extract_value(item, sort_key.column)
-            converted = _convert_value(value, sort_key.data_type, sort_key.locale_name)
-
-            # Handle natural sorting
-            if sort_key.data_type == "nat":
-                # For natural sorting, we use natsort but need to handle desc
-                nat_key = natsorted([str(converted)], alg=ns.IGNORECASE)[0]
-                converted = nat_key
-
-            # Handle locale-specific string sorting
-            elif sort_key.data_type == "str" and sort_key.locale_name:
-                try:
-                    locale.setlocale(locale.LC_COLLATE, sort_key.locale_name)
-                    converted = locale.strxfrm(str(converted))
-                except locale.Error:
-                    # Fall back to regular string sorting if locale not available
-                    converted = str(converted).lower()
-            elif sort_key.data_type == "str":
-                converted = str(converted).lower()
-
-            # Handle descending order by negating numbers or reversing strings
-            if sort_key.desc:
-                if isinstance(converted, (int, float)):
-                    converted = -converted
-                elif hasattr(converted, "__reversed__"):
-                    # For strings, we'll use a custom comparator approach
-                    # This is a simple approach - for better locale support,
-                    # we'd need more sophisticated handling
-                    pass
-
-            result.append(converted)
-
-        return tuple(result)
+        return tuple(
+            _sort_key_value(_extract_value(item, sort_key.column), sort_key, on_error)
+            for sort_key, on_error in counters
+        )
+
+    return sort_key_func
+
+
+def _string_transform(sort_key: SortKey) -> Callable[[str], str]:
+    """Get the collation transform for a 'str' key."""
+    if sort_key.locale_name:
+        try:
+            locale.setlocale(locale.LC_COLLATE, sort_key.locale_name)
+            return locale.strxfrm
+        except locale.Error:
+            # Fall back to regular string sorting if locale not available
+            pass
+    return str.lower
+
+
+def _segment_encoder(
+    sort_key: SortKey,
+    descending: bool,
+    on_error: Optional[Callable[[Any], None]] = None,
+) -> Callable[[Any], bytes]:
+    """
+    Create an encoder from an extracted value to its binary key segment.
+
+    Values that fail to convert are passed to on_error, if given.
+    """
+    data_type = sort_key.data_type
+
+    if data_type == "num":
+
+        def encode(value: Any) -> bytes:
+            return encode_number(_convert_value(value, "num", on_error=on_error))
+
+    elif data_type == "date":
+
+        def encode(value: Any) -> bytes:
+            return encode_datetime(_convert_value(value, "date", on_error=on_error))
+
+    elif data_type == "nat":
+
+        def encode(value: Any) -> bytes:
+            return encode_natural(str(_convert_value(value, "nat")).lower())
+
+    else:
+        transform = _string_transform(sort_key)
+
+        def encode(value: Any) -> bytes:
+            # Same as _convert_value(value, "str"): None becomes ""
+            return encode_str(transform("" if value is None else str(value)))
+
+    if descending:
+        ascending = encode
+
+        def encode(value: Any) -> bytes:
+            return invert(ascending(value))
+
+    return encode
+
+
+def _memoize_encoder(
+    sort_key: SortKey,
+    descending: bool,
+    on_error: Optional[Callable[[Any], None]] = None,
+) -> Callable[[Any], bytes]:
+    """
+    Create a segment encoder that encodes each distinct value once.
+
+    Whether a value failed to convert is cached with its segment, so
+    on_error still gets every occurrence of it.
+    """
+    failed: List[Any] = []
+    encode = _segment_encoder(
+        sort_key, descending, None if on_error is None else failed.append
+    )
+    cache: Dict[Any, Tuple[bytes, bool]] = {}
+
+    def memoized(value: Any) -> bytes:
+        try:
+            encoded, failure = cache[value]
+        except KeyError:
+            encoded = encode(value)
+            failure = bool(failed)
+            failed.clear()
+            if len(cache) < DICT_CACHE_SIZE:
+                cache[value] = (encoded, failure)
+        except TypeError:
+            # Unhashable values (e.g. nested JSON) are encoded directly
+            encoded = encode(value)
+            failure = bool(failed)
+            failed.clear()
+        if failure and on_error is not None:
+            on_error(value)
+        return encoded
+
+    return memoized
+
+
+def _segment_encoders(
+    keys: List[SortKey],
+    reverse: bool = False,
+    dictionary: Optional[List[bool]] = None,
+) -> List[Callable[[Any], bytes]]:
+    """
+    Create one segment encoder per sort key, memoizing dictionary keys.
+
+    Conversion failures are counted (see instrument.conversion_counter).
+    """
+    flags = dictionary or [False] * len(keys)
+    return [
+        (_memoize_encoder if flag else _segment_encoder)(
+            k, k.desc != reverse, instrument.conversion_counter(k.column)
+        )
+        for k, flag in zip(keys, flags)
+    ]
+
+
+def _create_sort_function(
+    keys: List[SortKey],
+    reverse: bool = False,
+    dictionary: Optional[List[bool]] = None,
+) -> Callable[[Any], bytes]:
+    """
+    Create a sorting key function for multiple sort keys.
+
+    The key is a single order-preserving bytes value (see sortdx.encoding):
+    descending keys are byte-inverted, and reverse=True inverts every key,
+    so items always sort ascending by their encoded key.
+    """
+    encoders = _segment_encoders(keys, reverse, dictionary)
+    columns = [k.column for k in keys]
+
+    if len(keys) == 1:
+        column, encode = columns[0], encoders[0]
+
+        def single_key_func(item: Any) -> bytes:
+            return encode(_extract_value(item, column))
+
+        return single_key_func
+
+    fields = list(zip(columns, encoders))
+
+    def sort_key_func(item: Any) -> bytes:
+        return b"".join(
+            [encode(_extract_value(item, column)) for column, encode in fields]
+        )
 
     return sort_key_func
 
 
+def _sample(values: List[Any]) -> List[Any]:
+    """Take an evenly strided sample of about DICT_SAMPLE_SIZE values."""
+    return values[:: max(1, len(values) // DICT_SAMPLE_SIZE)]
+
+
+def _low_cardinality(values: List[Any]) -> bool:
+    """Check whether sampled values are few and repeated enough to encode."""
+    if len(values) < DICT_MIN_SAMPLE:
+        return False
+    try:
+        distinct = len(set(values))
+    except TypeError:
+        return False
+    return distinct <= DICT_MAX_DISTINCT and distinct * DICT_MIN_REPEAT <= len(values)
+
+
+def _dictionary_flags(
+    keys: List[SortKey], sample: Optional[Callable[[int], List[Any]]] = None
+) -> List[bool]:
+    """
+    Decide which sort keys to dictionary-encode.
+
+    The 'dict' key option forces the choice. Otherwise 'str' and 'nat' keys
+    are encoded when sample(i), a sample of key i's values, is of low
+    cardinality; without a sample only the option counts.
+    """
+    flags = []
+    for i, sort_key in enumerate(keys):
+        if "dict" in sort_key.options:
+            flags.append(bool(sort_key.options["dict"]))
+        elif sample is None or sort_key.data_type not in ("str", "nat"):
+            flags.append(False)
+        else:
+            flags.append(_low_cardinality(sample(i)))
+    return flags
+
+
+def _select_engine(
+    keys: List[SortKey],
+    engine: Optional[str] = None,
+    dictionary: Optional[List[bool]] = None,
+) -> str:
+    """
+    Resolve the in-memory sort engine for a list of sort keys.
+
+    With 'auto', keys that are all 'num'/'date' use the NumPy engine and key
+    sets that also contain plain (non-locale) 'str' keys use the radix
+    engine, provided NumPy is importable; anything else is sorted by binary
+    normalized keys ('bytes'). Dictionary-encoded keys count as integer
+    keys. Vectorized engines may still settle on another engine once they
+    see the data (see _sort_items).
+    """
+    dictionary = dictionary or [False] * len(keys)
+    vectorizable = bool(keys) and all(
+        flag or k.data_type in VECTOR_TYPES for k, flag in zip(keys, dictionary)
+    )
+    radixable = bool(keys) and all(
+        flag
+        or (k.data_type in RADIX_TYPES and not (k.data_type == "str" and k.locale_name))
+        for k, flag in zip(keys, dictionary)
+    )
+
+    if engine is None or engine == "auto":
+        if NUMPY_AVAILABLE and vectorizable:
+            return "numpy"
+        if NUMPY_AVAILABLE and radixable:
+            return "radix"
+        return "bytes"
+
+    if engine not in SORT_ENGINES:
+        raise ValueError(
+            f"Invalid sort engine '{engine}'. "
+            f"Valid engines: {', '.join(SORT_ENGINES)}"
+        )
+
+    if engine == "numpy":
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy not installed. Install with: pip install numpy")
+        if not vectorizable:
+            raise ValueError("NumPy engine requires only 'num' and 'date' keys")
+
+    if engine == "radix" and not radixable:
+        raise ValueError(
+            "Radix engine requires only 'num', 'date' and non-locale 'str' keys"
+        )
+
+    return engine
+
+
+def _vector_sort_order(
+    columns: List[List[Any]],
+    keys: List[SortKey],
+    reverse: bool = False,
+    engine: str = "auto",
+    dictionary: Optional[List[bool]] = None,
+    count_failures: bool = True,
+) -> Tuple[Optional[List[int]], str]:
+    """
+    Compute a sort order from raw key columns with a vectorized engine.
+
+    Dictionary-encoded columns are replaced by their integer ranks, which
+    already carry the key's collation and direction. Conversion failures
+    are counted (see instrument.conversion_counter) unless count_failures
+    is False, for records whose keys were also encoded (which counts them).
+    """
+    columns = list(columns)
+    data_types = [k.data_type for k in keys]
+    descending = [k.desc != reverse for k in keys]
+    on_error = [
+        instrument.conversion_counter(k.column) if count_failures else None
+        for k in keys
+    ]
+
+    # Distinct values are encoded once: count each failed value's records
+    # once the records are known to be ordered here (else bytes keys count)
+    failures: List[Tuple[List[Any], Set[Any], Callable[[Any], None]]] = []
+    for i, flag in enumerate(dictionary or []):
+        if flag:
+            counter = on_error[i]
+            failed: Set[Any] = set()
+            encode = _segment_encoder(
+                keys[i], descending[i], None if counter is None else failed.add
+            )
+            try:
+                ranks = dictionary_ranks(columns[i], encode)
+            except TypeError:
+                # Unhashable values cannot be dictionary-encoded
+                return None, "bytes"
+            if counter is not None and failed:
+                failures.append((columns[i], failed, counter))
+            columns[i] = ranks
+            data_types[i] = "num"
+            descending[i] = False
+            on_error[i] = None
+
+    order, used = vector_sort_order(
+        columns,
+        data_types,
+        descending,
+        _convert_value,
+        engine=engine,
+        on_error=on_error,
+    )
+    if order is not None:
+        for values, failed, count in failures:
+            for value in values:
+                if value in failed:
+                    count(value)
+    return order, used
+
+
+def _item_sampler(items: List[Any], keys: List[SortKey]) -> Callable[[int], List[Any]]:
+    """Sample the values of key i from a list of items."""
+
+    def sample(i: int) -> List[Any]:
+        return [_extract_value(item, keys[i].column) for item in _sample(items)]
+
+    return sample
+
+
+def _item_order(
+    items: List[Any],
+    keys: List[SortKey],
+    reverse: bool,
+    engine: Optional[str],
+    selected: str,
+    dictionary: List[bool],
+    count_failures: bool = True,
+) -> Tuple[Optional[List[int]], str]:
+    """Run a vectorized engine over a list of items (see _vector_sort_order)."""
+    columns = [_extract_column(items, k.column) for k in keys]
+    auto = engine is None or engine == "auto"
+    return _vector_sort_order(
+        columns,
+        keys,
+        reverse,
+        engine="auto" if auto else selected,
+        dictionary=dictionary,
+        count_failures=count_failures,
+    )
+
+
+def _phase(phases: Optional[PhaseTimer], name: str) -> ContextManager[PhaseStats]:
+    """Time a phase if statistics are collected (see PhaseTimer.phase)."""
+    if phases is None:
+        return nullcontext(PhaseStats())
+    return phases.phase(name)
+
+
+def _sort_items(
+    items: List[Any],
+    keys: List[SortKey],
+    reverse: bool = False,
+    engine: Optional[str] = None,
+) -> Tuple[List[Any], str]:
+    """
+    Sort a list of items in memory.
+
+    Returns:
+        (sorted items, name of the engine that produced the order)
+    """
+    dictionary = _dictionary_flags(keys, _item_sampler(items, keys))
+    selected = _select_engine(keys, engine, dictionary)
+
+    if selected in ("numpy", "radix"):
+        order, used = _item_order(items, keys, reverse, engine, selected, dictionary)
+        if order is not None:
+            return list(map(items.__getitem__, order)), used
+
+    # Python's sort is always stable, so 'stable' needs no special handling
+    if selected == "tuple":
+        tuple_func = _create_tuple_sort_function(keys)
+        return sorted(items, key=tuple_func, reverse=reverse), "tuple"
+
+    sort_func = _create_sort_function(keys, reverse, dictionary)
+    return sorted(items, key=sort_func), "bytes"
+
+
+def _sort_keyed(
+    items: List[Any],
+    keys: List[SortKey],
+    reverse: bool = False,
+    engine: Optional[str] = None,
+    sequence: Optional[List[int]] = None,
+    phases: Optional[PhaseTimer] = None,
+) -> Tuple[List[Tuple[bytes, Any]], str]:
+    """
+    Sort items and pair each one with its binary normalized key.
+
+    Used for run generation: runs are always ordered by encoded keys so
+    they can be merged by comparing bytes, whichever engine sorted them.
+
+    Args:
+        sequence: Increasing input sequence numbers of the items. When
+            given, each key ends with its item's number, so ties between
+            runs resolve in input order.
+        phases: Timer recording the 'keys' and 'sort' phases
+    """
+    with _phase(phases, "keys") as phase:
+        dictionary = _dictionary_flags(keys, _item_sampler(items, keys))
+        sort_func = _create_sort_function(keys, reverse, dictionary)
+
+        if sequence is None:
+            keyed = [(sort_func(item), item) for item in items]
+        else:
+            pack = _SEQUENCE.pack
+            keyed = [
+                (sort_func(item) + pack(seq), item)
+                for item, seq in zip(items, sequence)
+            ]
+        phase.records += len(keyed)
+
+    with _phase(phases, "sort") as phase:
+        phase.records += len(keyed)
+        selected = _select_engine(keys, engine, dictionary)
+        if selected in ("numpy", "radix"):
+            # The keys above already counted conversion failures
+            order, used = _item_order(
+                items, keys, reverse, engine, selected, dictionary, False
+            )
+            if order is not None:
+                return list(map(keyed.__getitem__, order)), used
+
+        keyed.sort(key=itemgetter(0))
+        return keyed, "bytes"
+
+
+def _unique_items(items: List[Any], unique: Union[str, int]) -> List[Any]:
+    """Keep the first item seen for each value of the unique column."""
+    seen = set()
+    unique_items = []
+    for item in items:
+        unique_val = _extract_value(item, unique)
+        if unique_val not in seen:
+            seen.add(unique_val)
+            unique_items.append(item)
+    return unique_items
+
+
 def sort_iter(
     data: Iterator[Any],
     keys: List[SortKey],
     stable: bool = True,
     reverse: bool = False,
     unique: Optional[str] = None,
+    engine: Optional[str] = None,
 ) -> Iterator[Any]:
     """
     Sort an iterator of data in memory.
@@ -187,6 +733,9 @@ def sort_iter(
         stable: Use stable sorting algorithm
         reverse: Reverse the entire sort order
         unique: Column name for uniqueness constraint
+        engine: Sort engine ('auto', 'bytes', 'tuple', 'numpy' or 'radix').
+            'auto' uses the vectorized engines when NumPy is installed and
+            the key types allow it, and binary normalized keys otherwise
 
     Yields:
         Sorted items
@@ -202,171 +751,1059 @@ def sort_iter(
 
     # Apply uniqueness constraint if specified
     if unique:
-        seen = set()
-        unique_items = []
-        for item in items:
-            unique_val = _extract_value(item, unique)
-            if unique_val not in seen:
-                seen.add(unique_val)
-                unique_items.append(item)
-        items = unique_items
+        items = _unique_items(items, unique)
 
-    # Create sort function
-    sort_func = _create_sort_function(keys)
+    sorted_items, _ = _sort_items(items, keys, reverse=reverse, engine=engine)
+    return iter(sorted_items)
 
-    # Sort using appropriate algorithm
-    if stable:
-        sorted_items = sorted(items, key=sort_func, reverse=reverse)
-    else:
-        # For unstable sort, we can use the same function but note that
-        # Python's sort is actually always stable, so this is mainly for API completeness
-        sorted_items = sorted(items, key=sort_func, reverse=reverse)
 
-    return iter(sorted_items)
+def _unique_is_prefix(unique: Union[str, int], keys: List[SortKey]) -> bool:
+    """Check whether the unique column is the first sort key."""
+    return bool(keys) and keys[0].column == unique
 
 
-def _chunk_file(
-    input_path: Path,
+def _first_seen(
+    records: Iterable[Tuple[int, Any]], unique: Union[str, int]
+) -> Iterator[Tuple[int, Any]]:
+    """Keep the first (sequence, item) record for each unique value."""
+    seen = set()
+    for seq, item in records:
+        unique_val = _extract_value(item, unique)
+        if unique_val not in seen:
+            seen.add(unique_val)
+            yield seq, item
+
+
+def _partition_records(
+    records: Iterable[Tuple[int, Any]],
+    unique: Union[str, int],
+    temp_dir: Path,
+    partitions: int,
+    prefix: str = "partition",
+    salt: int = 0,
+) -> Tuple[List[Path], int]:
+    """
+    Hash-partition (sequence, item) records by their unique value.
+
+    All records sharing a value land in the same partition, in input order,
+    so each partition can be deduplicated on its own. A non-zero salt
+    changes the hash, to split a partition further.
+
+    Returns:
+        (partition files named <prefix>_NNNN.run, number of records)
+    """
+    paths = [temp_dir / f"{prefix}_{i:04d}{RUN_SUFFIX}" for i in range(partitions)]
+    writers = [RunWriter(path, buffering=_PARTITION_BUFFER_SIZE) for path in paths]
+    pack = _SEQUENCE.pack
+    count = 0
+
+    try:
+        for seq, item in records:
+            value = _extract_value(item, unique)
+            partition = hash((salt, value) if salt else value) % partitions
+            writers[partition].write(pack(seq), item)
+            count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+
+    return paths, count
+
+
+def _bounded_partitions(
+    partition_files: List[Path],
+    unique: Union[str, int],
+    temp_dir: Path,
+    limit: int,
+    depth: int = 1,
+    phases: Optional[PhaseTimer] = None,
+) -> Iterator[Path]:
+    """
+    Yield partition files of at most about limit bytes.
+
+    Larger partitions hold too many values to deduplicate within the
+    memory budget: they are split again with a salted hash, recursively,
+    until they fit or stop shrinking (a partition whose records all share
+    a hash holds very few distinct values).
+    """
+    for path in partition_files:
+        size = path.stat().st_size
+        if size == 0:
+            path.unlink()
+            continue
+        if size <= limit or depth >= _PARTITION_MAX_DEPTH:
+            yield path
+            continue
+
+        with _phase(phases, "partition"):
+            parts, _ = _partition_records(
+                _read_partition(path),
+                unique,
+                temp_dir,
+                min(UNIQUE_MAX_PARTITIONS, size // limit + 1),
+                prefix=path.name[: -len(RUN_SUFFIX)],
+                salt=depth,
+            )
+        path.unlink()
+        if max(part.stat().st_size for part in parts) == size:
+            # Every record hashed alike again: few distinct values
+            depth = _PARTITION_MAX_DEPTH - 1
+        yield from _bounded_partitions(
+            parts, unique, temp_dir, limit, depth + 1, phases=phases
+        )
+
+
+def _read_partition(partition_file: Path) -> Iterator[Tuple[int, Any]]:
+    """Read back the (sequence, item) records of a partition."""
+    unpack = _SEQUENCE.unpack
+    for seq, item in read_run(partition_file):
+        yield unpack(seq)[0], item
+
+
+def _report_resumed_runs(run_files: List[Path]) -> None:
+    """Emit runs_resumed for the runs a checkpoint recorded, if any."""
+    if run_files and instrument.active():
+        instrument.emit(
+            "runs_resumed",
+            runs=len(run_files),
+            records=sum(map(count_run, run_files)),
+        )
+
+
+def _spill_runs(
+    records: Iterable[Tuple[int, Any]],
     chunk_size: int,
     keys: List[SortKey],
     temp_dir: Path,
-) -> List[Path]:
-    """Split a large file into sorted chunks."""
-    chunk_files = []
-    chunk_num = 0
-
-    file_format = detect_format(input_path)
+    prefix: str = "chunk",
+    reverse: bool = False,
+    engine: Optional[str] = None,
+    unique: Optional[Union[str, int]] = None,
+    dedup: bool = False,
+    checkpoint: Optional[Checkpoint] = None,
+    phases: Optional[PhaseTimer] = None,
+) -> Tuple[List[Path], Counter]:
+    """
+    Cut (sequence, item) records into chunks and write each as a sorted run.
 
-    with parse_file(input_path) as reader:
-        current_chunk = []
-        current_size = 0
+    With unique, run keys end with the records' sequence numbers, and with
+    dedup duplicates are also dropped within each chunk. With a checkpoint,
+    the runs it recorded come first and every new run is recorded with
+    the number of records read so far (its last sequence number + 1).
+    phases records the 'parse', 'keys', 'sort' and 'spill' phases.
 
-        for item in reader:
-            current_chunk.append(item)
+    Returns:
+        (run files named <prefix>_NNNNNN.run, count of runs per engine)
+    """
+    chunk_files = []
+    engines_used: Counter[str] = Counter()
+    if checkpoint is not None:
+        chunk_files = checkpoint.runs
+        engines_used = checkpoint.engines
+        _report_resumed_runs(chunk_files)
+
+    def spill(chunk: List[Tuple[int, Any]]) -> None:
+        consumed = chunk[-1][0] + 1
+        parse.records += len(chunk)
+        chunk_file = temp_dir / f"{prefix}_{len(chunk_files):06d}{RUN_SUFFIX}"
+        instrument.emit("run_started", run=str(chunk_file), records=len(chunk))
+        sequence = None
+        if unique is not None:
+            if dedup:
+                chunk = list(_first_seen(chunk, unique))
+            sequence = [seq for seq, _ in chunk]
+        items = [item for _, item in chunk]
+        keyed, used = _sort_keyed(
+            items,
+            keys,
+            reverse=reverse,
+            engine=engine,
+            sequence=sequence,
+            phases=phases,
+        )
+        engines_used[used] += 1
+
+        with _phase(phases, "spill") as phase:
+            write_run(chunk_file, keyed)
+            phase.records += len(keyed)
+            if phases is not None or instrument.active():
+                size = chunk_file.stat().st_size
+                phase.bytes_out += size
+                instrument.emit(
+                    "run_finished",
+                    run=str(chunk_file),
+                    records=len(keyed),
+                    bytes=size,
+                    engine=used,
+                )
+        chunk_files.append(chunk_file)
+        if checkpoint is not None:
+            checkpoint.add_run(chunk_file, used, consumed)
+        instrument.flush_failures()
+        instrument.emit("progress", phase="runs", records=parse.records)
+
+    current_chunk = []
+    current_size = 0
+
+    with _phase(phases, "parse") as parse:
+        for record in records:
+            current_chunk.append(record)
             # Rough estimate of memory usage
-            current_size += len(str(item))
+            current_size += len(str(record[1]))
 
             if current_size >= chunk_size:
                 # Sort chunk and write to temp file
-                sorted_chunk = list(sort_iter(current_chunk, keys))
-
-                chunk_file = temp_dir / f"chunk_{chunk_num:06d}.{file_format}"
-                write_file(chunk_file, sorted_chunk, file_format)
-                chunk_files.append(chunk_file)
-
+                spill(current_chunk)
                 current_chunk = []
                 current_size = 0
-                chunk_num += 1
 
         # Handle remaining items
         if current_chunk:
-            sorted_chunk = list(sort_iter(current_chunk, keys))
-            chunk_file = temp_dir / f"chunk_{chunk_num:06d}.{file_format}"
-            write_file(chunk_file, sorted_chunk, file_format)
-            chunk_files.append(chunk_file)
+            spill(current_chunk)
+
+    return chunk_files, engines_used
 
+
+def _chunk_range(
+    input_path: Path,
+    span: Tuple[int, int],
+    worker: int,
+    encoding: str,
+    chunk_size: int,
+    keys: List[SortKey],
+    temp_dir: Path,
+    reverse: bool = False,
+    engine: Optional[str] = None,
+    unique: Optional[Union[str, int]] = None,
+) -> Tuple[List[Path], Counter, PhaseTimer]:
+    """
+    Parse, sort and spill one byte range of a line-based file.
+
+    Runs in a worker process. Byte offsets serve as sequence numbers: they
+    increase in input order across all ranges.
+
+    Returns:
+        (run files, count of runs per engine, phase timings of the worker)
+    """
+    phases = PhaseTimer()
+    with MappedLineReader(input_path, encoding=encoding) as lines:
+        records = ((start, record) for start, _, record in lines.iter_spans(*span))
+        chunk_files, engines_used = _spill_runs(
+            records,
+            chunk_size,
+            keys,
+            temp_dir,
+            prefix=f"chunk_w{worker:03d}",
+            reverse=reverse,
+            engine=engine,
+            unique=unique,
+            dedup=unique is not None,
+            phases=phases,
+        )
+    return chunk_files, engines_used, phases
+
+
+def _chunk_ranges(
+    input_path: Path,
+    chunk_size: int,
+    keys: List[SortKey],
+    temp_dir: Path,
+    workers: int,
+    reverse: bool = False,
+    engine: Optional[str] = None,
+    unique: Optional[Union[str, int]] = None,
+    encoding: Optional[str] = None,
+    phases: Optional[PhaseTimer] = None,
+) -> Tuple[List[Path], Counter]:
+    """
+    Generate runs for an uncompressed JSONL/text file in parallel.
+
+    The file is split into byte ranges on line boundaries (lines are
+    records in these formats) and each range is turned into runs by its
+    own process. Runs are returned in input order, so the merge stays
+    stable. The workers' phase timings are added to phases.
+    """
+    with MappedLineReader(input_path, encoding=encoding) as lines:
+        encoding = lines.encoding
+        ranges = lines.split_ranges(workers)
+
+    if not ranges:
+        return [], Counter()
+
+    # Every worker holds one chunk at a time: share the memory budget
+    worker_chunk_size = max(1, chunk_size // len(ranges))
+
+    with ProcessPoolExecutor(
+        max_workers=len(ranges), initializer=instrument.clear_hooks
+    ) as pool:
+        futures = [
+            pool.submit(
+                _chunk_range,
+                input_path,
+                span,
+                worker,
+                encoding,
+                worker_chunk_size,
+                keys,
+                temp_dir,
+                reverse,
+                engine,
+                unique,
+            )
+            for worker, span in enumerate(ranges)
+        ]
+        results = [future.result() for future in futures]
+
+    chunk_files = [path for files, _, _ in results for path in files]
+    engines_used = sum((used for _, used, _ in results), Counter())
+    if phases is not None:
+        for _, _, worker_phases in results:
+            phases.update(worker_phases)
+    return chunk_files, engines_used
+
+
+def _chunk_file(
+    input_path: Union[Path, List[Path]],
+    chunk_size: int,
+    keys: List[SortKey],
+    temp_dir: Path,
+    reverse: bool = False,
+    engine: Optional[str] = None,
+    unique: Optional[Union[str, int]] = None,
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    workers: int = 1,
+    prefix: str = "chunk",
+    sequence_base: int = 0,
+    checkpoint: Optional[Checkpoint] = None,
+    phases: Optional[PhaseTimer] = None,
+) -> Tuple[List[Path], Counter, Optional[List[str]]]:
+    """
+    Split a large file into sorted runs.
+
+    With unique, run keys end with input sequence numbers. If the unique
+    column is the first sort key, duplicates are only dropped within each
+    chunk and _merge_chunks removes the rest; otherwise records are first
+    hash-partitioned by their unique value and each partition is fully
+    deduplicated before it is cut into runs (partitions larger than a chunk
+    are split again, see _bounded_partitions). Either way memory stays
+    bounded by the chunk size rather than the number of distinct values.
+
+    With workers > 1, uncompressed JSONL/text inputs are parsed in
+    parallel by byte ranges (see _chunk_ranges); other inputs, and
+    partitioned unique sorts, are read sequentially.
+
+    A list of inputs is read as one stream of records (see
+    MultiFileReader). Run files are named after prefix and sequence
+    numbers start at sequence_base.
+
+    With a checkpoint, sequential run generation resumes after the input
+    records covered by its runs (which are skipped, not sorted again) and
+    records every new run; parallel and partitioned run generation start
+    over.
+
+    Returns:
+        (run files, count of runs sorted by each engine, input fieldnames)
+    """
+    partition_column = (
+        None if unique is None or _unique_is_prefix(unique, keys) else unique
+    )
+    options: Dict[str, Any] = dict(reverse=reverse, engine=engine, unique=unique)
+    input_paths = input_path if isinstance(input_path, list) else [input_path]
+
+    if (
+        workers > 1
+        and partition_column is None
+        and len(input_paths) == 1
+        and supports_line_index(input_paths[0])
+    ):
+        chunk_files, engines_used = _chunk_ranges(
+            input_paths[0],
+            chunk_size,
+            keys,
+            temp_dir,
+            workers,
+            encoding=encoding,
+            phases=phases,
+            **options,
+        )
+        return chunk_files, engines_used, None
+
+    with parse_files(input_paths, encoding=encoding, delimiter=delimiter) as reader:
+        records: Iterator[Tuple[int, Any]] = enumerate(reader, sequence_base)
+        if instrument.active():
+            records = _report_progress(records, "read", reader)
+        if partition_column is None:
+            if checkpoint is not None and checkpoint.records:
+                records = itertools.islice(records, checkpoint.records, None)
+            chunk_files, engines_used = _spill_runs(
+                records,
+                chunk_size,
+                keys,
+                temp_dir,
+                prefix=prefix,
+                dedup=unique is not None,
+                checkpoint=checkpoint,
+                phases=phases,
+                **options,
+            )
+            return chunk_files, engines_used, reader.fieldnames
+
+        input_size = sum(path.stat().st_size for path in input_paths)
+        partitions = min(UNIQUE_MAX_PARTITIONS, input_size // chunk_size + 1)
+        with _phase(phases, "partition") as phase:
+            partition_files, count = _partition_records(
+                records, partition_column, temp_dir, partitions
+            )
+            phase.records += count
+        fieldnames = reader.fieldnames
+
+    # Chunks never span partitions, so sequence numbers within a chunk
+    # increase and the (stable) chunk sort keeps equal keys in input order
+    chunk_files = []
+    engines_used = Counter()
+    bounded = _bounded_partitions(
+        partition_files, partition_column, temp_dir, chunk_size, phases=phases
+    )
+    for i, partition_file in enumerate(bounded):
+        files, used = _spill_runs(
+            _first_seen(_read_partition(partition_file), partition_column),
+            chunk_size,
+            keys,
+            temp_dir,
+            prefix=f"{prefix}_p{i:04d}",
+            phases=phases,
+            **options,
+        )
+        chunk_files.extend(files)
+        engines_used.update(used)
+        partition_file.unlink()
+
+    return chunk_files, engines_used, fieldnames
+
+
+def _chunk_shard(
+    *args: Any, **kwargs: Any
+) -> Tuple[List[Path], Counter, Optional[List[str]], PhaseTimer]:
+    """Run _chunk_file in a worker process and return its phase timings too."""
+    phases = kwargs["phases"] = PhaseTimer()
+    return (*_chunk_file(*args, **kwargs), phases)
+
+
+def _chunk_shards(
+    input_paths: List[Path],
+    chunk_size: int,
+    keys: List[SortKey],
+    temp_dir: Path,
+    workers: int,
+    reverse: bool = False,
+    engine: Optional[str] = None,
+    unique: Optional[Union[str, int]] = None,
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    phases: Optional[PhaseTimer] = None,
+) -> Tuple[List[Path], Counter, Optional[List[str]]]:
+    """
+    Split several input files into sorted runs, one worker process per file.
+
+    Each file is decompressed, parsed and run-sorted by _chunk_file in a
+    worker. Sequence numbers carry the file's position in their high bits,
+    so they increase in input order across files and the merge stays
+    stable (and keeps the first duplicate with unique). Partitioned unique
+    sorts, and single-worker sorts, read the files in one stream instead.
+    The workers' phase timings are added to phases.
+
+    Returns:
+        (run files in input order, count of runs per engine, union of the
+        CSV/TSV headers)
+    """
+    options: Dict[str, Any] = dict(
+        reverse=reverse,
+        engine=engine,
+        unique=unique,
+        encoding=encoding,
+        delimiter=delimiter,
+    )
+    partitioned = unique is not None and not _unique_is_prefix(unique, keys)
+    if workers <= 1 or partitioned:
+        return _chunk_file(
+            input_paths,
+            chunk_size,
+            keys,
+            temp_dir,
+            checkpoint=checkpoint,
+            phases=phases,
+            **options,
+        )
+
+    # Every worker holds one chunk at a time: share the memory budget
+    workers = min(workers, len(input_paths))
+    worker_chunk_size = max(1, chunk_size // workers)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=instrument.clear_hooks
+    ) as pool:
+        futures = [
+            pool.submit(
+                _chunk_shard,
+                path,
+                worker_chunk_size,
+                keys,
+                temp_dir,
+                prefix=f"shard{i:05d}",
+                sequence_base=i << _SHARD_SEQUENCE_BITS,
+                **options,
+            )
+            for i, path in enumerate(input_paths)
+        ]
+        results = [future.result() for future in futures]
+
+    chunk_files = []
+    engines_used: Counter[str] = Counter()
+    fieldnames: List[str] = []
+    for files, used, names, worker_phases in results:
+        chunk_files.extend(files)
+        engines_used.update(used)
+        if phases is not None:
+            phases.update(worker_phases)
+        for name in names or []:
+            if name not in fieldnames:
+                fieldnames.append(name)
+    return chunk_files, engines_used, fieldnames or None
+
+
+def _drop_duplicates(
+    merged: Iterable[Tuple[bytes, Any]],
+    unique: Union[str, int],
+    encode: Callable[[Any], bytes],
+) -> Iterator[Tuple[bytes, Any]]:
+    """
+    Deduplicate a merge whose first sort key is the unique column.
+
+    Records sharing a first key segment are adjacent, so only one group is
+    held at a time. Within a group the record with the lowest sequence
+    number (the key's suffix) wins for each unique value.
+    """
+    segment = None
+    group: Dict[Any, Tuple[bytes, Any]] = {}
+
+    for sort_key, item in merged:
+        # Segments are prefix-free: a key starting with the current
+        # segment belongs to the current group
+        if segment is None or not sort_key.startswith(segment):
+            yield from sorted(group.values(), key=itemgetter(0))
+            group = {}
+            segment = encode(_extract_value(item, unique))
+
+        unique_val = _extract_value(item, unique)
+        kept = group.get(unique_val)
+        if kept is None or sort_key[-_SEQUENCE.size :] < kept[0][-_SEQUENCE.size :]:
+            group[unique_val] = (sort_key, item)
+
+    yield from sorted(group.values(), key=itemgetter(0))
+
+
+def _strip_sequences(
+    merged: Iterable[Tuple[bytes, Any]],
+) -> Iterator[Tuple[bytes, Any]]:
+    """Drop the input sequence numbers that end the keys of unique runs."""
+    size = _SEQUENCE.size
+    for sort_key, item in merged:
+        yield sort_key[:-size], item
+
+
+def _merge_pass(
+    sources: List[Generator[Tuple[bytes, Any], None, None]], run_file: Path
+) -> Path:
+    """Merge keyed streams into one run file."""
+    try:
+        write_run(run_file, heapq.merge(*sources, key=itemgetter(0)))
+    finally:
+        for source in sources:
+            source.close()
+    return run_file
+
+
+def _merge_passes(runs: int, fan_in: int = MERGE_FAN_IN) -> int:
+    """Count the merge passes over runs, including the final merge."""
+    passes = 1 if runs else 0
+    while runs > fan_in:
+        runs = -(-runs // fan_in)
+        passes += 1
+    return passes
+
+
+def _reduce_runs(
+    chunk_files: List[Path],
+    fan_in: int = MERGE_FAN_IN,
+    prefix: str = "pass",
+    checkpoint: Optional[Checkpoint] = None,
+) -> List[Path]:
+    """
+    Merge runs in passes until at most fan_in are left.
+
+    Consecutive runs are merged together, so ties keep their run order.
+    Merged runs are deleted; new ones go next to them (and are recorded
+    in the checkpoint, if any, before their inputs are deleted).
+    """
+    passes = 0
+    while len(chunk_files) > fan_in:
+        merged_files: List[Path] = []
+        for i in range(0, len(chunk_files), fan_in):
+            group = chunk_files[i : i + fan_in]
+            if checkpoint is not None:
+                run_file = checkpoint.merged_run()
+            else:
+                run_file = group[0].parent / (
+                    f"{prefix}{passes:02d}_{len(merged_files):06d}{RUN_SUFFIX}"
+                )
+            instrument.emit("merge_pass_started", pass_number=passes, runs=len(group))
+            merged_files.append(_merge_pass([read_run(f) for f in group], run_file))
+            instrument.emit(
+                "merge_pass_finished",
+                pass_number=passes,
+                run=str(run_file),
+                bytes=run_file.stat().st_size,
+            )
+            if checkpoint is not None:
+                checkpoint.replace_runs(group, run_file)
+            for chunk_file in group:
+                chunk_file.unlink()
+        chunk_files = merged_files
+        passes += 1
     return chunk_files
 
 
+def _report_progress(
+    items: Iterable[Any], phase: str, reader: Optional[MultiFileReader] = None
+) -> Iterator[Any]:
+    """
+    Pass items through, emitting a progress event every so many.
+
+    With the reader of the items, events also carry how many bytes of the
+    input files (compressed bytes for compressed files) were read.
+    """
+    interval = instrument.PROGRESS_INTERVAL
+    for count, item in enumerate(items, 1):
+        yield item
+        if count % interval == 0:
+            if reader is not None:
+                instrument.emit(
+                    "progress",
+                    phase=phase,
+                    records=count,
+                    bytes_read=reader.bytes_read,
+                )
+            else:
+                instrument.emit("progress", phase=phase, records=count)
+
+
+def _count_distinct(
+    records: Iterable[Tuple[bytes, Any]],
+    sketches: Dict[Union[str, int], HyperLogLog],
+) -> Iterator[Tuple[bytes, Any]]:
+    """Pass (key, item) records through, adding their key values to sketches."""
+    columns = list(sketches.items())
+    for record in records:
+        item = record[1]
+        for column, sketch in columns:
+            sketch.add(_extract_value(item, column))
+        yield record
+
+
 def _merge_chunks(
     chunk_files: List[Path],
     output_path: Path,
+    unique: Optional[Union[str, int]] = None,
+    keys: Optional[List[SortKey]] = None,
+    reverse: bool = False,
+    fieldnames: Optional[List[str]] = None,
+    partitions: Optional[Dict[str, Any]] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    fan_in: int = MERGE_FAN_IN,
+    sketches: Optional[Dict[Union[str, int], HyperLogLog]] = None,
+    **output_options: Any,
+) -> int:
+    """
+    Merge sorted runs using k-way merge.
+
+    Runs carry their encoded keys, so the merge compares bytes only. Ties
+    are resolved in run order, which keeps the overall sort stable. Runs
+    written by _chunk_file with unique are deduplicated here when the
+    unique column is the first sort key (and already were otherwise).
+    Records are streamed to the output; fieldnames is the CSV/TSV header
+    of the input and output_options go to open_output. More than fan_in
+    runs are first merged in passes (checkpointed with a checkpoint). With
+    partitions (_write_partitions options), the output is split into
+    partition files, by sort keys without their sequence numbers; range
+    cuts of a deduplicated merge need the number of records left, so it is
+    first written to one more run.
+    The values of the merged records are added to sketches (column ->
+    HyperLogLog), if given.
+
+    Returns:
+        Number of records written
+    """
+    chunk_files = _reduce_runs(chunk_files, fan_in, checkpoint=checkpoint)
+    runs = [read_run(chunk_file) for chunk_file in chunk_files]
+    unique_run = None
+    instrument.emit("merge_started", runs=len(runs))
+
+    try:
+        merged: Iterator[Tuple[bytes, Any]] = heapq.merge(*runs, key=itemgetter(0))
+        deduplicate = False
+        if unique is not None and keys and _unique_is_prefix(unique, keys):
+            deduplicate = True
+            first = keys[0]
+            encode = _segment_encoder(first, first.desc != reverse)
+            merged = _drop_duplicates(merged, unique, encode)
+
+        if partitions and partitions["partition_by"] == "range":
+            # Range cuts need the record count; frames are counted undecoded
+            if deduplicate and chunk_files:
+                # Count what is left after dropping duplicates from one run
+                unique_run = chunk_files[0].with_name(f"unique{RUN_SUFFIX}")
+                total = write_run(unique_run, merged)
+                runs.append(read_run(unique_run))
+                merged = runs[-1]
+            else:
+                total = sum(map(count_run, chunk_files))
+            partitions = dict(partitions, total=total)
+
+        if sketches:
+            merged = _count_distinct(merged, sketches)
+        if instrument.active():
+            merged = _report_progress(merged, "merge")
+
+        if partitions:
+            if unique is not None:
+                # Cut and bound partitions on the sort keys alone
+                merged = _strip_sequences(merged)
+            written = _write_partitions(output_path, merged, fieldnames, **partitions)
+        else:
+            written = _write_merged(output_path, merged, fieldnames, **output_options)
+        instrument.emit("merge_finished", records=written)
+        return written
+
+    finally:
+        # Close all run readers
+        for run in runs:
+            run.close()
+        if unique_run is not None:
+            unique_run.unlink(missing_ok=True)
+
+
+def _offset_index_sort(
+    input_path: Path,
+    output_path: Path,
     keys: List[SortKey],
+    reverse: bool = False,
     unique: Optional[str] = None,
-) -> None:
-    """Merge sorted chunks using k-way merge."""
-    file_format = detect_format(output_path)
-    sort_func = _create_sort_function(keys)
+    engine: Optional[str] = None,
+    encoding: Optional[str] = None,
+    sketches: Optional[Dict[Union[str, int], HyperLogLog]] = None,
+    **output_options: Any,
+) -> Tuple[int, str]:
+    """
+    Sort an uncompressed JSONL/text file through a memory-mapped offset index.
 
-    # Open all chunk files
-    readers = []
-    heap = []
+    Only record offsets and sort keys are kept in memory; the output is
+    written by copying record bytes out of the mapping in sorted order.
+    The values of the kept records are added to sketches (column ->
+    HyperLogLog), if given.
 
-    try:
-        for i, chunk_file in enumerate(chunk_files):
-            reader = parse_file(chunk_file)
-            readers.append(reader)
+    Returns:
+        (number of records written, name of the engine used)
+    """
+    if detect_format(output_path) != detect_format(input_path):
+        raise ValueError("mmap mode requires the same input and output format")
+
+    # Only the 'dict' option is known before the scan; vectorized sorts
+    # sample the collected columns afterwards
+    dictionary = _dictionary_flags(keys)
+    selected = _select_engine(keys, engine, dictionary)
+    vectorized = selected in ("numpy", "radix")
+    sort_func: Callable[[Any], Any]
+    if selected == "tuple":
+        sort_func = _create_tuple_sort_function(keys)
+    else:
+        sort_func = _create_sort_function(keys, reverse, dictionary)
+    starts = array("q")
+    ends = array("q")
+    sort_keys: List[Any] = []
+    columns: List[List[Any]] = [[] for _ in keys]
+    seen: Set[Any] = set()
+    counted = list(sketches.items()) if sketches else []
+
+    with MappedLineReader(input_path, encoding=encoding) as lines:
+        for start, end, record in lines.iter_spans():
+            if unique:
+                unique_val = _extract_value(record, unique)
+                if unique_val in seen:
+                    continue
+                seen.add(unique_val)
 
-            # Get first item from each chunk
-            try:
-                first_item = next(iter(reader))
-                heapq.heappush(heap, (sort_func(first_item), i, first_item))
-            except StopIteration:
-                pass
+            starts.append(start)
+            ends.append(end)
+            for column, sketch in counted:
+                sketch.add(_extract_value(record, column))
+            if vectorized:
+                for values, sort_key in zip(columns, keys):
+                    values.append(_extract_value(record, sort_key.column))
+            else:
+                sort_keys.append(sort_func(record))
+
+        used = selected
+        vector_order = None
+        if vectorized:
+            auto = engine is None or engine == "auto"
+            samples = [_sample(values) for values in columns]
+            dictionary = _dictionary_flags(keys, samples.__getitem__)
+            vector_order, used = _vector_sort_order(
+                columns,
+                keys,
+                reverse,
+                engine="auto" if auto else selected,
+                dictionary=dictionary,
+            )
+            if vector_order is None:
+                encoders = _segment_encoders(keys, reverse, dictionary)
+                sort_keys = [
+                    b"".join([encode(v) for encode, v in zip(encoders, row)])
+                    for row in zip(*columns)
+                ]
+                used = "bytes"
+
+        if vector_order is not None:
+            order = array("q", vector_order)
+        else:
+            # Tuple keys honour reverse through sorted(); bytes keys encode it
+            order = array(
+                "q",
+                sorted(
+                    range(len(sort_keys)),
+                    key=sort_keys.__getitem__,
+                    reverse=reverse and used == "tuple",
+                ),
+            )
+        del sort_keys, columns, seen
 
-        # Set for uniqueness constraint
-        seen = set() if unique else None
+        with open_output(output_path, **output_options) as output_file:
+            for i in order:
+                output_file.write(lines.slice(starts[i], ends[i]))
+                output_file.write(b"\n")
 
-        # Merge and write
-        with open(output_path, "w", encoding="utf-8") as output_file:
-            writer_func = _get_writer_func(output_file, file_format)
+    return len(order), used
 
-            while heap:
-                sort_key_val, chunk_idx, item = heapq.heappop(heap)
 
-                # Check uniqueness constraint
-                if unique:
-                    unique_val = _extract_value(item, unique)
-                    if unique_val in seen:
-                        # Skip duplicate, get next item from same chunk
-                        try:
-                            next_item = next(readers[chunk_idx])
-                            heapq.heappush(
-                                heap, (sort_func(next_item), chunk_idx, next_item)
-                            )
-                        except StopIteration:
-                            pass
-                        continue
-                    seen.add(unique_val)
-
-                writer_func(item)
-
-                # Get next item from the same chunk
-                try:
-                    next_item = next(readers[chunk_idx])
-                    heapq.heappush(heap, (sort_func(next_item), chunk_idx, next_item))
-                except StopIteration:
-                    pass
+def _line_key_function(
+    file_format: str, keys: List[SortKey], reverse: bool = False
+) -> Callable[[bytes], bytes]:
+    """
+    Build a function returning the encoded sort key of one output line.
 
-    finally:
-        # Close all readers
-        for reader in readers:
-            if hasattr(reader, "close"):
-                reader.close()
+    Used for key index entries. CSV/TSV lines are read against the header,
+    which must be the first line passed in (its key is empty).
+    """
+    sort_func = _create_sort_function(keys, reverse)
+    parse = line_parser(file_format)
 
+    def line_key(line: bytes) -> bytes:
+        record = parse(line)
+        return b"" if record is None else sort_func(record)
 
-def _get_writer_func(file_obj, file_format: str) -> Callable:
-    """Get appropriate writer function for file format."""
-    import json
+    return line_key
 
-    if file_format == "jsonl":
 
-        def write_jsonl(item):
-            file_obj.write(json.dumps(item, ensure_ascii=False) + "\n")
+def _output_options(
+    output_path: Path,
+    keys: List[SortKey],
+    reverse: bool = False,
+    compress_level: Optional[int] = None,
+    block_size: Optional[int] = None,
+    index: bool = False,
+) -> Dict[str, Any]:
+    """Get the open_output options for a sorted output (see sort_file)."""
+    options: Dict[str, Any] = {"compress_level": compress_level}
+    if index and not block_size:
+        block_size = default_block_size(output_path)
+    if not block_size:
+        return options
 
-        return write_jsonl
-    elif file_format in ("csv", "tsv"):
+    file_format = detect_format(output_path)
+    options.update(
+        block_size=block_size,
+        block_key=_line_key_function(file_format, keys, reverse),
+        block_metadata={
+            "format": file_format,
+            "keys": [format_key_spec(k) for k in keys],
+            "reverse": reverse,
+        },
+    )
+    return options
 
-        def write_csv(item):
-            if isinstance(item, dict):
-                # For CSV, we'd need to handle headers properly
-                # This is a simplified version
-                values = list(item.values())
-                file_obj.write(",".join(str(v) for v in values) + "\n")
-            else:
-                file_obj.write(str(item) + "\n")
 
-        return write_csv
-    else:  # txt
+def _write_merged(
+    output_path: Path,
+    merged: Iterable[Tuple[bytes, Any]],
+    fieldnames: Optional[List[str]] = None,
+    **output_options: Any,
+) -> int:
+    """Write the records of a keyed merge and return how many were written."""
+    count = 0
+
+    def records() -> Iterator[Any]:
+        nonlocal count
+        for _, item in merged:
+            count += 1
+            yield item
+
+    with open_writer(output_path, fieldnames=fieldnames, **output_options) as writer:
+        writer.write_all(records())
+    return count
 
-        def write_txt(item):
-            file_obj.write(str(item) + "\n")
 
-        return write_txt
+def partition_path(output_path: Union[str, Path], number: int) -> Path:
+    """
+    Get the path of one partition of a partitioned output.
+
+    Example:
+        >>> partition_path("sorted.csv.gz", 3)
+        PosixPath('sorted-00003.csv.gz')
+    """
+    path = Path(output_path)
+    suffix = path.suffix
+    if suffix.lower() in (".gz", ".gzip", ".zst", ".zstd"):
+        suffix = Path(path.stem).suffix + suffix
+    stem = path.name[: len(path.name) - len(suffix)]
+    return path.with_name(f"{stem}-{number:05d}{suffix}")
+
+
+def _parse_partition_by(
+    partition_by: str, keys: List[SortKey]
+) -> Tuple[str, Optional[Union[str, int]]]:
+    """Parse 'range' or 'hash[:COLUMN]' (default column: the first sort key)."""
+    mode, _, column = partition_by.partition(":")
+    if mode not in PARTITION_MODES or (mode == "range" and column):
+        raise ValueError(
+            f"Invalid partitioning '{partition_by}'. Use 'range' or 'hash:COLUMN'"
+        )
+    if mode == "range":
+        return mode, None
+    if not column:
+        return mode, keys[0].column
+    try:
+        return mode, int(column)
+    except ValueError:
+        return mode, column
+
+
+def _write_partitions(
+    output_path: Path,
+    keyed: Iterable[Tuple[bytes, Any]],
+    fieldnames: Optional[List[str]] = None,
+    keys: Optional[List[SortKey]] = None,
+    reverse: bool = False,
+    partitions: int = 2,
+    partition_by: str = "range",
+    total: Optional[int] = None,
+    compress_level: Optional[int] = None,
+    block_size: Optional[int] = None,
+    index: bool = False,
+) -> int:
+    """
+    Write a sorted keyed stream as numbered partition files and a manifest.
+
+    Range partitions cut the stream after about total / partitions records
+    each, at the next change of key, so they hold disjoint key ranges in
+    order. Hash partitions route records by the CRC32 of a column, so
+    equal values share a partition; each partition is sorted. The manifest
+    (<output>.manifest.json) lists every partition's record count and
+    first and last sort keys.
+
+    Returns:
+        Number of records written
+    """
+    if not keys:
+        raise ValueError("Partitioned outputs need sort keys")
+    mode, column = _parse_partition_by(partition_by, keys)
+    if partitions < 1:
+        raise ValueError(f"Invalid number of partitions: {partitions}")
+    paths = [partition_path(output_path, i) for i in range(partitions)]
+    bounds: List[Dict[str, Any]] = [{"records": 0} for _ in paths]
+    first_column = keys[0].column
+
+    def track(number: int, sort_key: bytes, item: Any) -> None:
+        bound = bounds[number]
+        if not bound["records"]:
+            bound["min_key"] = sort_key.hex()
+            bound["first"] = _extract_value(item, first_column)
+        bound["records"] += 1
+        bound["max_key"] = sort_key.hex()
+        bound["last"] = _extract_value(item, first_column)
+
+    def open_partition(stack: ExitStack, number: int) -> RecordWriter:
+        options = _output_options(
+            paths[number], keys, reverse, compress_level, block_size, index
+        )
+        return stack.enter_context(
+            open_writer(paths[number], fieldnames=fieldnames, **options)
+        )
+
+    # Only hash partitions have a column
+    if column is not None:
+        with ExitStack() as stack:
+            writers = [open_partition(stack, i) for i in range(partitions)]
+            for sort_key, item in keyed:
+                value = str(_extract_value(item, column)).encode("utf-8")
+                number = zlib.crc32(value) % partitions
+                writers[number].write(item)
+                track(number, sort_key, item)
+    else:
+        records = iter(keyed)
+        pending = next(records, None)
+        written = 0
+
+        def cut(number: int, limit: Optional[int]) -> Iterator[Any]:
+            nonlocal pending, written
+            previous = None
+            while pending is not None:
+                sort_key, item = pending
+                if limit is not None and written >= limit and sort_key != previous:
+                    return
+                track(number, sort_key, item)
+                yield item
+                previous = sort_key
+                written += 1
+                pending = next(records, None)
+
+        for number in range(partitions):
+            limit = None
+            if number < partitions - 1 and total is not None:
+                limit = total * (number + 1) // partitions
+            with ExitStack() as stack:
+                open_partition(stack, number).write_all(cut(number, limit))
+
+    manifest = {
+        "version": 1,
+        "partition_by": mode,
+        "column": column,
+        "keys": [format_key_spec(k) for k in keys],
+        "reverse": reverse,
+        "partitions": [
+            {"path": path.name, **bound} for path, bound in zip(paths, bounds)
+        ],
+    }
+    manifest_path = Path(str(output_path) + MANIFEST_SUFFIX)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    return sum(bound["records"] for bound in bounds)
 
 
 def sort_file(
-    input_path: Union[str, Path],
+    input_path: Union[str, Path, Sequence[Union[str, Path]]],
     output_path: Union[str, Path],
     keys: List[SortKey],
     memory_limit: Optional[str] = None,
@@ -374,19 +1811,72 @@ def sort_file(
     reverse: bool = False,
     unique: Optional[str] = None,
     stats: bool = False,
+    mode: Optional[str] = None,
+    engine: Optional[str] = None,
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    compress_level: Optional[int] = None,
+    workers: Optional[int] = None,
+    block_size: Optional[int] = None,
+    index: bool = False,
+    partitions: Optional[int] = None,
+    partition_by: str = "range",
+    work_dir: Optional[Union[str, Path]] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+    cache_size: Optional[int] = None,
+    cache_hash: bool = False,
+    on_event: Optional[Callable[[instrument.Event], None]] = None,
 ) -> Optional[SortStats]:
     """
     Sort a file and write results to another file.
 
     Args:
-        input_path: Path to input file
+        input_path: Path to input file, or a list of paths and glob patterns
+            (e.g. 'part-*.csv.gz') sorted together as one input
         output_path: Path to output file
         keys: List of SortKey specifications
-        memory_limit: Memory limit (e.g., '512M', '2G') for external sorting
+        memory_limit: Memory budget (e.g., '512M', '2G'); default: half of
+            the available memory
         stable: Use stable sorting algorithm
         reverse: Reverse the entire sort order
         unique: Column name for uniqueness constraint
         stats: Return sorting statistics
+        mode: Sorting strategy ('memory', 'external' or 'mmap'). 'mmap' sorts
+            uncompressed JSONL/text files through an offset index without
+            materializing records. Chosen by sampling the input when omitted
+            (see sortdx.planner).
+        engine: In-memory sort engine ('auto', 'bytes', 'tuple', 'numpy' or
+            'radix')
+        encoding: Input encoding (default: detected)
+        delimiter: Input CSV/TSV delimiter (default: detected)
+        compress_level: Compression level for .gz/.zst output (default: 6
+            for gzip, 3 for zstd)
+        workers: Processes used to parse uncompressed JSONL/text inputs of
+            external sorts, or to run-sort one file each with several
+            inputs (0 = one per CPU; default: planned from the input size)
+        block_size: Write the output as independently compressed blocks of
+            about this many bytes, with a block index for random access
+            (see sortdx.blocks)
+        index: Write a sparse key index (.sdxidx) next to the output for
+            range queries with sortdx.query (implies block_size, 64 KiB
+            for uncompressed and 1 MiB for compressed outputs by default)
+        partitions: Split the output into this many files named like
+            partition_path(output_path, n), plus a manifest of their key
+            bounds (<output_path>.manifest.json)
+        partition_by: 'range' for ordered shards of about equal size, or
+            'hash:COLUMN' for sorted shards grouped by a column's hash
+        work_dir: Keep the runs of an external sort in this directory with a
+            job manifest, so that an interrupted sort resumes where it
+            stopped when run again (see sortdx.checkpoint; runs are
+            pickled, so the directory must not be writable by others)
+        cache_dir: Reuse the output of an identical earlier sort of unchanged
+            inputs from this result cache, or add the output to it (see
+            sortdx.cache)
+        cache_size: Size limit of the result cache in bytes (default: 4 GiB)
+        cache_hash: Also fingerprint inputs by a hash of their content, not
+            just their size and mtime
+        on_event: Callback receiving an instrument.Event for each step of
+            the sort (runs, merge passes, progress, conversion failures)
 
     Returns:
         SortStats object if stats=True, None otherwise
@@ -394,65 +1884,658 @@ def sort_file(
     Example:
         >>> sort_file("data.jsonl", "sorted.jsonl", keys=[key("timestamp", "date")])
     """
+    if on_event is not None:
+        args = dict(locals(), on_event=None)
+        with instrument.hook(on_event):
+            return sort_file(**args)
+
     import time
 
     start_time = time.time()
-    input_path = Path(input_path)
+    phases = PhaseTimer()
+    probe_cpu = time.process_time()
+    input_paths = expand_inputs(input_path)
+    input_path = input_paths[0]
     output_path = Path(output_path)
 
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     # Get file size
-    file_size = input_path.stat().st_size
+    file_size = sum(path.stat().st_size for path in input_paths)
+
+    if mode is not None and mode not in SORT_MODES:
+        raise ValueError(
+            f"Invalid sort mode '{mode}'. Valid modes: {', '.join(SORT_MODES)}"
+        )
+
+    if mode == "mmap" and len(input_paths) > 1:
+        raise ValueError("mmap mode requires a single input file")
+
+    partition_options: Optional[Dict[str, Any]] = None
+    if partitions:
+        if mode == "mmap":
+            raise ValueError("mmap mode does not support partitioned output")
+        _parse_partition_by(partition_by, keys)
+        partition_options = dict(
+            keys=keys,
+            reverse=reverse,
+            partitions=partitions,
+            partition_by=partition_by,
+            compress_level=compress_level,
+            block_size=block_size,
+            index=index,
+        )
 
-    # Determine if we need external sorting
-    if memory_limit:
-        max_memory = parse_memory_size(memory_limit)
-        need_external_sort = file_size > max_memory
+    cache = cached = None
+    if cache_dir is not None:
+        cache = ResultCache(cache_dir, cache_size)
+        result_files = _result_files(output_path, partitions)
+        cache_key = cache.digest(
+            _cache_description(
+                input_paths,
+                output_path,
+                keys,
+                content_hash=cache_hash,
+                reverse=reverse,
+                unique=unique,
+                # The 'tuple' engine orders descending strings differently
+                engine=_select_engine(keys, engine, _dictionary_flags(keys)),
+                encoding=encoding,
+                delimiter=delimiter,
+                compress_level=compress_level,
+                block_size=block_size,
+                index=index,
+                partitions=partitions,
+                partition_by=partition_by,
+            )
+        )
+        cached = cache.fetch(cache_key, result_files)
+        if cached is None:
+            # Outputs may be hardlinked to cache entries: replace, never
+            # overwrite them in place
+            for path in result_files:
+                if path.exists():
+                    path.unlink()
+
+    plan = None
+    if cached is None:
+        from .planner import plan_sort
+
+        plan = plan_sort(
+            input_paths,
+            keys,
+            output_path=output_path,
+            memory_limit=memory_limit,
+            mode=mode,
+            engine=engine,
+            workers=workers,
+            reverse=reverse,
+            unique=unique,
+            partitions=partitions,
+            work_dir=work_dir,
+            encoding=encoding,
+            delimiter=delimiter,
+        )
+        mode = plan.mode
     else:
-        # Default: use external sort for files > 100MB
-        need_external_sort = file_size > 100 * 1024 * 1024
+        mode = cached["mode"]
 
+    need_external_sort = mode == "external"
     lines_processed = 0
+    runs = merge_passes = temp_bytes = 0
+    # Distinct key values of the sorted records, counted for stats only
+    sketches = {k.column: HyperLogLog() for k in keys} if stats else None
+
+    output_options = _output_options(
+        output_path, keys, reverse, compress_level, block_size, index
+    )
+    phases.add(
+        "probe",
+        wall_time=time.time() - start_time,
+        cpu_time=time.process_time() - probe_cpu,
+    )
+    instrument.emit(
+        "sort_started",
+        inputs=[str(path) for path in input_paths],
+        output=str(output_path),
+        mode=mode,
+        input_size=file_size,
+    )
 
-    if need_external_sort:
+    if cached is not None:
+        lines_processed = cached["lines_processed"]
+        engine_used = cached["engine"]
+        cardinality = cached.get("cardinality") or {}
+    elif mode == "mmap":
+        with phases.phase("sort") as phase:
+            lines_processed, engine_used = _offset_index_sort(
+                input_path,
+                output_path,
+                keys,
+                reverse=reverse,
+                unique=unique,
+                engine=engine,
+                encoding=encoding,
+                sketches=sketches,
+                **output_options,
+            )
+            phase.records += lines_processed
+            phase.bytes_in += file_size
+    elif need_external_sort and plan is not None:
         # External sorting for large files
-        chunk_size = (
-            parse_memory_size(memory_limit) if memory_limit else 50 * 1024 * 1024
-        )
+        chunk_size = plan.chunk_size
+
+        with ExitStack() as stack:
+            checkpoint = None
+            if work_dir is not None:
+                job = _job_description(
+                    input_paths,
+                    output_path,
+                    keys,
+                    memory_limit=memory_limit,
+                    reverse=reverse,
+                    unique=unique,
+                    engine=engine,
+                    encoding=encoding,
+                    delimiter=delimiter,
+                    compress_level=compress_level,
+                    workers=workers,
+                    block_size=block_size,
+                    index=index,
+                    partitions=partitions,
+                    partition_by=partition_by,
+                )
+                checkpoint = Checkpoint(work_dir, job)
+                temp_path = checkpoint.work_dir
+            else:
+                temp_path = Path(stack.enter_context(tempfile.TemporaryDirectory()))
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+            if checkpoint is not None and checkpoint.phase == PHASE_MERGE:
+                chunk_files = checkpoint.runs
+                engines_used = checkpoint.engines
+                fieldnames = checkpoint.fieldnames
+                _report_resumed_runs(chunk_files)
+            else:
+                # Split into chunks
+                chunk_input = _chunk_file if len(input_paths) == 1 else _chunk_shards
+                chunk_files, engines_used, fieldnames = chunk_input(
+                    input_paths,
+                    chunk_size,
+                    keys,
+                    temp_path,
+                    reverse=reverse,
+                    engine=engine,
+                    unique=unique,
+                    encoding=encoding,
+                    delimiter=delimiter,
+                    workers=plan.workers,
+                    checkpoint=checkpoint,
+                    phases=phases,
+                )
+                if checkpoint is not None:
+                    checkpoint.finish_runs(chunk_files, engines_used, fieldnames)
+            engine_used = (
+                engines_used.most_common(1)[0][0]
+                if engines_used
+                else _select_engine(keys, engine)
+            )
 
-            # Split into chunks
-            chunk_files = _chunk_file(input_path, chunk_size, keys, temp_path)
+            runs = len(chunk_files)
+            merge_passes = _merge_passes(runs, plan.fan_in)
+            temp_bytes = sum(path.stat().st_size for path in chunk_files)
 
             # Merge chunks
-            _merge_chunks(chunk_files, output_path, keys, unique)
+            with phases.phase("merge") as phase:
+                written = _merge_chunks(
+                    chunk_files,
+                    output_path,
+                    unique,
+                    keys,
+                    reverse=reverse,
+                    fieldnames=fieldnames,
+                    partitions=partition_options,
+                    checkpoint=checkpoint,
+                    fan_in=plan.fan_in,
+                    sketches=sketches,
+                    **output_options,
+                )
+                phase.records += written
+                phase.bytes_in += temp_bytes
+            if checkpoint is not None:
+                checkpoint.complete()
+
+        # Records read from the input (all of them were merged unless some
+        # were dropped by unique, or the runs come from a checkpoint)
+        read = phases.phases.get("partition") or phases.phases.get("parse")
+        lines_processed = read.records if read else written
     else:
         # In-memory sorting for smaller files
-        with parse_file(input_path) as reader:
-            data = list(reader)
+        with parse_files(input_paths, encoding=encoding, delimiter=delimiter) as reader:
+            with phases.phase("parse") as phase:
+                if instrument.active():
+                    data = list(_report_progress(reader, "read", reader))
+                else:
+                    data = list(reader)
+                phase.records += len(data)
+                phase.bytes_in += file_size
             lines_processed = len(data)
 
-            sorted_data = list(
-                sort_iter(data, keys, stable=stable, reverse=reverse, unique=unique)
-            )
+            with phases.phase("sort") as phase:
+                if unique:
+                    data = _unique_items(data, unique)
 
-            file_format = detect_format(output_path)
-            write_file(output_path, sorted_data, file_format)
+                sorted_data, engine_used = _sort_items(
+                    data, keys, reverse=reverse, engine=engine
+                )
+                phase.records += len(sorted_data)
+
+            if sketches:
+                for column, sketch in sketches.items():
+                    sketch.update(_extract_column(sorted_data, column))
+
+            with phases.phase("write") as phase:
+                phase.records += len(sorted_data)
+                if partition_options:
+                    sort_func = _create_sort_function(keys, reverse)
+                    _write_partitions(
+                        output_path,
+                        zip(map(sort_func, sorted_data), sorted_data),
+                        reader.fieldnames,
+                        total=len(sorted_data),
+                        **partition_options,
+                    )
+                else:
+                    file_format = detect_format(output_path)
+                    write_file(
+                        output_path,
+                        sorted_data,
+                        file_format,
+                        fieldnames=reader.fieldnames,
+                        **output_options,
+                    )
+
+    if cached is None:
+        cardinality = {
+            str(column): sketch.count() for column, sketch in (sketches or {}).items()
+        }
+
+    instrument.flush_failures()
+    instrument.emit(
+        "sort_finished",
+        records=lines_processed,
+        seconds=time.time() - start_time,
+        cached=cached is not None,
+    )
+
+    if cache is not None and cached is None:
+        cache.store(
+            cache_key,
+            result_files,
+            {
+                "lines_processed": lines_processed,
+                "mode": mode,
+                "engine": engine_used,
+                "cardinality": cardinality,
+            },
+        )
 
     if stats:
         end_time = time.time()
+        if partitions:
+            output_size = sum(
+                partition_path(output_path, i).stat().st_size for i in range(partitions)
+            )
+        else:
+            output_size = output_path.stat().st_size
+        for name in ("merge", "write", "sort"):
+            if name in phases.phases:
+                # The phase that wrote the output
+                phases.phases[name].bytes_out = output_size
+                break
         return SortStats(
-            input_file=str(input_path),
+            input_file=", ".join(str(path) for path in input_paths),
             output_file=str(output_path),
             lines_processed=lines_processed,
             processing_time=end_time - start_time,
             input_size=file_size,
-            output_size=output_path.stat().st_size,
+            output_size=output_size,
             external_sort_used=need_external_sort,
+            mode=mode,
+            engine=engine_used,
+            cache=None if cache is None else "miss" if cached is None else "hit",
+            phases=phases.phases,
+            runs=runs,
+            merge_passes=merge_passes,
+            peak_rss=peak_rss(),
+            temp_bytes=temp_bytes,
+            plan=None if plan is None else plan.to_dict(),
+            cardinality=cardinality,
+        )
+
+    return None
+
+
+def _result_files(output_path: Path, partitions: Optional[int] = None) -> List[Path]:
+    """List every file a sort can write, in a fixed order."""
+    outputs = [partition_path(output_path, i) for i in range(partitions or 0)]
+    files = []
+    for path in outputs or [output_path]:
+        files += [path, block_index_path(path)]
+    if partitions:
+        files.append(Path(str(output_path) + MANIFEST_SUFFIX))
+    return files
+
+
+def _cache_description(
+    input_paths: List[Path],
+    output_path: Path,
+    keys: List[SortKey],
+    content_hash: bool = False,
+    partitions: Optional[int] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """Describe what determines the output of a sort, for the result cache."""
+    # Partition manifests name their files, other outputs only depend on
+    # the output format and compression
+    output: Union[str, List[str]]
+    if partitions:
+        output = output_path.name
+    else:
+        output = [detect_format(output_path), output_path.suffix.lower()]
+    return dict(
+        inputs=[input_fingerprint(path, content_hash) for path in input_paths],
+        output=output,
+        keys=[format_key_spec(k) for k in keys],
+        partitions=partitions,
+        **options,
+    )
+
+
+def _job_description(
+    input_paths: List[Path],
+    output_path: Path,
+    keys: List[SortKey],
+    **options: Any,
+) -> Dict[str, Any]:
+    """Describe an external sort job for its checkpoint."""
+    inputs = []
+    for path in input_paths:
+        stat = path.stat()
+        inputs.append([str(path.resolve()), stat.st_size, stat.st_mtime_ns])
+    args = dict(
+        input_path=[str(path) for path in input_paths],
+        output_path=str(output_path),
+        keys=[format_key_spec(k) for k in keys],
+        **options,
+    )
+    return {"args": args, "inputs": inputs}
+
+
+def resume_sort(work_dir: Union[str, Path], stats: bool = False) -> Optional[SortStats]:
+    """
+    Resume an interrupted external sort from its work directory.
+
+    The sort runs again with the arguments recorded in the job manifest;
+    finished runs and merge passes are reused as long as the inputs did not
+    change.
+
+    The work directory is trusted input: runs hold pickled records, and
+    loading a crafted run can execute arbitrary code. Only resume
+    directories written by your own sorts.
+
+    Args:
+        work_dir: Work directory of a sort started with work_dir
+        stats: Return sorting statistics
+
+    Returns:
+        SortStats object if stats=True, None otherwise
+
+    Raises:
+        FileNotFoundError: If the directory holds no unfinished job
+    """
+    args = dict(load_job(work_dir)["args"])
+    args["keys"] = [parse_key_spec(spec) for spec in args["keys"]]
+    return sort_file(mode="external", stats=stats, work_dir=work_dir, **args)
+
+
+def _keyed_sorted_records(
+    records: Iterable[Any], sort_func: Callable[[Any], bytes], path: Path
+) -> Generator[Tuple[bytes, Any], None, None]:
+    """Pair the records of a sorted file with their keys, checking the order."""
+    previous = b""
+    for item in records:
+        sort_key = sort_func(item)
+        if sort_key < previous:
+            raise ValueError(f"'{path}' is not sorted by the given keys")
+        previous = sort_key
+        yield sort_key, item
+
+
+def update_file(
+    sorted_path: Union[str, Path],
+    delta_path: Union[str, Path],
+    keys: List[SortKey],
+    memory_limit: Optional[str] = None,
+    reverse: bool = False,
+    stats: bool = False,
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    compress_level: Optional[int] = None,
+    index: Optional[bool] = None,
+) -> Optional[SortStats]:
+    """
+    Merge new records into a file that is already sorted.
+
+    Only the delta is sorted (into runs, like an external sort); the result
+    is one streaming merge of the runs with the sorted file, which replaces
+    it atomically. Existing records come first among equal keys. The
+    sorted file's order is checked as it is read, and its key index (if
+    any) must have been written for the same keys.
+
+    Args:
+        sorted_path: File sorted by keys, updated in place
+        delta_path: File with the new records, in any order
+        keys: List of SortKey specifications the file is sorted by
+        memory_limit: Memory limit (e.g., '512M') for sorting the delta
+        reverse: Whether the file is sorted in reverse order
+        stats: Return sorting statistics
+        encoding: Input encoding (default: detected)
+        delimiter: Input CSV/TSV delimiter (default: detected)
+        compress_level: Compression level for .gz/.zst files
+        index: Write a key index (default: if the sorted file has one)
+
+    Returns:
+        SortStats object if stats=True, None otherwise
+
+    Example:
+        >>> update_file("events.jsonl", "new_events.jsonl", [key("ts", "num")])
+    """
+    import time
+
+    start_time = time.time()
+    sorted_path = Path(sorted_path)
+    delta_path = Path(delta_path)
+    delta_size = delta_path.stat().st_size
+
+    block_size = None
+    if block_index_path(sorted_path).exists():
+        metadata = BlockIndex(sorted_path).index
+        spec = [format_key_spec(k) for k in keys]
+        if (metadata["keys"], metadata["reverse"]) != (spec, bool(reverse)):
+            raise ValueError(
+                f"'{sorted_path}' is indexed for keys {metadata['keys']} "
+                f"(reverse={metadata['reverse']})"
+            )
+        block_size = metadata["block_size"]
+    if index is None:
+        index = block_size is not None
+
+    output_options = _output_options(
+        sorted_path, keys, reverse, compress_level, index and block_size, index
+    )
+
+    # Same directory (for an atomic replace) and suffixes (for the format)
+    temp_output = sorted_path.with_name(f".update-{sorted_path.name}")
+    chunk_size = parse_memory_size(memory_limit) if memory_limit else 50 * 1024 * 1024
+    sort_func = _create_sort_function(keys, reverse)
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            chunk_files, engines_used, _ = _chunk_file(
+                delta_path,
+                chunk_size,
+                keys,
+                Path(temp_dir),
+                reverse=reverse,
+                encoding=encoding,
+                delimiter=delimiter,
+            )
+            runs = [read_run(chunk_file) for chunk_file in chunk_files]
+
+            try:
+                with parse_file(
+                    sorted_path, encoding=encoding, delimiter=delimiter
+                ) as reader:
+                    existing = _keyed_sorted_records(reader, sort_func, sorted_path)
+                    # Existing records win ties: heapq.merge is stable
+                    merged = heapq.merge(existing, *runs, key=itemgetter(0))
+                    lines_processed = _write_merged(
+                        temp_output, merged, reader.fieldnames, **output_options
+                    )
+            finally:
+                for run in runs:
+                    run.close()
+
+        os.replace(temp_output, sorted_path)
+        if index:
+            os.replace(block_index_path(temp_output), block_index_path(sorted_path))
+        elif block_size is not None:
+            # The old key index no longer matches the file
+            block_index_path(sorted_path).unlink()
+    finally:
+        for path in (temp_output, block_index_path(temp_output)):
+            if path.exists():
+                path.unlink()
+
+    if stats:
+        return SortStats(
+            input_file=str(delta_path),
+            output_file=str(sorted_path),
+            lines_processed=lines_processed,
+            processing_time=time.time() - start_time,
+            input_size=delta_size,
+            output_size=sorted_path.stat().st_size,
+            external_sort_used=True,
+            mode="update",
+            engine=(engines_used.most_common(1)[0][0] if engines_used else "bytes"),
+        )
+
+    return None
+
+
+def merge_files(
+    input_paths: Sequence[Union[str, Path]],
+    output_path: Union[str, Path],
+    keys: List[SortKey],
+    reverse: bool = False,
+    verify: bool = True,
+    stats: bool = False,
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    compress_level: Optional[int] = None,
+    index: bool = False,
+    fan_in: int = MERGE_FAN_IN,
+) -> Optional[SortStats]:
+    """
+    Merge files that are each already sorted into one sorted output.
+
+    The inputs are streamed through a single k-way merge, so each one is
+    read once and nothing is written to disk besides the output. Inputs
+    may mix formats and compression. With more than fan_in inputs, groups
+    of fan_in files are first merged into temporary runs.
+
+    Args:
+        input_paths: Files sorted by keys
+        output_path: Path to output file
+        keys: List of SortKey specifications the inputs are sorted by
+        reverse: Whether the inputs are sorted in reverse order
+        verify: Check that every input is sorted while reading it
+        stats: Return sorting statistics
+        encoding: Input encoding (default: detected)
+        delimiter: Input CSV/TSV delimiter (default: detected)
+        compress_level: Compression level for .gz/.zst output
+        index: Write a key index next to the output (see sort_file)
+        fan_in: Most inputs merged at once
+
+    Returns:
+        SortStats object if stats=True, None otherwise
+
+    Example:
+        >>> merge_files(["a.jsonl.gz", "b.jsonl"], "out.jsonl.gz", [key("ts", "date")])
+    """
+    import time
+
+    start_time = time.time()
+    paths = [Path(path) for path in input_paths]
+    output_path = Path(output_path)
+    if not paths:
+        raise ValueError("No input files to merge")
+    if fan_in < 2:
+        raise ValueError(f"Invalid merge fan-in: {fan_in} (must be at least 2)")
+
+    sort_func = _create_sort_function(keys, reverse)
+    fieldnames = []
+
+    def open_input(
+        stack: ExitStack, path: Path
+    ) -> Generator[Tuple[bytes, Any], None, None]:
+        reader = stack.enter_context(
+            parse_file(path, encoding=encoding, delimiter=delimiter)
+        )
+        # CSV/TSV outputs get the union of the input headers
+        for name in reader.fieldnames or []:
+            if name not in fieldnames:
+                fieldnames.append(name)
+        if verify:
+            return _keyed_sorted_records(reader, sort_func, path)
+        return ((sort_func(item), item) for item in reader)
+
+    with ExitStack() as stack:
+        if len(paths) <= fan_in:
+            sources = [open_input(stack, path) for path in paths]
+        else:
+            temp_path = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+            run_files: List[Path] = []
+            for i in range(0, len(paths), fan_in):
+                with ExitStack() as group_stack:
+                    group = [
+                        open_input(group_stack, path) for path in paths[i : i + fan_in]
+                    ]
+                    run_file = temp_path / f"input_{len(run_files):06d}{RUN_SUFFIX}"
+                    run_files.append(_merge_pass(group, run_file))
+            sources = [read_run(f) for f in _reduce_runs(run_files, fan_in)]
+            for source in sources:
+                stack.callback(source.close)
+
+        lines_processed = _write_merged(
+            output_path,
+            heapq.merge(*sources, key=itemgetter(0)),
+            fieldnames or None,
+            **_output_options(output_path, keys, reverse, compress_level, index=index),
+        )
+
+    if stats:
+        return SortStats(
+            input_file=", ".join(str(path) for path in paths),
+            output_file=str(output_path),
+            lines_processed=lines_processed,
+            processing_time=time.time() - start_time,
+            input_size=sum(path.stat().st_size for path in paths),
+            output_size=output_path.stat().st_size,
+            external_sort_used=len(paths) > fan_in,
+            mode="merge",
+            engine="bytes",
         )
 
     return None
@@ -0,0 +1,183 @@
+"""
+Order-preserving binary key encoding for sortdx.
+
+Every sort key component is encoded into bytes whose lexicographic order
+matches the order of the values. Components are self-delimiting, so a
+multi-key specification collapses into a single bytes object that can be
+compared with one memcmp, stored in run files and inverted byte-wise for
+descending order.
+"""
+
+import datetime
+import re
+import struct
+from typing import Any, Callable, List
+
+_INVERT = bytes(range(255, -1, -1))
+_FLOAT = struct.Struct(">d")
+_UINT64 = struct.Struct(">Q")
+_SIGN_BIT = 1 << 63
+_ALL_BITS = (1 << 64) - 1
+_EXACT_INT = 1 << 53
+_MAX_INT_BYTES = 127
+_INFINITIES = (float("inf"), float("-inf"))
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+# Empty and unparsable dates sort like 1900-01-01, matching _convert_value
+DATE_FILL = (datetime.datetime(1900, 1, 1) - _EPOCH) // _MICROSECOND
+
+_STRING_END = b"\x00\x00"
+_NATURAL_END = b"\x00"
+_NATURAL_NUMBER = b"\x01"
+_NATURAL_TEXT = b"\x02"
+_DIGITS = re.compile(r"(\d+)")
+
+
+def invert(encoded: bytes) -> bytes:
+    """Invert every byte, reversing the order of an encoded component."""
+    return encoded.translate(_INVERT)
+
+
+def encode_int(value: int) -> bytes:
+    """
+    Encode an integer of any size.
+
+    A length byte centred on 0x80 orders values by sign and magnitude,
+    followed by the big-endian magnitude (one's complement for negatives).
+
+    Example:
+        >>> encode_int(-1) < encode_int(0) < encode_int(255) < encode_int(256)
+        True
+    """
+    if value == 0:
+        return b"\x80"
+
+    magnitude = abs(value)
+    length = min((magnitude.bit_length() + 7) // 8, _MAX_INT_BYTES)
+    magnitude = min(magnitude, (1 << (8 * length)) - 1)
+
+    if value > 0:
+        return bytes([0x80 + length]) + magnitude.to_bytes(length, "big")
+    complement = (1 << (8 * length)) - 1 - magnitude
+    return bytes([0x80 - length]) + complement.to_bytes(length, "big")
+
+
+def _encode_float(
+    value: float, _pack=_FLOAT.pack, _unpack=_UINT64.unpack, _pack_bits=_UINT64.pack
+) -> bytes:
+    """Encode a double as 8 bytes with IEEE 754 sign handling."""
+    if value != value:
+        # Canonical NaN sorts after +inf
+        return b"\xff\xf8\x00\x00\x00\x00\x00\x00"
+    # -0.0 and 0.0 compare equal
+    bits = _unpack(_pack(value + 0.0))[0]
+    encoded: bytes = _pack_bits(
+        bits ^ _ALL_BITS if bits & _SIGN_BIT else bits | _SIGN_BIT
+    )
+    return encoded
+
+
+def encode_number(value: Any) -> bytes:
+    """
+    Encode an int or float so that mixed numbers compare numerically.
+
+    The value's nearest double comes first; integers that a double cannot
+    represent exactly carry the remainder in a trailing encode_int, so
+    large integer IDs keep their exact order.
+    """
+    if isinstance(value, int) and not -_EXACT_INT <= value <= _EXACT_INT:
+        try:
+            approx = float(value)
+        except OverflowError:
+            approx = float("inf") if value > 0 else float("-inf")
+        remainder = value - int(approx) if approx not in _INFINITIES else 0
+        return _encode_float(approx) + encode_int(remainder)
+    return _encode_float(float(value)) + b"\x80"
+
+
+def encode_str(value: str) -> bytes:
+    """
+    Encode a string as escaped UTF-8 with a terminator.
+
+    NUL bytes are escaped as 00 FF and the string ends with 00 00, so no
+    encoding is a prefix of another and shorter strings sort first.
+    """
+    return (
+        value.encode("utf-8", "surrogatepass").replace(b"\x00", b"\x00\xff")
+        + _STRING_END
+    )
+
+
+def encode_natural(value: str) -> bytes:
+    """
+    Encode a string for natural ordering ('file2' < 'file10').
+
+    Digit runs are encoded as integers and the text between them as
+    strings; a number sorts before text at the same position.
+    """
+    parts = []
+    for i, part in enumerate(_DIGITS.split(value)):
+        if not part:
+            continue
+        if i % 2:
+            parts.append(_NATURAL_NUMBER + encode_int(int(part)))
+        else:
+            parts.append(_NATURAL_TEXT + encode_str(part))
+    parts.append(_NATURAL_END)
+    return b"".join(parts)
+
+
+def datetime_to_micros(value: Any) -> int:
+    """
+    Convert a converted date value to microseconds since the epoch.
+
+    Timezone-aware values are normalized to UTC, naive values are taken as
+    UTC and bare numbers as epoch seconds. Anything else maps to DATE_FILL.
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        delta: datetime.timedelta = value - _EPOCH
+        return delta // _MICROSECOND
+    if isinstance(value, datetime.date):
+        return (datetime.datetime.combine(value, datetime.time()) - _EPOCH) // (
+            _MICROSECOND
+        )
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if value != value or value in _INFINITIES:
+            return DATE_FILL
+        return int(value * 1_000_000)
+    return DATE_FILL
+
+
+def encode_datetime(value: Any) -> bytes:
+    """Encode a converted date value by its microsecond timestamp."""
+    return encode_int(datetime_to_micros(value))
+
+
+def dictionary_ranks(values: List[Any], encode: Callable[[Any], bytes]) -> List[int]:
+    """
+    Dictionary-encode a key column into order-preserving integer ranks.
+
+    Each distinct value is encoded once; values are then replaced by the
+    rank of their encoded key among the distinct keys, so equal keys get
+    equal ranks and comparing ranks gives the same order as comparing the
+    encoded keys.
+
+    Args:
+        values: Hashable raw values of one key column
+        encode: Segment encoder for the key (including desc inversion)
+
+    Returns:
+        One rank per value
+
+    Example:
+        >>> dictionary_ranks(["b", "a", "b"], encode_str)
+        [1, 0, 1]
+    """
+    encoded = {value: encode(value) for value in set(values)}
+    rank_of = {k: i for i, k in enumerate(sorted(set(encoded.values())))}
+    ranks = {value: rank_of[k] for value, k in encoded.items()}
+    return [ranks[value] for value in values]
@@ -0,0 +1,481 @@
+"""
+Vectorized sort engines for sortdx.
+
+This module provides NumPy-backed orderings for key columns that can be
+represented as typed arrays. Key columns are bulk-converted to int64/float64
+arrays and ordered with stable NumPy sorts, so records are permuted once
+instead of being compared as Python tuples.
+
+Integer, date and short string keys can also be encoded into fixed-width
+unsigned keys and ordered with an LSD radix sort.
+"""
+
+import itertools
+import warnings
+from array import array
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from .encoding import DATE_FILL, datetime_to_micros
+
+# Handle optional numpy dependency
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Key types that can be converted to typed arrays
+VECTOR_TYPES = ("num", "date")
+
+# Key types that can be encoded as fixed-width radix keys
+RADIX_TYPES = ("num", "date", "str")
+
+# Longest string (in UTF-8 bytes) encoded as a fixed-width radix code
+RADIX_MAX_CODE_WIDTH = 16
+
+# Radix sort is only chosen automatically up to this many 16-bit passes
+RADIX_MAX_PASSES = 8
+
+_SIGN_BIT = 1 << 63
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+_INVERT = bytes(range(255, -1, -1))
+
+
+def _require_numpy() -> None:
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy not installed. Install with: pip install numpy")
+
+
+def _parse_joined(values: List[str], dtype: Any) -> Optional["np.ndarray"]:
+    """
+    Parse a list of numeric strings in a single C-level pass.
+
+    Returns None if any value is empty, malformed, out of range, not finite
+    or holds a comma, so the caller can fall back to a slower conversion.
+    """
+    joined = ",".join(values)
+    if joined.count(",") != len(values) - 1:
+        # A value with a comma would be split into several numbers
+        return None
+    try:
+        with warnings.catch_warnings():
+            # Older NumPy only warns about trailing unparsed data
+            warnings.simplefilter("error")
+            parsed = np.fromstring(joined, dtype=dtype, sep=",")
+    except (ValueError, DeprecationWarning):
+        return None
+
+    if len(parsed) != len(values):
+        return None
+    if dtype == np.float64 and not np.isfinite(parsed).all():
+        # 'nan' and 'inf' parse here, but _convert_value rejects them
+        return None
+    if dtype == np.int64:
+        # Out-of-range integers saturate instead of failing
+        limits = np.iinfo(np.int64)
+        if (parsed == limits.max).any() or (parsed == limits.min).any():
+            return None
+    return parsed
+
+
+def _report_blanks(
+    values: List[Any], blank: "np.ndarray", on_error: Optional[Callable[[Any], None]]
+) -> None:
+    """Pass the flagged values that are not empty (e.g. spaces) to on_error."""
+    if on_error is not None:
+        for value in itertools.compress(values, blank):
+            if value:
+                on_error(value)
+
+
+def numeric_column(
+    values: List[Any],
+    convert: Callable[..., Any],
+    on_error: Optional[Callable[[Any], None]] = None,
+) -> Tuple["np.ndarray", Optional["np.ndarray"]]:
+    """
+    Bulk-convert the raw values of a 'num' key into a typed array.
+
+    Args:
+        values: Raw extracted values
+        convert: Scalar converter used when bulk conversion fails, called
+            as convert(value, 'num', on_error=on_error)
+        on_error: Called with each value that fails to convert, like
+            _convert_value does
+
+    Returns:
+        (values, missing) where values is an int64 or float64 array and
+        missing flags empty values of an int64 column (None if there are
+        none). Empty values of float64 columns are stored as -inf.
+    """
+    _require_numpy()
+
+    if values and all(isinstance(v, str) for v in values):
+        for dtype in (np.int64, np.float64):
+            parsed = _parse_joined(values, dtype)
+            if parsed is not None:
+                return parsed, None
+
+        # Slower vectorized path that also handles empty values
+        text = np.char.strip(np.array(values, dtype=str))
+        missing = text == ""
+        filled = np.where(missing, "0", text)
+        try:
+            ints = filled.astype(np.int64)
+            _report_blanks(values, missing, on_error)
+            return ints, (missing if missing.any() else None)
+        except (ValueError, OverflowError):
+            pass
+        try:
+            floats = filled.astype(np.float64)
+            if np.isfinite(floats).all():
+                floats[missing] = -np.inf
+                _report_blanks(values, missing, on_error)
+                return floats, None
+        except ValueError:
+            pass
+    elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        array = np.array(values)
+        if array.dtype in (np.int64, np.float64):
+            return array, None
+
+    # Scalar fallback: same semantics as _convert_value ('-inf' for failures)
+    converted = [convert(v, "num", on_error=on_error) for v in values]
+    try:
+        array = np.array(converted)
+    except OverflowError:
+        array = np.array(converted, dtype=object)
+    if array.dtype not in (np.int64, np.float64):
+        array = np.array([float(v) for v in converted], dtype=np.float64)
+    return array, None
+
+
+def date_column(
+    values: List[Any],
+    convert: Callable[..., Any],
+    on_error: Optional[Callable[[Any], None]] = None,
+) -> Tuple["np.ndarray", None]:
+    """
+    Bulk-convert the raw values of a 'date' key into int64 microseconds.
+
+    ISO 8601 strings are parsed by NumPy; anything else goes through the
+    scalar converter. Timezone-aware values are normalized to UTC, naive
+    values are taken as UTC. Values that fail to convert are passed to
+    on_error (see numeric_column).
+    """
+    _require_numpy()
+
+    if all(isinstance(v, str) for v in values):
+        try:
+            with warnings.catch_warnings():
+                # NumPy warns when parsing explicit timezone offsets
+                warnings.simplefilter("ignore")
+                parsed = np.array(values, dtype="datetime64[us]")
+            micros = parsed.astype(np.int64)
+            nat = np.isnat(parsed)
+            micros[nat] = DATE_FILL
+            _report_blanks(values, nat, on_error)
+            return micros, None
+        except (ValueError, OverflowError):
+            pass
+
+    converted = [
+        datetime_to_micros(convert(v, "date", on_error=on_error)) for v in values
+    ]
+    return np.array(converted, dtype=np.int64), None
+
+
+def _descending(values: "np.ndarray") -> "np.ndarray":
+    """Return an order-reversing transform of a key array."""
+    if values.dtype == np.int64:
+        # Bitwise not is order-reversing and cannot overflow
+        return ~values
+    return -values
+
+
+def numpy_sort_order(
+    columns: List[List[Any]],
+    data_types: List[str],
+    descending: List[bool],
+    convert: Callable[..., Any],
+    on_error: Optional[Sequence[Optional[Callable[[Any], None]]]] = None,
+) -> "np.ndarray":
+    """
+    Compute a stable sort order for records from their key columns.
+
+    Args:
+        columns: One list of raw values per sort key
+        data_types: Data type of each key ('num' or 'date')
+        descending: Whether each key sorts in descending order
+        convert: Scalar converter used when bulk conversion fails
+        on_error: Conversion failure callback of each key (see
+            numeric_column)
+
+    Returns:
+        Array of record indices in sorted order
+    """
+    _require_numpy()
+
+    sort_columns = []
+    callbacks = on_error or [None] * len(columns)
+    for values, data_type, desc, failed in zip(
+        columns, data_types, descending, callbacks
+    ):
+        if data_type == "num":
+            array, missing = numeric_column(values, convert, failed)
+        elif data_type == "date":
+            array, missing = date_column(values, convert, failed)
+        else:
+            raise ValueError(f"NumPy engine does not support '{data_type}' keys")
+
+        # Missing values sort first, or last for descending keys
+        if missing is not None:
+            sort_columns.append(missing if desc else ~missing)
+        elif desc and array.dtype == np.float64:
+            # NaN sorts after +inf, so it comes first in descending order
+            nan = np.isnan(array)
+            if nan.any():
+                sort_columns.append(~nan)
+        sort_columns.append(_descending(array) if desc else array)
+
+    if len(sort_columns) == 1:
+        return np.argsort(sort_columns[0], kind="stable")
+
+    # lexsort treats the last array as the primary key
+    return np.lexsort(sort_columns[::-1])
+
+
+def _int_key_bytes(values: "np.ndarray") -> "np.ndarray":
+    """Encode int64 values as sign-flipped big-endian bytes, shape (n, 8)."""
+    unsigned = values.view(np.uint64) ^ np.uint64(_SIGN_BIT)
+    key_bytes: "np.ndarray" = unsigned.astype(">u8").view(np.uint8)
+    return key_bytes.reshape(len(values), 8)
+
+
+def _string_codes(values: List[Any], convert: Callable[..., Any]) -> Any:
+    """Encode short strings as NUL-padded lowercase UTF-8 codes, or None."""
+    encoded = [str(convert(v, "str")).lower().encode("utf-8") for v in values]
+    width = max((len(code) for code in encoded), default=0)
+    if width > RADIX_MAX_CODE_WIDTH:
+        return None
+    return encoded, max(width, 1)
+
+
+def radix_key_bytes(
+    columns: List[List[Any]],
+    data_types: List[str],
+    descending: List[bool],
+    convert: Callable[..., Any],
+    on_error: Optional[Sequence[Optional[Callable[[Any], None]]]] = None,
+) -> Optional["np.ndarray"]:
+    """
+    Encode key columns into one fixed-width unsigned key per record.
+
+    Integers and dates become sign-flipped big-endian int64 bytes, strings
+    become NUL-padded codes, and descending keys are bit-inverted, so
+    comparing the rows as unsigned byte strings gives the sort order.
+
+    Conversion failures are passed to the on_error callback of their key
+    (see numeric_column).
+
+    Returns:
+        uint8 array of shape (n, width), or None if a column holds floats,
+        unparsable numbers or strings longer than RADIX_MAX_CODE_WIDTH
+    """
+    _require_numpy()
+
+    blocks = []
+    callbacks = on_error or [None] * len(columns)
+    for values, data_type, desc, failed in zip(
+        columns, data_types, descending, callbacks
+    ):
+        missing = None
+        if data_type == "num":
+            numbers, missing = numeric_column(values, convert, failed)
+            if numbers.dtype != np.int64:
+                return None
+            block = _int_key_bytes(numbers)
+        elif data_type == "date":
+            block = _int_key_bytes(date_column(values, convert, failed)[0])
+        elif data_type == "str":
+            codes = _string_codes(values, convert)
+            if codes is None:
+                return None
+            encoded, width = codes
+            block = (
+                np.array(encoded, dtype=f"S{width}")
+                .view(np.uint8)
+                .reshape(len(values), width)
+            )
+        else:
+            return None
+
+        if missing is not None:
+            # Leading flag byte: missing values sort before present ones
+            flag = (~missing).astype(np.uint8).reshape(len(values), 1)
+            block = np.hstack([flag, block])
+        if desc:
+            block = ~block
+        blocks.append(block)
+
+    return np.hstack(blocks)
+
+
+def radix_passes(key_bytes: "np.ndarray") -> List["np.ndarray"]:
+    """
+    Split fixed-width keys into 16-bit digits that actually vary.
+
+    Digits are returned least significant first. Constant digits cannot
+    change the order and are skipped.
+    """
+    rows, width = key_bytes.shape
+    if width % 2:
+        key_bytes = np.hstack([key_bytes, np.zeros((rows, 1), dtype=np.uint8)])
+    words = np.ascontiguousarray(key_bytes).view(">u2").astype(np.uint16)
+
+    digits = []
+    for position in range(words.shape[1] - 1, -1, -1):
+        digit = words[:, position]
+        if rows and not (digit == digit[0]).all():
+            digits.append(digit)
+    return digits
+
+
+def radix_sort_order(digits: List["np.ndarray"], rows: int) -> "np.ndarray":
+    """
+    LSD radix sort over 16-bit digits.
+
+    NumPy's stable sort is a counting radix sort for 16-bit integers, so
+    each pass is linear in the number of records.
+    """
+    order = np.arange(rows)
+    for digit in digits:
+        order = order[np.argsort(digit[order], kind="stable")]
+    return order
+
+
+def _python_radix_keys(
+    columns: List[List[Any]],
+    data_types: List[str],
+    descending: List[bool],
+    convert: Callable[..., Any],
+    on_error: Optional[Sequence[Optional[Callable[[Any], None]]]] = None,
+) -> Optional[List[bytes]]:
+    """Encode fixed-width radix keys without NumPy, or None if ineligible."""
+    blocks = []
+    callbacks = on_error or [None] * len(columns)
+    for values, data_type, desc, failed in zip(
+        columns, data_types, descending, callbacks
+    ):
+        if data_type == "str":
+            codes = _string_codes(values, convert)
+            if codes is None:
+                return None
+            encoded, width = codes
+            block = [code.ljust(width, b"\0") for code in encoded]
+        else:
+            block = []
+            for value in values:
+                converted = convert(value, data_type, on_error=failed)
+                if data_type == "date":
+                    converted = datetime_to_micros(converted)
+                if converted == float("-inf"):
+                    block.append(b"\0" + bytes(8))
+                    continue
+                if isinstance(converted, float) or not (
+                    _INT64_MIN <= converted <= _INT64_MAX
+                ):
+                    return None
+                block.append(b"\1" + (converted + _SIGN_BIT).to_bytes(8, "big"))
+        if desc:
+            block = [code.translate(_INVERT) for code in block]
+        blocks.append(block)
+
+    return [b"".join(parts) for parts in zip(*blocks)]
+
+
+def _report_failures(
+    failures: List[List[Any]],
+    on_error: Optional[Sequence[Optional[Callable[[Any], None]]]],
+) -> None:
+    """Pass held back conversion failures to the callbacks of their keys."""
+    for values, callback in zip(failures, on_error or []):
+        if callback is not None:
+            for value in values:
+                callback(value)
+
+
+def python_radix_sort_order(keys: List[bytes]) -> array:
+    """LSD radix sort of equal-length byte keys using array buffers."""
+    order = array("q", range(len(keys)))
+    width = len(keys[0]) if keys else 0
+
+    for position in range(width - 1, -1, -1):
+        buckets = [array("q") for _ in range(256)]
+        for index in order:
+            buckets[keys[index][position]].append(index)
+        if sum(1 for bucket in buckets if bucket) == 1:
+            continue
+        order = array("q")
+        for bucket in buckets:
+            order.extend(bucket)
+    return order
+
+
+def vector_sort_order(
+    columns: List[List[Any]],
+    data_types: List[str],
+    descending: List[bool],
+    convert: Callable[..., Any],
+    engine: str = "auto",
+    on_error: Optional[Sequence[Optional[Callable[[Any], None]]]] = None,
+) -> Tuple[Optional[List[int]], str]:
+    """
+    Order records with the best applicable vectorized engine.
+
+    Args:
+        columns: One list of raw values per sort key
+        data_types: Data type of each key
+        descending: Whether each key sorts in descending order
+        convert: Scalar converter used when bulk conversion fails
+        engine: 'radix', 'numpy', or 'auto' to prefer radix when the keys
+            encode to at most RADIX_MAX_PASSES varying 16-bit digits. Keys
+            without a fixed-width encoding (floats, long strings) fall back
+            from 'radix' to 'numpy' where possible
+        on_error: Conversion failure callback of each key (see
+            numeric_column); failures are reported once, by the engine that
+            sorts
+
+    Returns:
+        (order, engine) tuple. order is None when no vectorized engine
+        applies and the caller should fall back to tuple sorting.
+    """
+    rows = len(columns[0]) if columns else 0
+
+    if engine in ("auto", "radix") and all(t in RADIX_TYPES for t in data_types):
+        # Hold back failures until radix is known to sort the records
+        failures: List[List[Any]] = [[] for _ in columns]
+        held = [f.append for f in failures] if on_error else None
+        if NUMPY_AVAILABLE:
+            key_bytes = radix_key_bytes(columns, data_types, descending, convert, held)
+            if key_bytes is not None:
+                digits = radix_passes(key_bytes)
+                if engine == "radix" or len(digits) <= RADIX_MAX_PASSES:
+                    _report_failures(failures, on_error)
+                    return radix_sort_order(digits, rows).tolist(), "radix"
+        elif engine == "radix":
+            keys = _python_radix_keys(columns, data_types, descending, convert, held)
+            if keys is not None:
+                _report_failures(failures, on_error)
+                return python_radix_sort_order(keys).tolist(), "radix"
+
+        # Floats and long strings have no fixed-width radix key
+        engine = "auto"
+
+    if NUMPY_AVAILABLE and all(t in VECTOR_TYPES for t in data_types):
+        order = numpy_sort_order(columns, data_types, descending, convert, on_error)
+        return order.tolist(), "numpy"
+
+    return None, "tuple"
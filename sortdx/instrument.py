@@ -0,0 +1,146 @@
+"""
+Event hooks and profiling for sortdx.
+
+Callbacks registered with add_hook() (or passed as sort_file(...,
+on_event=callback)) receive an Event for each step of a sort:
+
+    sort_started, sort_finished
+    run_started, run_finished         sorted runs of external sorts
+    runs_resumed                      runs (and their records) recorded
+                                      by the checkpoint of a resumed sort
+    merge_pass_started, merge_pass_finished
+    merge_started, merge_finished     final merge into the output
+    progress                          every PROGRESS_INTERVAL records read
+                                      (with bytes_read of the input files)
+                                      or merged, and after every run
+    conversion_failures               values per key that could not be
+                                      converted (e.g. 'num' values sorted
+                                      as -inf), after every run or sort
+
+Without hooks emit() returns at once and no per-record work is done, so
+instrumentation costs nothing unless it is used. Worker processes do not
+forward their events.
+"""
+
+import cProfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+PROGRESS_INTERVAL = 100_000
+
+_hooks: List[Callable[["Event"], None]] = []
+_failures: Counter = Counter()
+
+
+@dataclass
+class Event:
+    """
+    Structured event passed to hooks.
+
+    Attributes:
+        name: Event name (e.g. 'run_finished')
+        time: Time of the event (time.time())
+        data: Event fields (e.g. run path, records, bytes)
+    """
+
+    name: str
+    time: float
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+def add_hook(callback: Callable[[Event], None]) -> None:
+    """Register a callback for all events."""
+    _hooks.append(callback)
+
+
+def remove_hook(callback: Callable[[Event], None]) -> None:
+    """Unregister a callback added with add_hook()."""
+    _hooks.remove(callback)
+
+
+def clear_hooks() -> None:
+    """Unregister every callback (e.g. in worker processes)."""
+    _hooks.clear()
+    _failures.clear()
+
+
+@contextmanager
+def hook(callback: Callable[[Event], None]) -> Iterator[None]:
+    """
+    Register a callback for the duration of a with block.
+
+    Example:
+        >>> with hook(lambda event: print(event.name, event.data)):
+        ...     sort_file("data.jsonl", "sorted.jsonl", [key("ts", "num")])
+    """
+    add_hook(callback)
+    try:
+        yield
+    finally:
+        remove_hook(callback)
+
+
+@contextmanager
+def suspended() -> Iterator[None]:
+    """Stop sending events (and counting failures) for a with block."""
+    hooks = list(_hooks)
+    _hooks.clear()
+    try:
+        yield
+    finally:
+        _hooks[:] = hooks
+
+
+def active() -> bool:
+    """Check whether any hook is registered."""
+    return bool(_hooks)
+
+
+def emit(name: str, **data: Any) -> None:
+    """Send an event to every registered hook."""
+    if not _hooks:
+        return
+    event = Event(name, time.time(), data)
+    for callback in list(_hooks):
+        callback(event)
+
+
+def conversion_counter(column: Union[str, int]) -> Optional[Callable[[Any], None]]:
+    """
+    Get a callback counting conversion failures of a key, or None without
+    hooks. Counts are sent by flush_failures().
+    """
+    if not _hooks:
+        return None
+
+    def failed(value: Any) -> None:
+        _failures[column] += 1
+
+    return failed
+
+
+def flush_failures() -> None:
+    """Emit the conversion failures counted since the last flush."""
+    if _failures:
+        failures = {str(column): count for column, count in _failures.items()}
+        _failures.clear()
+        emit("conversion_failures", failures=failures)
+
+
+@contextmanager
+def profiled(output_path: Union[str, Path]) -> Iterator[cProfile.Profile]:
+    """
+    Profile a with block with cProfile and dump the statistics to a file
+    (readable with pstats or snakeviz).
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(output_path))
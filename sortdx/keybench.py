@@ -0,0 +1,172 @@
+"""
+Key conversion costs measured on sample records.
+
+Extracting and converting key values is where most of a sort's CPU time
+goes. bench_keys() times each step of the key path for every sort key on
+records from the actual input, counts the values that fell back to a
+default (e.g. 'num' values sorted as -inf), and reports the engine that
+would sort them, so key specs can be tuned before a full run.
+"""
+
+import itertools
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Sequence, Union
+
+from .core import (
+    _convert_value,
+    _dictionary_flags,
+    _extract_column,
+    _item_sampler,
+    _segment_encoder,
+    _select_engine,
+    _sort_items,
+    _string_transform,
+)
+from .parsers import expand_inputs, parse_files
+from .utils import SortKey
+
+DEFAULT_SAMPLE_SIZE = 10_000
+
+
+@dataclass
+class KeyCost:
+    """
+    Cost and value statistics of one sort key.
+
+    Attributes:
+        column: Key column
+        data_type: Key type
+        extract_ns: Nanoseconds per record to extract the value
+        convert_ns: Nanoseconds per record to convert the value
+            (_convert_value, as used by the vectorized engines)
+        encode_ns: Nanoseconds per record to build the binary key segment
+            (conversion included, as used by external sorts)
+        failures: Values that could not be converted and sort as the
+            default (-inf for 'num', 1900-01-01 for 'date')
+        empty: Missing or empty values, which also sort as the default
+        distinct: Distinct values in the sample (None if unhashable)
+        dictionary: Whether the key would be dictionary-encoded
+        notes: Other fallbacks (e.g. an unavailable locale)
+    """
+
+    column: Union[str, int]
+    data_type: str
+    extract_ns: float = 0.0
+    convert_ns: float = 0.0
+    encode_ns: float = 0.0
+    failures: int = 0
+    empty: int = 0
+    distinct: Optional[int] = None
+    dictionary: bool = False
+    notes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class KeyBenchReport:
+    """
+    Result of bench_keys().
+
+    Attributes:
+        records: Records sampled
+        keys: Cost of each sort key
+        engine: Engine chosen for the keys before seeing values
+        sample_engine: Engine that sorted the sample (vectorized engines
+            can fall back once they see the values)
+        sort_ns: Nanoseconds per record to sort the sample
+    """
+
+    records: int
+    keys: List[KeyCost]
+    engine: str
+    sample_engine: str
+    sort_ns: float
+
+
+def _per_record(function: Callable[[], Any], records: int) -> float:
+    """Time a function and get nanoseconds per record."""
+    start = time.perf_counter_ns()
+    function()
+    return (time.perf_counter_ns() - start) / max(1, records)
+
+
+def _key_cost(items: List[Any], sort_key: SortKey, dictionary: bool) -> KeyCost:
+    column, data_type = sort_key.column, sort_key.data_type
+    cost = KeyCost(column, data_type, dictionary=dictionary)
+    records = len(items)
+
+    cost.extract_ns = _per_record(lambda: _extract_column(items, column), records)
+    values = _extract_column(items, column)
+
+    failed: List[Any] = []
+    locale_name = sort_key.locale_name
+    cost.convert_ns = _per_record(
+        lambda: [
+            _convert_value(value, data_type, locale_name, failed.append)
+            for value in values
+        ],
+        records,
+    )
+    cost.failures = len(failed)
+    cost.empty = sum(1 for value in values if value is None or value == "")
+
+    encode = _segment_encoder(sort_key, sort_key.desc)
+    cost.encode_ns = _per_record(lambda: [encode(value) for value in values], records)
+
+    try:
+        cost.distinct = len(set(values))
+    except TypeError:
+        cost.distinct = None
+
+    if data_type == "str" and locale_name:
+        if _string_transform(sort_key) is str.lower:
+            cost.notes.append(f"locale '{locale_name}' unavailable, using str.lower")
+    return cost
+
+
+def bench_keys(
+    input_path: Union[str, Path, Sequence[Union[str, Path]]],
+    keys: List[SortKey],
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+) -> KeyBenchReport:
+    """
+    Measure the key conversion costs of the first records of an input.
+
+    Args:
+        input_path: Path to input file, or a list of paths and glob patterns
+        keys: List of SortKey specifications
+        sample_size: Records to sample
+        encoding: Input encoding (default: detected)
+        delimiter: Input CSV/TSV delimiter (default: detected)
+
+    Returns:
+        KeyBenchReport with one KeyCost per key
+
+    Example:
+        >>> report = bench_keys("data.csv", [key("price", "num")])
+        >>> report.keys[0].failures, report.engine
+        (12, 'numpy')
+    """
+    input_paths = expand_inputs(input_path)
+    with parse_files(input_paths, encoding=encoding, delimiter=delimiter) as reader:
+        items = list(itertools.islice(reader, sample_size))
+
+    dictionary = _dictionary_flags(keys, _item_sampler(items, keys))
+    costs = [
+        _key_cost(items, sort_key, flag) for sort_key, flag in zip(keys, dictionary)
+    ]
+
+    start = time.perf_counter_ns()
+    _, sample_engine = _sort_items(items, keys)
+    sort_ns = (time.perf_counter_ns() - start) / max(1, len(items))
+
+    return KeyBenchReport(
+        records=len(items),
+        keys=costs,
+        engine=_select_engine(keys, None, dictionary),
+        sample_engine=sample_engine,
+        sort_ns=sort_ns,
+    )
@@ -6,11 +6,33 @@ CSV, TSV, JSONL, plain text, and compressed files.
 """
 
 import csv
+import glob
 import gzip
+import io
+import itertools
 import json
+import mmap
+import pickle
+import queue
+import struct
+import threading
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterator, Union
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    Union,
+)
 
 try:
     import chardet
@@ -31,6 +53,26 @@ try:
 except ImportError:
     ZSTD_AVAILABLE = False
 
+COMPRESSED_SUFFIXES = (".gz", ".gzip", ".zst", ".zstd")
+
+# Run files: length-prefixed (encoded key, pickled record) frames
+RUN_SUFFIX = ".run"
+_RUN_FRAME = struct.Struct(">II")
+_RUN_BUFFER_SIZE = 1024 * 1024
+
+# Bytes read once to detect encoding and CSV dialect
+PROBE_SAMPLE_SIZE = 8192
+_READ_BUFFER_SIZE = 256 * 1024
+_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Output compression: gzip level 9 is several times slower than 6 for a
+# few percent of size; zstd compresses on all cores (threads=-1)
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_ZSTD_LEVEL = 3
+GZIP_LEVELS = range(0, 10)
+ZSTD_LEVELS = range(-7, 23)
+_PENDING_CHUNKS = 4
+
 
 def detect_format(file_path: Union[str, Path]) -> str:
     """
@@ -64,7 +106,19 @@ def detect_format(file_path: Union[str, Path]) -> str:
         return "txt"
 
 
-def detect_encoding(file_path: Path, sample_size: int = 8192) -> str:
+def _encoding_from_sample(sample: bytes) -> str:
+    """Detect an encoding from a byte sample (defaults to 'utf-8')."""
+    detection = chardet.detect(sample)
+    encoding = detection.get("encoding", "utf-8")
+
+    # Fallback to utf-8 if detection failed or confidence is low
+    if not encoding or detection.get("confidence", 0) < 0.7:
+        encoding = "utf-8"
+
+    return encoding
+
+
+def detect_encoding(file_path: Path, sample_size: int = PROBE_SAMPLE_SIZE) -> str:
     """
     Detect file encoding using chardet.
 
@@ -80,14 +134,7 @@ def detect_encoding(file_path: Path, sample_size: int = 8192) -> str:
         with opener(file_path, "rb") as f:
             sample = f.read(sample_size)
 
-        detection = chardet.detect(sample)
-        encoding = detection.get("encoding", "utf-8")
-
-        # Fallback to utf-8 if detection failed or confidence is low
-        if not encoding or detection.get("confidence", 0) < 0.7:
-            encoding = "utf-8"
-
-        return encoding
+        return _encoding_from_sample(sample)
     except Exception:
         return "utf-8"
 
@@ -103,11 +150,35 @@ def _get_file_opener(file_path: Path):
             raise ImportError(
                 "zstandard not installed. Install with: pip install zstandard"
             )
-        return lambda path, mode: zstd.open(path, mode)
+        return lambda path, mode, **kwargs: zstd.open(path, mode, **kwargs)
     else:
         return open
 
 
+def _delimiter_from_sample(sample_lines: List[str]) -> str:
+    """Detect a CSV delimiter from the first lines of a file."""
+    if not sample_lines:
+        return ","
+
+    sample = "".join(sample_lines)
+
+    # Use csv.Sniffer to detect delimiter
+    sniffer = csv.Sniffer()
+    try:
+        dialect = sniffer.sniff(sample, delimiters=",;\t|")
+        return dialect.delimiter
+    except csv.Error:
+        # Fallback to manual detection
+        delimiters = [",", ";", "\t", "|"]
+        line = sample_lines[0].strip()
+
+        delimiter_counts = {delim: line.count(delim) for delim in delimiters}
+
+        # Return delimiter with highest count
+        best_delim = max(delimiters, key=delimiter_counts.__getitem__)
+        return best_delim if delimiter_counts[best_delim] > 0 else ","
+
+
 def detect_csv_delimiter(file_path: Path, encoding: str = "utf-8") -> str:
     """
     Detect CSV delimiter by analyzing the first few lines.
@@ -131,49 +202,160 @@ def detect_csv_delimiter(file_path: Path, encoding: str = "utf-8") -> str:
                     break
                 sample_lines.append(line)
 
-            if not sample_lines:
-                return ","
+            return _delimiter_from_sample(sample_lines)
 
-            sample = "".join(sample_lines)
+    except Exception:
+        return ","
 
-            # Use csv.Sniffer to detect delimiter
-            sniffer = csv.Sniffer()
-            try:
-                dialect = sniffer.sniff(sample, delimiters=",;\t|")
-                return dialect.delimiter
-            except csv.Error:
-                # Fallback to manual detection
-                delimiters = [",", ";", "\t", "|"]
-                line = sample_lines[0].strip()
 
-                delimiter_counts = {}
-                for delim in delimiters:
-                    delimiter_counts[delim] = line.count(delim)
+@dataclass
+class InputProbe:
+    """
+    Format, encoding and CSV dialect of an input file.
+
+    Attributes:
+        file_format: 'csv', 'tsv', 'jsonl' or 'txt'
+        encoding: Text encoding
+        delimiter: CSV/TSV delimiter (None for other formats)
+        stream: Open buffered binary stream positioned at the start of the data
+        source: The file on disk under stream (stream itself if uncompressed);
+            its position is how far the (compressed) file has been read
+    """
 
-                # Return delimiter with highest count
-                best_delim = max(delimiter_counts, key=delimiter_counts.get)
-                return best_delim if delimiter_counts[best_delim] > 0 else ","
+    file_format: str
+    encoding: str
+    delimiter: Optional[str] = None
+    stream: Optional[io.BufferedReader] = None
+    source: Optional[IO[bytes]] = None
+
+    def open_text(self) -> IO[str]:
+        """Wrap the probed stream for text reading."""
+        if self.stream is None:
+            raise ValueError("Input probe has no open stream")
+        return io.TextIOWrapper(self.stream, encoding=self.encoding)
+
+    @property
+    def bytes_read(self) -> int:
+        """Bytes of the file on disk read so far."""
+        if self.source is None or self.source.closed:
+            return 0
+        return self.source.tell()
+
+    def close(self) -> None:
+        """Close the stream and the file under it."""
+        if self.stream is not None:
+            self.stream.close()
+        if self.source is not None:
+            self.source.close()
+
+
+def probe_input(
+    file_path: Union[str, Path],
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    sample_size: int = PROBE_SAMPLE_SIZE,
+) -> InputProbe:
+    """
+    Open an input file once and detect how to read it.
 
-    except Exception:
-        return ","
+    The encoding and, for CSV, the delimiter are detected from a sample
+    peeked from the buffered (decompressed) stream, so the file is opened
+    and decompressed only once and reading resumes at its start.
+
+    Args:
+        file_path: Path to the file
+        encoding: Encoding override (skips detection)
+        delimiter: Delimiter override for CSV/TSV files (skips sniffing)
+        sample_size: Number of bytes to sample for detection
+
+    Returns:
+        InputProbe whose stream the caller must close
+
+    Example:
+        >>> probe = probe_input("data.csv.gz")
+        >>> probe.file_format, probe.delimiter
+        ('csv', ',')
+    """
+    path = Path(file_path)
+    file_format = detect_format(path)
+    if file_format == "tsv" and delimiter is None:
+        delimiter = "\t"
+
+    opener = _get_file_opener(path)
+    if opener is open:
+        stream = open(path, "rb", buffering=max(sample_size, _READ_BUFFER_SIZE))
+        source = stream
+    else:
+        # Decompress from a file we hold, so progress can follow its offset
+        source = open(path, "rb")
+        try:
+            stream = io.BufferedReader(
+                opener(source, "rb"), max(sample_size, _READ_BUFFER_SIZE)
+            )
+        except BaseException:
+            source.close()
+            raise
+
+    try:
+        # peek() may return less than requested; one buffer fill is enough
+        sample = stream.peek(sample_size)[:sample_size]
+        if encoding is None:
+            encoding = _encoding_from_sample(sample)
+        if file_format == "csv" and delimiter is None:
+            text = sample.decode(encoding, errors="replace")
+            delimiter = _delimiter_from_sample(text.splitlines(True)[:5])
+    except BaseException:
+        stream.close()
+        source.close()
+        raise
+
+    return InputProbe(
+        file_format=file_format,
+        encoding=encoding,
+        delimiter=delimiter,
+        stream=stream,
+        source=source,
+    )
 
 
 class FileReader:
-    """Base class for file readers."""
+    """
+    Base class for file readers.
+
+    Readers either open the file themselves (detecting the encoding first)
+    or take over the stream of an InputProbe.
+    """
 
-    def __init__(self, file_path: Path):
+    def __init__(
+        self,
+        file_path: Path,
+        encoding: Optional[str] = None,
+        probe: Optional[InputProbe] = None,
+    ):
         self.file_path = file_path
-        self.encoding = detect_encoding(file_path)
+        self.probe = probe
+        if probe is not None:
+            self.encoding = probe.encoding
+        else:
+            self.encoding = encoding or detect_encoding(file_path)
         self.opener = _get_file_opener(file_path)
-        self._file_handle = None
+        self._file_handle: Optional[IO[str]] = None
+
+    def _open_text(self) -> IO[str]:
+        if self.probe is not None:
+            return self.probe.open_text()
+        handle: IO[str] = self.opener(self.file_path, "rt", encoding=self.encoding)
+        return handle
 
     def __enter__(self):
-        self._file_handle = self.opener(self.file_path, "rt", encoding=self.encoding)
+        self._file_handle = self._open_text()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self._file_handle:
             self._file_handle.close()
+        if self.probe is not None:
+            self.probe.close()
 
     def __iter__(self):
         return self
@@ -181,22 +363,49 @@ class FileReader:
     def __next__(self):
         raise NotImplementedError
 
+    @property
+    def bytes_read(self) -> int:
+        """
+        Bytes of the input file read so far, counted on disk (compressed
+        bytes for compressed files). Only tracked for probed readers.
+        """
+        return self.probe.bytes_read if self.probe is not None else 0
+
+    @property
+    def fieldnames(self) -> Optional[List[str]]:
+        """Header schema of the input (None for formats without one)."""
+        return None
+
 
 class CSVReader(FileReader):
     """CSV/TSV file reader."""
 
-    def __init__(self, file_path: Path, delimiter: str = None):
-        super().__init__(file_path)
-        self.delimiter = delimiter or detect_csv_delimiter(file_path, self.encoding)
+    def __init__(
+        self,
+        file_path: Path,
+        delimiter: Optional[str] = None,
+        encoding: Optional[str] = None,
+        probe: Optional[InputProbe] = None,
+    ):
+        super().__init__(file_path, encoding=encoding, probe=probe)
+        self.delimiter = (
+            delimiter
+            or (probe.delimiter if probe is not None else None)
+            or detect_csv_delimiter(file_path, self.encoding)
+        )
         self._csv_reader = None
         self._headers = None
 
     def __enter__(self):
-        self._file_handle = self.opener(self.file_path, "rt", encoding=self.encoding)
+        self._file_handle = self._open_text()
         self._csv_reader = csv.DictReader(self._file_handle, delimiter=self.delimiter)
         self._headers = self._csv_reader.fieldnames
         return self
 
+    @property
+    def fieldnames(self) -> Optional[List[str]]:
+        return self._headers
+
     def __next__(self):
         if not self._csv_reader:
             raise StopIteration
@@ -238,13 +447,141 @@ class TextReader(FileReader):
         return line.strip()
 
 
+class MappedLineReader:
+    """
+    Memory-mapped reader for uncompressed JSONL and plain text files.
+
+    Instead of keeping parsed records around, callers get the byte span of
+    each record in the mapping, so a sort only needs to hold offsets and keys
+    and can copy the original bytes to the output in sorted order.
+    """
+
+    def __init__(self, file_path: Path, encoding: Optional[str] = None):
+        self.file_path = Path(file_path)
+        self.file_format = detect_format(self.file_path)
+        if not supports_line_index(self.file_path):
+            raise ValueError(
+                f"Offset index requires an uncompressed JSONL or text file: "
+                f"{file_path}"
+            )
+        self.encoding = encoding
+        self._file_handle: Optional[IO[bytes]] = None
+        self._map: Optional[mmap.mmap] = None
+
+    def __enter__(self):
+        handle = self._file_handle = open(self.file_path, "rb")
+        if self.file_path.stat().st_size > 0:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.encoding is None:
+            # Detect from the mapping instead of reopening the file
+            sample = self._map[:PROBE_SAMPLE_SIZE] if self._map is not None else b""
+            self.encoding = _encoding_from_sample(sample) if sample else "utf-8"
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._map is not None:
+            self._map.close()
+        if self._file_handle:
+            self._file_handle.close()
+
+    def iter_spans(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Scan the mapping line by line.
+
+        Args:
+            start: Offset of the first line to scan (must be a line start)
+            stop: Only lines starting before this offset are scanned
+
+        Yields:
+            (start, end, record) tuples, where start/end delimit the record
+            bytes without the line terminator. Invalid JSONL lines are
+            skipped, like JSONLReader does.
+        """
+        data = self._map
+        if data is None:
+            return
+
+        size = len(data)
+        limit = size if stop is None else min(stop, size)
+        encoding = self.encoding or "utf-8"
+        pos = start
+        while pos < limit:
+            end = data.find(b"\n", pos)
+            next_pos = size if end == -1 else end + 1
+            if end == -1:
+                end = size
+            if end > pos and data[end - 1] == 0x0D:
+                end -= 1
+
+            line = data[pos:end].decode(encoding, errors="replace")
+            if self.file_format == "jsonl":
+                try:
+                    yield pos, end, json.loads(line.strip())
+                except json.JSONDecodeError:
+                    pass
+            else:
+                yield pos, end, line.strip()
+
+            pos = next_pos
+
+    def slice(self, start: int, end: int) -> bytes:
+        """Return the raw bytes of a record span."""
+        return self._map[start:end] if self._map is not None else b""
+
+    def split_ranges(self, parts: int) -> List[Tuple[int, int]]:
+        """
+        Split the mapping into about equal byte ranges on line boundaries.
+
+        Every range starts at the beginning of a line, so the ranges can be
+        scanned independently with iter_spans(start, stop).
+        """
+        data = self._map
+        if data is None:
+            return []
+        size = len(data)
+        bounds = [0]
+
+        for i in range(1, parts):
+            pos = size * i // parts
+            if pos <= bounds[-1]:
+                continue
+            # A line starts at pos if the byte before it is a newline
+            newline = data.find(b"\n", pos - 1)
+            if newline == -1 or newline + 1 >= size:
+                break
+            bounds.append(newline + 1)
+
+        bounds.append(size)
+        return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def supports_line_index(file_path: Union[str, Path]) -> bool:
+    """Check whether a file can be sorted through a MappedLineReader."""
+    path = Path(file_path)
+    return path.suffix.lower() not in COMPRESSED_SUFFIXES and detect_format(path) in (
+        "jsonl",
+        "txt",
+    )
+
+
 @contextmanager
-def parse_file(file_path: Union[str, Path]) -> Iterator[Any]:
+def parse_file(
+    file_path: Union[str, Path],
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+) -> Iterator[Any]:
     """
     Create appropriate file reader based on format.
 
+    The file is opened once: format, encoding and CSV dialect are detected
+    by probe_input and the reader continues on the probed stream.
+
     Args:
         file_path: Path to the file
+        encoding: Encoding override (default: detected)
+        delimiter: CSV/TSV delimiter override (default: detected)
 
     Yields:
         FileReader instance
@@ -255,34 +592,427 @@ def parse_file(file_path: Union[str, Path]) -> Iterator[Any]:
         ...         print(row)
     """
     path = Path(file_path)
-    file_format = detect_format(path)
+    probe = probe_input(path, encoding=encoding, delimiter=delimiter)
+
+    reader: FileReader
+    try:
+        if probe.file_format in ("csv", "tsv"):
+            reader = CSVReader(path, probe=probe)
+        elif probe.file_format == "jsonl":
+            reader = JSONLReader(path, probe=probe)
+        else:  # txt
+            reader = TextReader(path, probe=probe)
+    except BaseException:
+        probe.close()
+        raise
+
+    with reader:
+        yield reader
+
+
+def expand_inputs(inputs: Union[str, Path, Iterable[Union[str, Path]]]) -> List[Path]:
+    """
+    Expand input paths and glob patterns into a list of files.
+
+    Patterns (with *, ? or [) expand to their matches in sorted order;
+    other paths are kept as given.
+
+    Example:
+        >>> expand_inputs(["part-*.csv.gz", "extra.csv"])
+        [PosixPath('part-0.csv.gz'), PosixPath('part-1.csv.gz'), PosixPath('extra.csv')]
+    """
+    if isinstance(inputs, (str, Path)):
+        inputs = [inputs]
+
+    paths: List[Path] = []
+    for pattern in inputs:
+        if isinstance(pattern, str) and any(c in pattern for c in "*?["):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise FileNotFoundError(f"No input files match '{pattern}'")
+            paths.extend(Path(match) for match in matches)
+        else:
+            paths.append(Path(pattern))
+    return paths
+
+
+class MultiFileReader:
+    """
+    Reader chaining the records of several files of any supported format.
+
+    Files are opened one at a time, in order. fieldnames is the union of
+    the CSV/TSV headers seen so far, in order of first appearance, so rows
+    of shards with differing headers can be written with one schema.
+    """
+
+    def __init__(
+        self,
+        file_paths: List[Path],
+        encoding: Optional[str] = None,
+        delimiter: Optional[str] = None,
+    ):
+        self.file_paths = [Path(path) for path in file_paths]
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self._fieldnames: List[str] = []
+        self._reader: Optional[FileReader] = None
+        self._done = 0
+        self._records = self._read()
+
+    def _read(self) -> Generator[Any, None, None]:
+        for path in self.file_paths:
+            with parse_file(path, self.encoding, self.delimiter) as reader:
+                self._reader = reader
+                for name in reader.fieldnames or []:
+                    if name not in self._fieldnames:
+                        self._fieldnames.append(name)
+                yield from reader
+            self._reader = None
+            self._done += path.stat().st_size
+
+    def __iter__(self):
+        return self._records
+
+    def close(self) -> None:
+        """Close the file being read."""
+        self._records.close()
+
+    @property
+    def bytes_read(self) -> int:
+        """Bytes of the input files read so far, counted on disk."""
+        current = self._reader.bytes_read if self._reader is not None else 0
+        return self._done + current
+
+    @property
+    def fieldnames(self) -> Optional[List[str]]:
+        """Union of the CSV/TSV headers read so far (None if there are none)."""
+        return self._fieldnames or None
+
+
+@contextmanager
+def parse_files(
+    file_paths: List[Path],
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+) -> Iterator[MultiFileReader]:
+    """
+    Read several files as one stream of records (see MultiFileReader).
+
+    Example:
+        >>> with parse_files(expand_inputs("part-*.csv.gz")) as reader:
+        ...     rows = list(reader)
+    """
+    reader = MultiFileReader(file_paths, encoding=encoding, delimiter=delimiter)
+    try:
+        yield reader
+    finally:
+        reader.close()
+
+
+def line_parser(
+    file_format: str, fieldnames: Optional[List[str]] = None
+) -> Callable[[bytes], Any]:
+    """
+    Build a parser for single lines of an output written by RecordWriter.
+
+    Without fieldnames, CSV/TSV parsers take the first line they see as the
+    header and parse it to None.
+
+    Args:
+        file_format: Output format ('csv', 'tsv', 'jsonl', 'txt')
+        fieldnames: CSV/TSV header schema
+
+    Returns:
+        Function from a UTF-8 encoded line to its record
+    """
+    if file_format == "jsonl":
+        return json.loads
 
     if file_format in ("csv", "tsv"):
-        delimiter = "\t" if file_format == "tsv" else None
-        with CSVReader(path, delimiter=delimiter) as reader:
-            yield reader
-    elif file_format == "jsonl":
-        with JSONLReader(path) as reader:
-            yield reader
-    else:  # txt
-        with TextReader(path) as reader:
-            yield reader
+        delimiter = "\t" if file_format == "tsv" else ","
+        header = list(fieldnames) if fieldnames else []
 
+        def parse(line: bytes) -> Optional[Dict[str, str]]:
+            row = next(csv.reader([line.decode("utf-8")], delimiter=delimiter))
+            if not header:
+                header.extend(row)
+                return None
+            return dict(zip(header, row))
 
-def write_file(
+        return parse
+
+    def parse_text(line: bytes) -> str:
+        return line.decode("utf-8").strip()
+
+    return parse_text
+
+
+class RecordWriter:
+    """
+    Streaming writer for sorted records.
+
+    Records are written as they arrive, so callers can pass generators
+    without the output ever being materialized. CSV/TSV output goes through
+    csv.writer; dict rows use the given header schema (normally the input
+    reader's fieldnames), or the keys of the first row if there is none.
+
+    Args:
+        file_handle: Text file handle opened with newline=""
+        file_format: Format to write ('csv', 'tsv', 'jsonl', 'txt')
+        fieldnames: CSV/TSV header schema
+        delimiter: CSV/TSV delimiter (default: ',' or tab for TSV)
+    """
+
+    def __init__(
+        self,
+        file_handle: IO[str],
+        file_format: str = "txt",
+        fieldnames: Optional[List[str]] = None,
+        delimiter: Optional[str] = None,
+    ):
+        self.file_handle = file_handle
+        self.file_format = file_format
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.delimiter = delimiter or ("\t" if file_format == "tsv" else ",")
+        self._csv_writer: Any = None
+        self._dict_rows = False
+
+    def write(self, item: Any) -> None:
+        """Write a single record."""
+        self.write_all((item,))
+
+    def write_all(self, items: Iterable[Any]) -> None:
+        """Write records from any iterable, one at a time."""
+        if self.file_format == "jsonl":
+            write = self.file_handle.write
+            dumps = json.dumps
+            for item in items:
+                write(dumps(item, ensure_ascii=False) + "\n")
+        elif self.file_format in ("csv", "tsv"):
+            self._write_csv(items)
+        else:  # txt
+            write = self.file_handle.write
+            for item in items:
+                write(str(item) + "\n")
+
+    def close(self) -> None:
+        """Write the CSV header even if no record was written."""
+        if self._csv_writer is None and self.fieldnames:
+            self._start_csv({})
+
+    def _start_csv(self, first: Any) -> None:
+        if isinstance(first, dict):
+            fieldnames = self.fieldnames or list(first.keys())
+            self._csv_writer = csv.DictWriter(
+                self.file_handle,
+                fieldnames=fieldnames,
+                delimiter=self.delimiter,
+                lineterminator="\n",
+                restval="",
+                extrasaction="ignore",
+            )
+            self._csv_writer.writeheader()
+            self._dict_rows = True
+        else:
+            # For non-dict items, write as single column
+            self._csv_writer = csv.writer(
+                self.file_handle, delimiter=self.delimiter, lineterminator="\n"
+            )
+
+    def _write_csv(self, items: Iterable[Any]) -> None:
+        items = iter(items)
+        if self._csv_writer is None:
+            for first in items:
+                self._start_csv(first)
+                items = itertools.chain((first,), items)
+                break
+            else:
+                return
+
+        if self._dict_rows:
+            self._csv_writer.writerows(items)
+        else:
+            self._csv_writer.writerows(
+                item if isinstance(item, (list, tuple)) else [item] for item in items
+            )
+
+
+class _BinarySink(Protocol):
+    def write(self, data: bytes) -> Any: ...
+
+    def close(self) -> None: ...
+
+
+class _BackgroundWriter(io.RawIOBase):
+    """
+    Binary sink that hands chunks to another writer on a worker thread.
+
+    Used for gzip output: zlib releases the GIL while compressing, so the
+    compression overlaps with producing (merging) the next records.
+    """
+
+    def __init__(self, target: _BinarySink):
+        self._target = target
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(_PENDING_CHUNKS)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self._error is not None:
+            raise self._error
+        chunk = bytes(data)
+        self._queue.put(chunk)
+        return len(chunk)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                chunk = self._queue.get()
+                if chunk is None:
+                    break
+                if self._error is None:
+                    self._target.write(chunk)
+        except BaseException as e:
+            self._error = e
+            # Keep draining so the producer never blocks on a full queue
+            while self._queue.get() is not None:
+                pass
+        finally:
+            try:
+                self._target.close()
+            except BaseException as e:
+                self._error = self._error or e
+
+    def close(self) -> None:
+        if not self.closed:
+            self._queue.put(None)
+            self._thread.join()
+            super().close()
+            if self._error is not None:
+                raise self._error
+
+
+def output_codec(file_path: Union[str, Path]) -> str:
+    """Get the output codec for a path: 'gzip', 'zstd' or 'none'."""
+    suffix = Path(file_path).suffix.lower()
+    if suffix in (".gz", ".gzip"):
+        return "gzip"
+    if suffix in (".zst", ".zstd"):
+        if not ZSTD_AVAILABLE:
+            raise ImportError(
+                "zstandard not installed. Install with: pip install zstandard"
+            )
+        return "zstd"
+    return "none"
+
+
+def compression_level(codec: str, level: Optional[int] = None) -> int:
+    """Resolve and validate the compression level for a codec (0 if none)."""
+    if codec == "gzip":
+        level = DEFAULT_GZIP_LEVEL if level is None else level
+        if level not in GZIP_LEVELS:
+            raise ValueError(f"Invalid gzip compression level: {level} (0-9)")
+    elif codec == "zstd":
+        level = DEFAULT_ZSTD_LEVEL if level is None else level
+        if level not in ZSTD_LEVELS:
+            raise ValueError(f"Invalid zstd compression level: {level} (-7-22)")
+    return level or 0
+
+
+def open_output(
     file_path: Union[str, Path],
-    data: Iterator[Any],
-    file_format: str = None,
+    compress_level: Optional[int] = None,
+    block_size: Optional[int] = None,
+    block_key: Optional[Callable[[bytes], bytes]] = None,
+    block_metadata: Optional[Dict[str, Any]] = None,
+) -> IO[bytes]:
+    """
+    Open an output file for binary writing, compressed by its suffix.
+
+    gzip output is compressed on a background thread (default level 6),
+    zstd output with zstandard's multithreaded compressor (default level
+    3); other files get a large write buffer.
+
+    With block_size, the output is written as independently compressed
+    blocks with a block index next to it (see sortdx.blocks); otherwise a
+    block index left next to it by an earlier write is removed.
+
+    Args:
+        file_path: Output file path
+        compress_level: Compression level (gzip: 0-9, zstd: -7-22)
+        block_size: Uncompressed block size in bytes
+        block_key: Sort key of a block's first line, stored in the index
+        block_metadata: Extra fields for the block index
+
+    Returns:
+        Buffered binary file object
+    """
+    path = Path(file_path)
+    codec = output_codec(path)
+    level = compression_level(codec, compress_level)
+
+    from .blocks import BlockWriter, block_index_path
+
+    if block_size:
+        blocks = BlockWriter(
+            path,
+            codec,
+            level,
+            block_size=block_size,
+            first_key=block_key,
+            metadata=block_metadata,
+        )
+        return io.BufferedWriter(_BackgroundWriter(blocks), _WRITE_BUFFER_SIZE)
+
+    # The index of an earlier output would no longer match this one
+    block_index_path(path).unlink(missing_ok=True)
+
+    if codec == "gzip":
+        gzip_file = gzip.GzipFile(path, "wb", compresslevel=level)
+        return io.BufferedWriter(_BackgroundWriter(gzip_file), _WRITE_BUFFER_SIZE)
+
+    if codec == "zstd":
+        compressor = zstd.ZstdCompressor(level=level, threads=-1)
+        writer: Any = compressor.stream_writer(open(path, "wb"))
+        return io.BufferedWriter(writer, _WRITE_BUFFER_SIZE)
+
+    return open(path, "wb", buffering=_WRITE_BUFFER_SIZE)
+
+
+def _open_output(path: Path, encoding: str = "utf-8", **options: Any) -> IO[str]:
+    """Open an output file for text writing (see open_output)."""
+    return io.TextIOWrapper(open_output(path, **options), encoding=encoding, newline="")
+
+
+@contextmanager
+def open_writer(
+    file_path: Union[str, Path],
+    file_format: Optional[str] = None,
+    fieldnames: Optional[List[str]] = None,
+    delimiter: Optional[str] = None,
     encoding: str = "utf-8",
-) -> None:
+    **options: Any,
+) -> Iterator[RecordWriter]:
     """
-    Write data to file in specified format.
+    Open an output file and yield a streaming RecordWriter for it.
 
     Args:
         file_path: Output file path
-        data: Iterator of data items
-        file_format: Format to write ('csv', 'tsv', 'jsonl', 'txt')
+        file_format: Format to write (default: detected from the path)
+        fieldnames: CSV/TSV header schema, usually the input reader's
+        delimiter: CSV/TSV delimiter
         encoding: File encoding
+        **options: Output options for open_output (compress_level,
+            block_size, ...)
+
+    Example:
+        >>> with parse_file("data.csv") as reader:
+        ...     with open_writer("copy.csv", fieldnames=reader.fieldnames) as w:
+        ...         w.write_all(reader)
     """
     path = Path(file_path)
 
@@ -292,49 +1022,130 @@ def write_file(
     # Ensure parent directory exists
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    opener = _get_file_opener(path)
+    with _open_output(path, encoding, **options) as f:
+        writer = RecordWriter(f, file_format, fieldnames, delimiter)
+        yield writer
+        writer.close()
+
+
+def write_file(
+    file_path: Union[str, Path],
+    data: Iterable[Any],
+    file_format: Optional[str] = None,
+    encoding: str = "utf-8",
+    fieldnames: Optional[List[str]] = None,
+    **options: Any,
+) -> None:
+    """
+    Write data to file in specified format.
+
+    Args:
+        file_path: Output file path
+        data: Iterable of data items
+        file_format: Format to write ('csv', 'tsv', 'jsonl', 'txt')
+        encoding: File encoding
+        fieldnames: CSV/TSV header schema (default: keys of the first item)
+        **options: Output options for open_output (compress_level,
+            block_size, ...)
+    """
+    with open_writer(
+        file_path, file_format, fieldnames, encoding=encoding, **options
+    ) as writer:
+        writer.write_all(data)
 
-    with opener(path, "wt", encoding=encoding) as f:
-        if file_format == "jsonl":
-            _write_jsonl(f, data)
-        elif file_format in ("csv", "tsv"):
-            delimiter = "\t" if file_format == "tsv" else ","
-            _write_csv(f, data, delimiter)
-        else:  # txt
-            _write_text(f, data)
 
+class RunWriter:
+    """
+    Incrementally write (key, record) frames to a run file.
 
-def _write_jsonl(file_handle, data: Iterator[Any]) -> None:
-    """Write data as JSONL."""
-    for item in data:
-        json.dump(item, file_handle, ensure_ascii=False)
-        file_handle.write("\n")
+    Used directly when several runs are filled at once (e.g. hash
+    partitions); write_run covers the common single-run case.
 
+    Args:
+        file_path: Run file path
+        buffering: Write buffer size in bytes
+    """
 
-def _write_csv(file_handle, data: Iterator[Any], delimiter: str = ",") -> None:
-    """Write data as CSV."""
-    data_list = list(data)
-    if not data_list:
-        return
+    def __init__(self, file_path: Union[str, Path], buffering: int = _RUN_BUFFER_SIZE):
+        self.file_path = Path(file_path)
+        self.count = 0
+        self._file = open(self.file_path, "wb", buffering=buffering)
+        self._pack = _RUN_FRAME.pack
+
+    def write(self, sort_key: bytes, record: Any) -> None:
+        """Append one frame."""
+        payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+        self._file.write(self._pack(len(sort_key), len(payload)))
+        self._file.write(sort_key)
+        self._file.write(payload)
+        self.count += 1
+
+    def close(self) -> None:
+        """Flush and close the run file."""
+        self._file.close()
+
+    def __enter__(self) -> "RunWriter":
+        return self
 
-    # Determine headers from first item
-    first_item = data_list[0]
-    if isinstance(first_item, dict):
-        headers = list(first_item.keys())
-        writer = csv.DictWriter(file_handle, fieldnames=headers, delimiter=delimiter)
-        writer.writeheader()
-        writer.writerows(data_list)
-    else:
-        # For non-dict items, write as single column
-        writer = csv.writer(file_handle, delimiter=delimiter)
-        for item in data_list:
-            if isinstance(item, (list, tuple)):
-                writer.writerow(item)
-            else:
-                writer.writerow([item])
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
-def _write_text(file_handle, data: Iterator[Any]) -> None:
-    """Write data as plain text."""
-    for item in data:
-        file_handle.write(str(item) + "\n")
+def write_run(file_path: Union[str, Path], records: Iterable[Tuple[bytes, Any]]) -> int:
+    """
+    Write a sorted run of (encoded key, record) pairs.
+
+    Runs are sortdx's own temporary files, so records are pickled rather
+    than converted back to the input format.
+
+    Args:
+        file_path: Run file path
+        records: (key, record) pairs in sorted order
+
+    Returns:
+        Number of records written
+    """
+    with RunWriter(file_path) as writer:
+        write = writer.write
+        for sort_key, record in records:
+            write(sort_key, record)
+        return writer.count
+
+
+def read_run(
+    file_path: Union[str, Path],
+) -> Generator[Tuple[bytes, Any], None, None]:
+    """
+    Read back a run written by write_run.
+
+    Yields:
+        (key, record) pairs in the order they were written
+    """
+    header_size = _RUN_FRAME.size
+    unpack = _RUN_FRAME.unpack
+    loads = pickle.loads
+
+    with open(file_path, "rb", buffering=_RUN_BUFFER_SIZE) as f:
+        while True:
+            header = f.read(header_size)
+            if len(header) < header_size:
+                return
+            key_size, payload_size = unpack(header)
+            sort_key = f.read(key_size)
+            yield sort_key, loads(f.read(payload_size))
+
+
+def count_run(file_path: Union[str, Path]) -> int:
+    """Count the frames of a run without decoding them."""
+    header_size = _RUN_FRAME.size
+    unpack = _RUN_FRAME.unpack
+    count = 0
+
+    with open(file_path, "rb", buffering=_RUN_BUFFER_SIZE) as f:
+        while True:
+            header = f.read(header_size)
+            if len(header) < header_size:
+                return count
+            key_size, payload_size = unpack(header)
+            f.seek(key_size + payload_size, io.SEEK_CUR)
+            count += 1
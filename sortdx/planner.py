@@ -0,0 +1,475 @@
+"""
+Cost-based planning of file sorts.
+
+plan_sort() samples an input before it is sorted: a few MB of decoded
+bytes give the compression ratio and record length, and the first records
+give their size in memory and in runs, the cardinality of each key and how
+presorted the keys are. From these estimates it chooses the sort mode
+(in memory, offset-index mmap or external), the engine, and for external
+sorts the number of worker processes, the chunk size and the merge fan-in.
+
+The size of the input on disk says little by itself: a 100 MB .gz file can
+hold 1 GB of records, and a record takes several times its text length
+once parsed into Python objects.
+"""
+
+import math
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from . import instrument
+from .core import (
+    DICT_MIN_REPEAT,
+    DICT_SAMPLE_SIZE,
+    MERGE_FAN_IN,
+    _create_sort_function,
+    _dictionary_flags,
+    _extract_value,
+    _merge_passes,
+    _select_engine,
+    _unique_is_prefix,
+)
+from .parsers import (
+    COMPRESSED_SUFFIXES,
+    detect_format,
+    parse_files,
+    probe_input,
+    supports_line_index,
+)
+from .utils import SortKey, format_size, parse_memory_size
+
+# Decoded bytes read to measure the compression ratio and record length
+SAMPLE_BYTES = 4 * 1024 * 1024
+
+# Compression ratio assumed for compressed inputs when the sampled file is
+# not compressed
+DEFAULT_COMPRESSION_RATIO = 5.0
+
+# Budget without a memory limit, when available memory cannot be read
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+
+# Decoded bytes per worker below which extra processes do not pay off
+PARALLEL_MIN_SIZE = 64 * 1024 * 1024
+
+# Memory per record of an offset index, besides its encoded key
+MMAP_RECORD_OVERHEAD = 120
+
+# Read buffer held for each run while merging (see parsers.read_run)
+RUN_BUFFER_SIZE = 1024 * 1024
+MIN_FAN_IN = 16
+
+# Framing and sequence number written with each record of a run
+_RUN_FRAME_BYTES = 16
+
+
+@dataclass
+class InputEstimate:
+    """
+    Estimates of an input from a sample.
+
+    Attributes:
+        input_size: Bytes on disk
+        decoded_size: Bytes once decompressed
+        records: Number of records
+        compressed: Whether any input is compressed
+        record_bytes: Decoded bytes per record
+        memory_per_record: Bytes per record parsed and keyed in memory
+        run_bytes_per_record: Bytes per record in a sorted run
+        key_bytes: Bytes of the encoded sort key per record
+        cardinality: Distinct values of each sort key
+        dictionary: Whether each sort key would be dictionary-encoded
+        presorted: Fraction of consecutive sampled records already in order
+        sampled: Records sampled
+    """
+
+    input_size: int
+    decoded_size: int
+    records: int
+    compressed: bool = False
+    record_bytes: float = 0.0
+    memory_per_record: float = 0.0
+    run_bytes_per_record: float = 0.0
+    key_bytes: float = 0.0
+    cardinality: List[int] = field(default_factory=list)
+    dictionary: List[bool] = field(default_factory=list)
+    presorted: float = 1.0
+    sampled: int = 0
+
+
+@dataclass
+class SortPlan:
+    """
+    How a file sort will run.
+
+    Attributes:
+        mode: 'memory', 'mmap' or 'external'
+        engine: Engine expected to sort in memory or each run
+        workers: Processes generating runs (external sorts)
+        chunk_size: Chunk size given to run generation (bytes of record
+            text, shared by all workers)
+        fan_in: Runs merged at once
+        memory_budget: Bytes the sort may use
+        estimate: Input estimates the plan is based on
+        reasons: Why each choice was made
+    """
+
+    mode: str
+    engine: str
+    workers: int
+    chunk_size: int
+    fan_in: int
+    memory_budget: int
+    estimate: InputEstimate
+    reasons: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the plan as JSON-serializable data."""
+        return asdict(self)
+
+    def __str__(self) -> str:
+        estimate = self.estimate
+        lines = [
+            "Sort plan:",
+            f"  Mode: {self.mode}",
+            f"  Engine: {self.engine}",
+        ]
+        if self.mode == "external":
+            lines += [
+                f"  Workers: {self.workers}",
+                f"  Chunk size: {format_size(self.chunk_size)}",
+                f"  Merge fan-in: {self.fan_in}",
+            ]
+        lines += [
+            f"  Memory budget: {format_size(self.memory_budget)}",
+            "Estimates:",
+            f"  Input: {format_size(estimate.input_size)} on disk, "
+            f"{format_size(estimate.decoded_size)} decoded",
+            f"  Records: {estimate.records:,} "
+            f"({estimate.record_bytes:.0f} bytes, "
+            f"{estimate.memory_per_record:.0f} bytes in memory)",
+            "  Key cardinality: "
+            + ", ".join(f"{count:,}" for count in estimate.cardinality),
+            f"  Presorted: {estimate.presorted:.0%} of {estimate.sampled:,} "
+            f"sampled records",
+            "Reasons:",
+        ]
+        lines += [f"  - {reason}" for reason in self.reasons]
+        return "\n".join(lines)
+
+
+def default_memory_budget() -> int:
+    """Get half of the available memory (or DEFAULT_MEMORY_BUDGET)."""
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return DEFAULT_MEMORY_BUDGET
+    return available // 2 if available > 0 else DEFAULT_MEMORY_BUDGET
+
+
+def _open_files_limit() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return None if soft == resource.RLIM_INFINITY else soft
+
+
+def _is_compressed(path: Path) -> bool:
+    return path.suffix.lower() in COMPRESSED_SUFFIXES
+
+
+def _record_memory(item: Any) -> int:
+    """Approximate bytes of a parsed record and its references in a chunk."""
+    size = sys.getsizeof(item)
+    if isinstance(item, dict):
+        size += sum(sys.getsizeof(value) for value in item.values())
+    elif isinstance(item, (list, tuple)):
+        size += sum(sys.getsizeof(value) for value in item)
+    # List slot, plus the (key, record) pair of keyed run generation
+    return size + 8 + 56
+
+
+def _estimate_cardinality(values: List[Any], records: int) -> int:
+    """
+    Estimate the distinct values among all records from a sample.
+
+    Values repeating DICT_MIN_REPEAT times on average are taken to be all
+    there is; otherwise the distinct fraction is scaled to all records.
+    """
+    if not values:
+        return 0
+    try:
+        distinct = len(set(values))
+    except TypeError:
+        distinct = len(values)
+    if distinct * DICT_MIN_REPEAT <= len(values):
+        return distinct
+    return max(distinct, round(distinct / len(values) * records))
+
+
+def estimate_input(
+    input_paths: List[Path],
+    keys: List[SortKey],
+    reverse: bool = False,
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    sample_size: int = DICT_SAMPLE_SIZE,
+) -> InputEstimate:
+    """
+    Estimate the size and key statistics of an input from its first file.
+
+    Args:
+        input_paths: Input files
+        keys: List of SortKey specifications
+        reverse: Reverse the entire sort order
+        encoding: Input encoding (default: detected)
+        delimiter: Input CSV/TSV delimiter (default: detected)
+        sample_size: Records to sample
+
+    Returns:
+        InputEstimate
+    """
+    input_size = sum(path.stat().st_size for path in input_paths)
+    first = input_paths[0]
+
+    probe = probe_input(first, encoding=encoding, delimiter=delimiter)
+    try:
+        raw = probe.stream.read(SAMPLE_BYTES) if probe.stream is not None else b""
+        if len(raw) < SAMPLE_BYTES:
+            consumed = first.stat().st_size
+        else:
+            consumed = probe.bytes_read
+    finally:
+        probe.close()
+
+    if _is_compressed(first):
+        ratio = len(raw) / consumed if consumed else 1.0
+    else:
+        ratio = DEFAULT_COMPRESSION_RATIO
+    decoded_size = sum(
+        (
+            round(path.stat().st_size * ratio)
+            if _is_compressed(path)
+            else path.stat().st_size
+        )
+        for path in input_paths
+    )
+    record_bytes = len(raw) / max(1, raw.count(b"\n"))
+    records = round(decoded_size / record_bytes) if raw else 0
+
+    with parse_files([first], encoding=encoding, delimiter=delimiter) as reader:
+        items = []
+        for item in reader:
+            items.append(item)
+            if len(items) >= sample_size:
+                break
+
+    estimate = InputEstimate(
+        input_size=input_size,
+        decoded_size=decoded_size,
+        records=records,
+        compressed=any(map(_is_compressed, input_paths)),
+        record_bytes=record_bytes,
+        sampled=len(items),
+    )
+    if not items:
+        estimate.cardinality = [0] * len(keys)
+        estimate.dictionary = _dictionary_flags(keys)
+        return estimate
+
+    sort_func = _create_sort_function(keys, reverse)
+    sort_keys = [sort_func(item) for item in items]
+    count = len(items)
+    estimate.key_bytes = sum(map(len, sort_keys)) / count
+    estimate.memory_per_record = (
+        sum(map(_record_memory, items)) + sum(map(sys.getsizeof, sort_keys))
+    ) / count
+    estimate.run_bytes_per_record = (
+        sum(len(pickle.dumps(item, pickle.HIGHEST_PROTOCOL)) for item in items) / count
+        + estimate.key_bytes
+        + _RUN_FRAME_BYTES
+    )
+    columns = [[_extract_value(item, k.column) for item in items] for k in keys]
+    estimate.cardinality = [
+        _estimate_cardinality(column, records) for column in columns
+    ]
+    estimate.dictionary = _dictionary_flags(keys, columns.__getitem__)
+    if count > 1:
+        ordered = sum(a <= b for a, b in zip(sort_keys, sort_keys[1:]))
+        estimate.presorted = ordered / (count - 1)
+    return estimate
+
+
+def plan_sort(
+    input_path: Union[str, Path, List[Path]],
+    keys: List[SortKey],
+    output_path: Optional[Union[str, Path]] = None,
+    memory_limit: Optional[str] = None,
+    mode: Optional[str] = None,
+    engine: Optional[str] = None,
+    workers: Optional[int] = None,
+    reverse: bool = False,
+    unique: Optional[Union[str, int]] = None,
+    partitions: Optional[int] = None,
+    work_dir: Optional[Union[str, Path]] = None,
+    encoding: Optional[str] = None,
+    delimiter: Optional[str] = None,
+) -> SortPlan:
+    """
+    Plan a file sort (see sort_file for the arguments).
+
+    Requested settings (mode, engine, workers) are kept; the planner fills
+    in the rest. The memory budget is memory_limit, or half of the
+    available memory. Inputs whose records fit the budget are sorted in
+    memory; otherwise a single uncompressed JSONL/text input whose offset
+    index fits is sorted with mmap (no runs are written), and anything
+    else externally.
+
+    Returns:
+        SortPlan, whose reasons explain each choice
+
+    Example:
+        >>> print(plan_sort("events.jsonl.gz", [key("ts", "num")]))
+    """
+    input_paths = input_path if isinstance(input_path, list) else [Path(input_path)]
+    # Sampling is not part of the sort: keep its conversions out of events
+    with instrument.suspended():
+        estimate = estimate_input(
+            input_paths, keys, reverse=reverse, encoding=encoding, delimiter=delimiter
+        )
+    budget = (
+        parse_memory_size(memory_limit) if memory_limit else default_memory_budget()
+    )
+    reasons = []
+
+    in_memory = round(estimate.records * estimate.memory_per_record)
+    index = round(estimate.records * (estimate.key_bytes + MMAP_RECORD_OVERHEAD))
+    runs_size = round(estimate.records * estimate.run_bytes_per_record)
+    mmap_possible = (
+        len(input_paths) == 1
+        and supports_line_index(input_paths[0])
+        and (
+            output_path is None
+            or detect_format(output_path) == detect_format(input_paths[0])
+        )
+        and not partitions
+        and work_dir is None
+    )
+    temp_dir = Path(work_dir) if work_dir is not None else Path(tempfile.gettempdir())
+    while not temp_dir.exists() and temp_dir != temp_dir.parent:
+        temp_dir = temp_dir.parent
+    free_disk = shutil.disk_usage(temp_dir).free
+
+    if mode is not None:
+        reasons.append(f"mode '{mode}' requested")
+    elif in_memory <= budget:
+        mode = "memory"
+        reasons.append(
+            f"records need about {format_size(in_memory)} in memory, within the "
+            f"{format_size(budget)} budget"
+        )
+    elif mmap_possible and index <= budget:
+        mode = "mmap"
+        reasons.append(
+            f"records need about {format_size(in_memory)} in memory, over the "
+            f"{format_size(budget)} budget, but an offset index only "
+            f"{format_size(index)} and no runs"
+        )
+    else:
+        mode = "external"
+        reasons.append(
+            f"records need about {format_size(in_memory)} in memory, over the "
+            f"{format_size(budget)} budget"
+        )
+    if mode == "external" and runs_size > free_disk:
+        reasons.append(
+            f"warning: runs need about {format_size(runs_size)} but only "
+            f"{format_size(free_disk)} is free in {temp_dir}"
+        )
+
+    selected = _select_engine(keys, engine, estimate.dictionary)
+    reasons.append(
+        f"engine '{selected}' "
+        + ("requested" if engine and engine != "auto" else "suits the key types")
+    )
+    if estimate.sampled > 1 and estimate.presorted >= 0.99:
+        reasons.append("sampled records are already in order")
+
+    plan = SortPlan(
+        mode=mode,
+        engine=selected,
+        workers=1,
+        chunk_size=0,
+        fan_in=MERGE_FAN_IN,
+        memory_budget=budget,
+        estimate=estimate,
+        reasons=reasons,
+    )
+    if mode == "external":
+        _plan_external(plan, input_paths, keys, workers, unique, work_dir)
+    return plan
+
+
+def _plan_external(
+    plan: SortPlan,
+    input_paths: List[Path],
+    keys: List[SortKey],
+    workers: Optional[int],
+    unique: Optional[Union[str, int]],
+    work_dir: Optional[Union[str, Path]],
+) -> None:
+    """Choose the workers, chunk size and fan-in of an external sort."""
+    estimate = plan.estimate
+    budget = plan.memory_budget
+    cpus = os.cpu_count() or 1
+    parallel = len(input_paths) > 1 or supports_line_index(input_paths[0])
+    partitioned = unique is not None and not _unique_is_prefix(unique, keys)
+
+    if workers is not None:
+        plan.workers = workers or cpus
+        plan.reasons.append(f"{plan.workers} workers requested")
+    elif not parallel or partitioned:
+        plan.reasons.append(
+            "one worker: compressed and CSV/TSV files are read sequentially"
+            if not parallel
+            else "one worker: unique values are partitioned sequentially"
+        )
+    elif work_dir is not None:
+        plan.reasons.append("one worker: only sequential run generation resumes")
+    else:
+        useful = estimate.decoded_size // PARALLEL_MIN_SIZE
+        if len(input_paths) > 1:
+            useful = min(useful, len(input_paths))
+        plan.workers = max(1, min(cpus, useful))
+        plan.reasons.append(
+            f"{plan.workers} workers: {cpus} CPUs, one per "
+            f"{format_size(PARALLEL_MIN_SIZE)} of records"
+            + (" and input file" if len(input_paths) > 1 else "")
+        )
+
+    # Chunk sizes count the text length of records (see _spill_runs): scale
+    # the budget by how much bigger records are in memory
+    expansion = estimate.memory_per_record / max(1.0, estimate.record_bytes)
+    plan.chunk_size = max(1, int(budget / max(1.0, expansion)))
+
+    fan_in = max(MIN_FAN_IN, min(MERGE_FAN_IN, budget // RUN_BUFFER_SIZE))
+    open_files = _open_files_limit()
+    if open_files is not None:
+        fan_in = max(2, min(fan_in, open_files - 64))
+    plan.fan_in = fan_in
+
+    runs = math.ceil(estimate.decoded_size / plan.chunk_size)
+    passes = _merge_passes(runs, fan_in)
+    plan.reasons.append(
+        f"chunks of {format_size(plan.chunk_size)} of records fill the budget "
+        f"(records take {expansion:.1f}x their size in memory): about {runs:,} "
+        f"runs, merged {fan_in} at a time in {passes} "
+        + ("pass" if passes == 1 else "passes")
+    )
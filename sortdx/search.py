@@ -0,0 +1,91 @@
+"""
+Range queries over sorted outputs with a key index.
+
+sort_file(..., index=True) writes a sparse key index next to its output
+(see sortdx.blocks). query() binary-searches the index for the first block
+that can hold the lower bound and streams lines from there until the first
+sort key passes the upper bound, so a lookup only reads the matching byte
+range instead of scanning the whole file.
+"""
+
+from pathlib import Path
+from typing import Any, Iterator, Tuple, Union
+
+from .blocks import BlockIndex, block_index_path
+from .core import _extract_value, _segment_encoder
+from .parsers import line_parser
+from .utils import parse_key_spec
+
+
+def query_lines(
+    file_path: Union[str, Path], lo: Any = None, hi: Any = None
+) -> Iterator[Tuple[bytes, Any]]:
+    """
+    Yield the raw lines and records of an indexed output within a key range.
+
+    Bounds apply to the first sort key and are inclusive; values are
+    converted like input values (so '10' works for a 'num' key).
+
+    Args:
+        file_path: Sorted output written with index=True
+        lo: Lower bound (default: start of the file)
+        hi: Upper bound (default: end of the file)
+
+    Returns:
+        Iterator of (line, record) pairs in file order
+    """
+    if not block_index_path(file_path).exists():
+        raise FileNotFoundError(
+            f"No key index for '{file_path}'; sort it with index=True (--index)"
+        )
+
+    index = BlockIndex(file_path)
+    metadata = index.index
+    first = parse_key_spec(metadata["keys"][0])
+    descending = first.desc != metadata["reverse"]
+    encode = _segment_encoder(first, descending)
+
+    lo_key = None if lo is None else encode(lo)
+    hi_key = None if hi is None else encode(hi)
+    if descending:
+        # Descending keys invert the order of their bounds
+        lo_key, hi_key = hi_key, lo_key
+
+    file_format = metadata["format"]
+    parse = line_parser(file_format)
+    start = lo_key or b""
+    lines = index.iter_lines(start)
+    if file_format in ("csv", "tsv"):
+        header = next(index.iter_lines(), None)
+        if header is None:
+            return
+        parse(header)
+        if index.find(start) == 0:
+            next(lines)
+
+    for line in lines:
+        record = parse(line)
+        value = encode(_extract_value(record, first.column))
+        if lo_key is not None and value < lo_key:
+            continue
+        if hi_key is not None and value > hi_key:
+            break
+        yield line, record
+
+
+def query(file_path: Union[str, Path], lo: Any = None, hi: Any = None) -> Iterator[Any]:
+    """
+    Yield the records of an indexed sorted output within a key range.
+
+    Args:
+        file_path: Sorted output written with index=True
+        lo: Inclusive lower bound of the first sort key
+        hi: Inclusive upper bound of the first sort key
+
+    Example:
+        >>> sort_file("logs.jsonl", "sorted.jsonl", [key("ts", "num")], index=True)
+        >>> for record in query("sorted.jsonl", 1700000000, 1700003600):
+        ...     print(record)
+    """
+    for _, record in query_lines(file_path, lo, hi):
+        yield record
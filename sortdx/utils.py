@@ -5,9 +5,20 @@ This module contains helper classes like SortKey and SortStats,
 as well as utility functions for memory parsing and formatting.
 """
 
+import json
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, Optional, Union
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+try:
+    import resource
+
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
 
 
 @dataclass
@@ -42,6 +53,98 @@ class SortKey:
             self.locale_name = self.options["locale"]
 
 
+@dataclass
+class PhaseStats:
+    """
+    Time and volume of one phase of a sort.
+
+    Attributes:
+        wall_time: Elapsed seconds, excluding nested phases
+        cpu_time: CPU seconds, excluding nested phases
+        records: Records handled
+        bytes_in: Bytes read
+        bytes_out: Bytes written
+    """
+
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    records: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    def add(self, other: "PhaseStats") -> None:
+        """Add the figures of another PhaseStats to this one."""
+        self.wall_time += other.wall_time
+        self.cpu_time += other.cpu_time
+        self.records += other.records
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+
+
+class PhaseTimer:
+    """
+    Collect PhaseStats by phase name.
+
+    Phases nest: time spent in an inner phase is not counted in the outer
+    one, so phase times add up to the time spent in all of them. Timers of
+    worker processes are merged with update(), which sums their times.
+
+    Example:
+        >>> timer = PhaseTimer()
+        >>> with timer.phase("parse") as phase:
+        ...     phase.records += 1
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = {}
+        self._nested: List[List[float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseStats]:
+        """Time a phase and yield its PhaseStats for counting."""
+        stats = self.phases.setdefault(name, PhaseStats())
+        nested = [0.0, 0.0]
+        self._nested.append(nested)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self._nested.pop()
+            stats.wall_time += wall - nested[0]
+            stats.cpu_time += cpu - nested[1]
+            if self._nested:
+                self._nested[-1][0] += wall
+                self._nested[-1][1] += cpu
+
+    def add(self, name: str, **figures: Any) -> PhaseStats:
+        """Add figures (wall_time, records, ...) to a phase."""
+        stats = self.phases.setdefault(name, PhaseStats())
+        stats.add(PhaseStats(**figures))
+        return stats
+
+    def update(self, other: "PhaseTimer") -> None:
+        """Add the phases of another timer, e.g. a worker process's."""
+        for name, stats in other.phases.items():
+            self.phases.setdefault(name, PhaseStats()).add(stats)
+
+
+def peak_rss() -> int:
+    """
+    Get the peak resident set size of this process and its finished
+    children in bytes (0 where unsupported).
+    """
+    if not RESOURCE_AVAILABLE:
+        return 0
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
 @dataclass
 class SortStats:
     """
@@ -55,6 +158,19 @@ class SortStats:
         input_size: Input file size in bytes
         output_size: Output file size in bytes
         external_sort_used: Whether external sorting was used
+        mode: Sorting strategy used ('memory', 'external', 'mmap', 'update' or
+            'merge')
+        engine: In-memory sort engine used ('bytes', 'tuple', 'numpy' or 'radix')
+        cache: 'hit' or 'miss' when a result cache was used, None otherwise
+        phases: Time and volume by phase ('probe', 'parse', 'keys', 'sort',
+            'spill', 'merge', 'write', ...), in the order they ran
+        runs: Number of sorted runs written by an external sort
+        merge_passes: Number of merge passes over the runs
+        peak_rss: Peak resident set size in bytes
+        temp_bytes: Bytes of sorted runs written to temporary files
+        plan: Decision of the sort planner (SortPlan.to_dict()), if any
+        cardinality: Estimated distinct values of each sort key column among
+            the sorted records (HyperLogLog, about 1% error)
     """
 
     input_file: str
@@ -64,9 +180,59 @@ class SortStats:
     input_size: int
     output_size: int
     external_sort_used: bool
+    mode: str = "memory"
+    engine: str = "bytes"
+    cache: Optional[str] = None
+    phases: Dict[str, PhaseStats] = field(default_factory=dict)
+    runs: int = 0
+    merge_passes: int = 0
+    peak_rss: int = 0
+    temp_bytes: int = 0
+    plan: Optional[Dict[str, Any]] = None
+    cardinality: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the statistics as JSON-serializable data."""
+        return asdict(self)
 
     def __str__(self) -> str:
         """Format statistics for display."""
+        cache = f"  Result cache: {self.cache}\n" if self.cache else ""
+        external = ""
+        if self.runs:
+            external = (
+                f"  Runs: {self.runs:,} ({format_size(self.temp_bytes)}), "
+                f"merge passes: {self.merge_passes}\n"
+            )
+        plan = ""
+        if self.plan and self.plan["mode"] == "external":
+            plan = (
+                f"  Plan: {self.plan['workers']} workers, "
+                f"{format_size(self.plan['chunk_size'])} chunks, "
+                f"fan-in {self.plan['fan_in']}\n"
+            )
+        distinct = ""
+        if self.cardinality:
+            distinct = (
+                "  Distinct keys: "
+                + ", ".join(
+                    f"{column} ~{count:,}" for column, count in self.cardinality.items()
+                )
+                + "\n"
+            )
+        resources = ""
+        if self.peak_rss:
+            resources = f"  Peak RSS: {format_size(self.peak_rss)}\n"
+        phases = "".join(
+            f"    {name}: {phase.wall_time:.2f}s wall, {phase.cpu_time:.2f}s CPU, "
+            f"{phase.records:,} records\n"
+            for name, phase in self.phases.items()
+        )
+        if phases:
+            phases = "  Phases:\n" + phases
+        throughput = 0.0
+        if self.processing_time > 0:
+            throughput = self.lines_processed / self.processing_time
         return (
             f"Sorting Statistics:\n"
             f"  Input file: {self.input_file}\n"
@@ -76,7 +242,15 @@ class SortStats:
             f"  Input size: {format_size(self.input_size)}\n"
             f"  Output size: {format_size(self.output_size)}\n"
             f"  External sort: {'Yes' if self.external_sort_used else 'No'}\n"
-            f"  Throughput: {self.lines_processed / self.processing_time:.0f} lines/sec"
+            f"  Sort mode: {self.mode}\n"
+            f"  Sort engine: {self.engine}\n"
+            f"{cache}"
+            f"{external}"
+            f"{plan}"
+            f"{distinct}"
+            f"{resources}"
+            f"{phases}"
+            f"  Throughput: {throughput:.0f} lines/sec"
         )
 
 
@@ -212,6 +386,28 @@ def parse_key_spec(key_spec: str) -> SortKey:
     return SortKey(column=column, data_type=data_type, options=options)
 
 
+def format_key_spec(key: SortKey) -> str:
+    """
+    Format a SortKey as a key specification string (see parse_key_spec).
+
+    Example:
+        >>> format_key_spec(SortKey("price", "num", desc=True))
+        'price:num:desc=true'
+    """
+    parts = [str(key.column), key.data_type]
+    if key.desc:
+        parts.append("desc=true")
+    if key.locale_name:
+        parts.append(f"locale={key.locale_name}")
+    for name, value in key.options.items():
+        if name in ("desc", "locale"):
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        parts.append(f"{name}={value}")
+    return ":".join(parts)
+
+
 def validate_sort_keys(keys: list) -> None:
     """
     Validate a list of sort keys.
@@ -239,13 +435,43 @@ def validate_sort_keys(keys: list) -> None:
 
 
 class ProgressTracker:
-    """Simple progress tracker for file operations."""
+    """
+    Progress of a long operation, with throughput and ETA.
 
-    def __init__(self, total: int = 0, description: str = "Processing"):
+    Updates are cheap: a progress line is written at most every interval
+    seconds (and by finish()), so callers can update as often as they like.
+    Lines are key=value pairs (strings JSON-quoted) for log processing.
+
+    Args:
+        total: Expected final value (0 if unknown)
+        description: Label of the progress lines
+        unit: 'B' to format values as sizes, anything else as counts
+        interval: Minimum seconds between two progress lines
+        output: Callable receiving each line (default: print to stderr)
+
+    Example:
+        >>> tracker = ProgressTracker(total=2048, description="read", unit="B")
+        >>> tracker.set_current(512)
+        >>> tracker.format()
+        'stage="read" current=512 total=2048 percent=25 unit="B" rate=...'
+    """
+
+    def __init__(
+        self,
+        total: int = 0,
+        description: str = "Processing",
+        unit: str = "",
+        interval: float = 10.0,
+        output: Optional[Callable[[str], None]] = None,
+    ):
         self.total = total
         self.current = 0
         self.description = description
-        self._last_percent = -1
+        self.unit = unit
+        self.interval = interval
+        self.output = output or (lambda line: print(line, file=sys.stderr))
+        self._start = time.monotonic()
+        self._last_print = self._start
 
     def update(self, increment: int = 1) -> None:
         """Update progress by increment."""
@@ -257,20 +483,54 @@ class ProgressTracker:
         self.current = current
         self._maybe_print_progress()
 
-    def _maybe_print_progress(self) -> None:
-        """Print progress if percentage changed significantly."""
-        if self.total <= 0:
-            return
+    def rate(self) -> float:
+        """Get the average progress per second so far."""
+        elapsed = time.monotonic() - self._start
+        return self.current / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        """Estimate the seconds left (None while unknown)."""
+        rate = self.rate()
+        if self.total <= 0 or rate <= 0:
+            return None
+        return max(0.0, (self.total - self.current) / rate)
+
+    def fields(self) -> Dict[str, Any]:
+        """Get the current progress as log fields."""
+        fields: Dict[str, Any] = {
+            "stage": self.description,
+            "current": self.current,
+        }
+        if self.total > 0:
+            fields["total"] = self.total
+            fields["percent"] = min(100, int(self.current * 100 / self.total))
+        if self.unit:
+            fields["unit"] = self.unit
+        fields["rate"] = round(self.rate(), 1)
+        eta = self.eta()
+        if eta is not None:
+            fields["eta_s"] = round(eta)
+        return fields
+
+    def format(self) -> str:
+        """Format the current progress as one key=value log line."""
+        return " ".join(
+            f"{name}={json.dumps(value) if isinstance(value, str) else value}"
+            for name, value in self.fields().items()
+        )
 
-        percent = int((self.current / self.total) * 100)
-        if percent != self._last_percent and percent % 10 == 0:
-            print(f"{self.description}: {percent}% ({self.current:,}/{self.total:,})")
-            self._last_percent = percent
+    def _maybe_print_progress(self) -> None:
+        """Print progress if the interval has passed since the last line."""
+        now = time.monotonic()
+        if now - self._last_print >= self.interval:
+            self._last_print = now
+            self.output(self.format())
 
     def finish(self) -> None:
         """Mark progress as complete."""
         if self.total > 0:
-            print(f"{self.description}: 100% ({self.total:,}/{self.total:,})")
+            self.current = self.total
+        self.output(self.format())
 
 
 def get_file_line_count(file_path: str) -> int:
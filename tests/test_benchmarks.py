@@ -0,0 +1,51 @@
+"""
+Test the benchmark dataset generator and baseline comparison.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from benchmarks.datasets import DatasetSpec, generate
+from benchmarks.run import compare
+
+
+def test_generate_is_deterministic():
+    """Test that a spec always gives the same file, with sorted keys when
+    presorted."""
+    spec = DatasetSpec("jsonl", "num", size="20K", cardinality=50, presorted=1.0)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = generate(spec, Path(temp_dir) / "a")
+        second = generate(spec, Path(temp_dir) / "b")
+        assert first.read_bytes() == second.read_bytes()
+
+        keys = [json.loads(line)["key"] for line in first.read_text().splitlines()]
+        assert keys == sorted(keys)
+        assert len(set(keys)) == 50
+        assert 20 * 1024 <= first.stat().st_size < 21 * 1024
+
+        gzipped = generate(DatasetSpec("csv", "date", "4K", compression="gz"), temp_dir)
+        assert gzipped.name.endswith(".csv.gz")
+
+
+def test_compare_with_baseline():
+    """Test that regressions beyond the threshold are reported."""
+    baseline = {
+        "results": [
+            {"name": "a/memory", "mb_per_s": 10.0, "peak_rss": 100, "temp_bytes": 0},
+            {"name": "b/memory", "mb_per_s": 10.0, "peak_rss": 100, "temp_bytes": 0},
+        ]
+    }
+    results = {
+        "results": [
+            {"name": "a/memory", "mb_per_s": 9.5, "peak_rss": 150, "temp_bytes": 0},
+            {"name": "b/memory", "mb_per_s": 8.0, "peak_rss": 105, "temp_bytes": 0},
+            {"name": "c/memory", "mb_per_s": 1.0, "peak_rss": 999, "temp_bytes": 0},
+        ]
+    }
+
+    regressions = compare(results, baseline, threshold=0.1)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("a/memory: peak_rss")
+    assert regressions[1].startswith("b/memory: mb_per_s")
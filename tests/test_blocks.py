@@ -0,0 +1,110 @@
+"""
+Test block-compressed outputs and the block index.
+"""
+
+import csv
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from sortdx import key, sort_file
+from sortdx.blocks import BlockIndex, BlockWriter, block_index_path
+from sortdx.core import _create_sort_function
+from sortdx.search import query
+
+
+def test_block_writer_gzip_members():
+    """Test that blocks are cut on lines and read back as one gzip file."""
+    lines = [f"{i:04d}\n".encode() for i in range(100)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "out.txt.gz"
+        writer = BlockWriter(path, "gzip", block_size=50, first_key=bytes.strip)
+        for line in lines:
+            writer.write(line)
+        writer.close()
+
+        assert gzip.decompress(path.read_bytes()) == b"".join(lines)
+
+        index = BlockIndex(path)
+        assert len(index.blocks) == 10
+        assert index.blocks[0]["key"] == ""
+        assert index.read_block(3) == b"".join(lines[30:40])
+        assert next(index.iter_lines(b"0042")) == lines[40]
+
+
+def test_sort_file_block_size():
+    """Test that block outputs index the sort keys of their lines."""
+    rows = [{"id": i, "value": (i * 37) % 100} for i in range(100)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl.gz"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        keys = [key("value", "num")]
+        sort_file(input_path, output_path, keys, block_size=256)
+
+        with gzip.open(output_path, "rt") as f:
+            output = [json.loads(line) for line in f]
+        assert output == sorted(rows, key=lambda r: r["value"])
+
+        index = BlockIndex(output_path)
+        assert index.index["keys"] == ["value:num"]
+        assert block_index_path(output_path).exists()
+        assert len(index.blocks) > 1
+        sort_key = _create_sort_function(keys, False)
+        for number in range(1, len(index.blocks)):
+            first = json.loads(index.read_block(number).split(b"\n")[0])
+            assert index.blocks[number]["key"] == sort_key(first).hex()
+
+
+def test_blocks_keep_multiline_csv_records():
+    """Test that CSV blocks are only cut between records."""
+    rows = [{"id": str(i), "note": f'say "{i}"\nagain\n' * (i % 3)} for i in range(60)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.csv"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        keys = [key("id", "num")]
+        sort_file(input_path, output_path, keys, block_size=40, index=True)
+
+        index = BlockIndex(output_path)
+        assert len(index.blocks) > 10
+        sort_key = _create_sort_function(keys, False)
+        for number in range(1, len(index.blocks)):
+            block = index.read_block(number).decode()
+            records = list(
+                csv.DictReader(io.StringIO(block), fieldnames=["id", "note"])
+            )
+            assert records == rows[int(records[0]["id"]) :][: len(records)]
+            assert index.blocks[number]["key"] == sort_key(records[0]).hex()
+
+        assert list(query(output_path, 20, 25)) == rows[20:26]
+
+
+def test_unindexed_sort_removes_stale_index():
+    """Test that sorting again without an index drops the old one."""
+    rows = [{"id": i, "value": (i * 37) % 100} for i in range(200)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        cache_dir = Path(temp_dir) / "cache"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        # The second cached sort is a cache hit
+        for options in ({}, {"cache_dir": cache_dir}, {"cache_dir": cache_dir}):
+            # Keep the cached output, which the output may be hardlinked to
+            output_path.unlink(missing_ok=True)
+            sort_file(input_path, output_path, [key("value", "num")], index=True)
+            assert block_index_path(output_path).exists()
+            stats = sort_file(
+                input_path, output_path, [key("id", "num")], stats=True, **options
+            )
+            assert not block_index_path(output_path).exists()
+        assert stats.cache == "hit"
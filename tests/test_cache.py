@@ -0,0 +1,82 @@
+"""
+Test the result cache.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import sortdx.core
+from sortdx import key, sort_file
+from sortdx.cache import ResultCache
+
+
+def _write_rows(path: Path, rows) -> None:
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+
+def test_sort_file_cache_hit(monkeypatch):
+    """Test that an unchanged input is served from the cache."""
+    rows = [{"id": i, "value": (i * 37) % 100} for i in range(500)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        cache_dir = Path(temp_dir) / "cache"
+        _write_rows(input_path, rows)
+        options = dict(stats=True, cache_dir=cache_dir, index=True)
+
+        first = sort_file(input_path, output_path, [key("value", "num")], **options)
+        assert first.cache == "miss"
+        expected = output_path.read_bytes()
+        output_path.unlink()
+
+        def no_sort(*args, **kwargs):
+            raise AssertionError("cached sorts should not sort again")
+
+        monkeypatch.setattr(sortdx.core, "_sort_items", no_sort)
+        second = sort_file(input_path, output_path, [key("value", "num")], **options)
+        assert second.cache == "hit"
+        assert second.lines_processed == first.lines_processed == 500
+        assert output_path.read_bytes() == expected
+        assert Path(str(output_path) + ".sdxidx").exists()
+        monkeypatch.undo()
+
+        # Other keys or engines, or a changed input, miss
+        third = sort_file(input_path, output_path, [key("id", "num")], **options)
+        assert third.cache == "miss"
+        tuples = sort_file(
+            input_path, output_path, [key("value", "num")], engine="tuple", **options
+        )
+        assert tuples.cache == "miss"
+        _write_rows(input_path, rows[:10])
+        fourth = sort_file(input_path, output_path, [key("value", "num")], **options)
+        assert fourth.cache == "miss"
+        assert len(output_path.read_text().splitlines()) == 10
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache stays within its size limit."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = ResultCache(Path(temp_dir) / "cache", max_size=250)
+        outputs = []
+        for i in range(3):
+            path = Path(temp_dir) / f"out{i}.txt"
+            path.write_bytes(b"x" * 100)
+            outputs.append(path)
+            cache.store(f"key{i}", [path], {})
+            entry = cache.cache_dir / f"key{i}"
+            os.utime(entry, (i, i))
+
+        assert [entry.name for entry in cache.entries()] == ["key1", "key2"]
+        assert cache.size() == 200
+
+        target = Path(temp_dir) / "restored.txt"
+        assert cache.fetch("key1", [target]) == {}
+        assert target.read_bytes() == b"x" * 100
+
+        # Rewriting a hardlinked output in place invalidates its entry
+        outputs[2].write_bytes(b"y" * 10)
+        assert cache.fetch("key2", [target]) is None
+        assert [entry.name for entry in cache.entries()] == ["key1"]
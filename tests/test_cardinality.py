@@ -0,0 +1,85 @@
+"""
+Test HyperLogLog distinct-value estimation.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from sortdx import cardinality, key, sort_file
+from sortdx.cardinality import HyperLogLog, count_distinct
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_hyperloglog_estimates(monkeypatch, numpy):
+    """Test estimates of int and str values, with and without NumPy."""
+    if numpy and not cardinality.NUMPY_AVAILABLE:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(cardinality, "NUMPY_AVAILABLE", numpy)
+
+    for count in (100, 5000, 100_000):
+        numbers = HyperLogLog()
+        numbers.update(i * 3 for i in range(count))
+        numbers.update(range(0, count * 3, 3))
+        words = HyperLogLog()
+        for i in range(count * 2):
+            words.add(f"user{i % count}")
+        for sketch in (numbers, words):
+            assert abs(sketch.count() - count) <= count * 0.03
+
+    empty = HyperLogLog()
+    assert empty.count() == 0
+    unhashable = HyperLogLog()
+    unhashable.update([[1], [2], [1], {"a": 1}])
+    assert unhashable.count() == 3
+
+
+def test_hyperloglog_merge():
+    """Test that merged sketches count the union of their values."""
+    left, right = HyperLogLog(12), HyperLogLog(12)
+    left.update(range(0, 30_000))
+    right.update(range(20_000, 50_000))
+    left.merge(right)
+    assert abs(left.count() - 50_000) <= 50_000 * 0.05
+
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(10))
+    with pytest.raises(ValueError):
+        HyperLogLog(2)
+
+
+def test_cardinality_stats():
+    """Test that every sort mode reports the distinct values of its keys."""
+    rows = [{"id": i, "user": f"u{i % 300}"} for i in range(3000)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        keys = [key("user"), key("id", "num")]
+
+        for mode in ("memory", "mmap", "external"):
+            stats = sort_file(
+                input_path,
+                output_path,
+                keys,
+                mode=mode,
+                memory_limit="20K",
+                stats=True,
+            )
+            assert abs(stats.cardinality["user"] - 300) <= 9
+            assert abs(stats.cardinality["id"] - 3000) <= 90
+            assert "Distinct keys: user ~" in str(stats)
+
+        # Unique values are counted after duplicates are dropped
+        stats = sort_file(
+            input_path, output_path, [key("id", "num")], unique="user", stats=True
+        )
+        assert list(stats.cardinality) == ["id"]
+        assert abs(stats.cardinality["id"] - 300) <= 9
+
+        records, sketches = count_distinct(input_path, ["user", "id"], sample_size=600)
+        assert records == 600
+        assert abs(sketches["user"].count() - 300) <= 9
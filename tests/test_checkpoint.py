@@ -0,0 +1,229 @@
+"""
+Test resumable external sorts.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import sortdx
+import sortdx.core
+from sortdx import key, resume_sort, sort_file
+from sortdx.checkpoint import JOB_MANIFEST, PHASE_MERGE, Checkpoint
+from sortdx.instrument import hook
+
+
+class Interrupted(Exception):
+    pass
+
+
+# Sorts with a work directory and stalls halfway through its third run
+_STALLING_SORT = """
+import sys
+import time
+
+import sortdx
+import sortdx.core
+from sortdx import key, sort_file
+from sortdx.parsers import RunWriter
+
+write_run = sortdx.core.write_run
+calls = []
+
+
+def stalling_write_run(path, items):
+    calls.append(path)
+    if len(calls) < 3:
+        return write_run(path, items)
+    writer = RunWriter(path, buffering=0)
+    for sort_key, item in list(items)[:5]:
+        writer.write(sort_key, item)
+    print("stalled", flush=True)
+    time.sleep(60)
+
+
+sortdx.core.write_run = stalling_write_run
+input_path, output_path, work_dir = sys.argv[1:]
+sort_file(
+    input_path,
+    output_path,
+    [key("value", "num")],
+    memory_limit="4K",
+    mode="external",
+    work_dir=work_dir,
+)
+"""
+
+
+def _write_rows(path: Path, count: int) -> list:
+    rows = [{"id": i, "value": (i * 7919) % 1000} for i in range(count)]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return rows
+
+
+def _read_rows(path: Path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_resume_after_interrupted_runs(monkeypatch):
+    """Test that a sort killed while writing runs keeps its finished runs."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        work_dir = Path(temp_dir) / "work"
+        rows = _write_rows(input_path, 2000)
+        options = dict(memory_limit="4K", mode="external", work_dir=work_dir)
+
+        write_run = sortdx.core.write_run
+        written = []
+
+        def failing_write_run(path, items):
+            if len(written) == 3:
+                raise Interrupted()
+            written.append(path)
+            return write_run(path, items)
+
+        monkeypatch.setattr(sortdx.core, "write_run", failing_write_run)
+        with pytest.raises(Interrupted):
+            sort_file(input_path, output_path, [key("value", "num")], **options)
+
+        checkpoint = json.loads((work_dir / JOB_MANIFEST).read_text())
+        assert len(checkpoint["runs"]) == 3
+        assert 0 < checkpoint["records"] < len(rows)
+
+        resumed = []
+
+        def counting_write_run(path, items):
+            resumed.append(path)
+            return write_run(path, items)
+
+        monkeypatch.setattr(sortdx.core, "write_run", counting_write_run)
+        sort_file(input_path, output_path, [key("value", "num")], **options)
+
+        assert _read_rows(output_path) == sorted(rows, key=lambda r: r["value"])
+        assert not set(resumed) & set(written)
+        assert not (work_dir / JOB_MANIFEST).exists()
+        assert not list(work_dir.iterdir())
+
+
+def test_resume_after_killed_process():
+    """Test resuming a sort whose process was killed while writing a run."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        work_dir = Path(temp_dir) / "work"
+        rows = _write_rows(input_path, 2000)
+
+        env = dict(os.environ, PYTHONPATH=str(Path(sortdx.__file__).parents[1]))
+        process = subprocess.Popen(
+            [sys.executable, "-c", _STALLING_SORT]
+            + [str(input_path), str(output_path), str(work_dir)],
+            stdout=subprocess.PIPE,
+            text=True,
+            env=env,
+        )
+        try:
+            assert process.stdout.readline() == "stalled\n"
+        finally:
+            process.kill()
+            process.communicate()
+
+        # The manifest only lists the two finished runs, not the partial one
+        checkpoint = json.loads((work_dir / JOB_MANIFEST).read_text())
+        assert len(checkpoint["runs"]) == 2
+        assert len(list(work_dir.glob("*.run"))) == 3
+        assert not output_path.exists()
+
+        resume_sort(work_dir)
+
+        assert _read_rows(output_path) == sorted(rows, key=lambda r: r["value"])
+        assert not list(work_dir.iterdir())
+
+
+def test_checkpoint_ignores_runs_outside_work_dir():
+    """Test that a manifest naming files outside its directory is not used."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir) / "work"
+        outside = Path(temp_dir) / "outside.run"
+        outside.write_bytes(b"")
+        job = {"args": {"keys": ["a"]}}
+
+        checkpoint = Checkpoint(work_dir, job)
+        checkpoint.add_run(work_dir / "chunk_000000.run", "bytes", 10)
+        state = json.loads((work_dir / JOB_MANIFEST).read_text())
+        state["runs"] = ["../outside.run"]
+        (work_dir / JOB_MANIFEST).write_text(json.dumps(state))
+
+        checkpoint = Checkpoint(work_dir, job)
+        assert checkpoint.runs == []
+        assert checkpoint.records == 0
+        assert outside.exists()
+
+
+def test_resume_interrupted_merge(monkeypatch):
+    """Test that resuming a sort killed while merging reuses all runs."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.csv"
+        output_path = Path(temp_dir) / "sorted.csv"
+        work_dir = Path(temp_dir) / "work"
+        input_path.write_text(
+            "name,score\n" + "".join(f"n{i},{(i * 31) % 97}\n" for i in range(1500))
+        )
+        keys = [key("score", "num", desc=True), key("name")]
+
+        write_merged = sortdx.core._write_merged
+
+        def failing_write_merged(*args, **kwargs):
+            raise Interrupted()
+
+        monkeypatch.setattr(sortdx.core, "_write_merged", failing_write_merged)
+        with pytest.raises(Interrupted):
+            sort_file(
+                input_path,
+                output_path,
+                keys,
+                memory_limit="4K",
+                mode="external",
+                work_dir=work_dir,
+            )
+
+        checkpoint = json.loads((work_dir / JOB_MANIFEST).read_text())
+        assert checkpoint["phase"] == PHASE_MERGE
+        assert checkpoint["fieldnames"] == ["name", "score"]
+
+        def no_write_run(path, items):
+            raise AssertionError("runs should not be regenerated")
+
+        monkeypatch.setattr(sortdx.core, "_write_merged", write_merged)
+        monkeypatch.setattr(sortdx.core, "write_run", no_write_run)
+        events = []
+        with hook(events.append):
+            resume_sort(work_dir)
+        resumed = [event.data for event in events if event.name == "runs_resumed"]
+        assert [data["records"] for data in resumed] == [1500]
+
+        expected_path = Path(temp_dir) / "expected.csv"
+        sort_file(input_path, expected_path, keys)
+        assert output_path.read_text() == expected_path.read_text()
+
+
+def test_checkpoint_discards_other_job():
+    """Test that a manifest left by a different job is not reused."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        run_file = work_dir / "chunk_000000.run"
+        run_file.write_bytes(b"")
+
+        checkpoint = Checkpoint(work_dir, {"args": {"keys": ["a"]}})
+        checkpoint.add_run(run_file, "bytes", 10)
+        assert Checkpoint(work_dir, {"args": {"keys": ["a"]}}).records == 10
+
+        checkpoint = Checkpoint(work_dir, {"args": {"keys": ["b"]}})
+        assert checkpoint.records == 0
+        assert checkpoint.runs == []
+        assert not run_file.exists()
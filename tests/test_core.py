@@ -2,7 +2,13 @@
 Test core sorting functionality.
 """
 
-from sortdx.core import _convert_value, _extract_value, key, sort_iter
+from sortdx.core import (
+    _convert_value,
+    _dictionary_flags,
+    _extract_value,
+    key,
+    sort_iter,
+)
 
 
 def test_key_creation():
@@ -110,3 +116,39 @@ def test_sort_iter_empty_data():
     data = []
     sorted_data = list(sort_iter(data, keys=[key("name", "str")]))
     assert sorted_data == []
+
+
+def test_sort_iter_descending_strings():
+    """Test per-key descending order for string keys."""
+    data = [
+        {"dept": "ops", "name": "bob"},
+        {"dept": "dev", "name": "Carol"},
+        {"dept": "ops", "name": "alice"},
+        {"dept": "dev", "name": "dave"},
+    ]
+
+    sorted_data = list(
+        sort_iter(data, keys=[key("dept", "str", desc=True), key("name", "str")])
+    )
+    names = [item["name"] for item in sorted_data]
+    assert names == ["alice", "bob", "Carol", "dave"]
+
+
+def test_sort_iter_natural():
+    """Test natural sorting of embedded numbers."""
+    data = ["file10.txt", "file2.txt", "File1.txt"]
+
+    sorted_data = list(sort_iter(data, keys=[key(0, "nat")]))
+    assert sorted_data == ["File1.txt", "file2.txt", "file10.txt"]
+
+
+def test_dictionary_flags():
+    """Test explicit and sampled dictionary encoding decisions."""
+    keys = [key("a", "str"), key("b", "num"), key("c", "str", dict=True)]
+    assert _dictionary_flags(keys) == [False, False, True]
+
+    repetitive = [f"v{i % 10}" for i in range(1000)]
+    distinct = [f"v{i}" for i in range(1000)]
+    assert _dictionary_flags(keys, lambda i: repetitive) == [True, False, True]
+    assert _dictionary_flags(keys, lambda i: distinct) == [False, False, True]
+    assert _dictionary_flags([key("a", dict=False)], lambda i: repetitive) == [False]
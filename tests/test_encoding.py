@@ -0,0 +1,88 @@
+"""
+Test order-preserving binary key encoding.
+"""
+
+import datetime
+
+from sortdx.encoding import (
+    DATE_FILL,
+    datetime_to_micros,
+    dictionary_ranks,
+    encode_int,
+    encode_natural,
+    encode_number,
+    encode_str,
+    invert,
+)
+
+
+def test_encode_int_order():
+    """Test that integer encodings sort numerically."""
+    values = [-(2**70), -256, -255, -1, 0, 1, 255, 256, 2**70]
+    encoded = [encode_int(v) for v in values]
+    assert encoded == sorted(encoded)
+
+
+def test_encode_number_order():
+    """Test mixed int/float ordering, including large integers."""
+    values = [
+        float("-inf"),
+        -(2**64),
+        -1.5,
+        -1,
+        0,
+        0.5,
+        1,
+        2**53,
+        2**53 + 1,
+        2**60 + 1,
+        float("inf"),
+        float("nan"),
+    ]
+    encoded = [encode_number(v) for v in values]
+    assert encoded == sorted(encoded)
+    assert encode_number(-0.0) == encode_number(0)
+    assert encode_number(2) == encode_number(2.0)
+
+
+def test_encode_str_order():
+    """Test string encodings, including prefixes and NUL bytes."""
+    values = ["", "a", "a\x00", "a\x00b", "ab", "b", "é"]
+    encoded = [encode_str(v) for v in values]
+    assert encoded == sorted(encoded)
+
+
+def test_invert_reverses_order():
+    """Test descending order through byte inversion."""
+    values = ["a", "ab", "b"]
+    encoded = [invert(encode_str(v)) for v in values]
+    assert encoded == sorted(encoded, reverse=True)
+
+
+def test_encode_natural_order():
+    """Test natural ordering of embedded numbers."""
+    values = ["1a", "file", "file2", "file2.txt", "file10", "file10a"]
+    encoded = [encode_natural(v) for v in values]
+    assert encoded == sorted(encoded)
+
+
+def test_datetime_to_micros():
+    """Test date normalization to microsecond timestamps."""
+    naive = datetime.datetime(2025, 1, 15, 10, 30)
+    aware = datetime.datetime(
+        2025, 1, 15, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+    )
+    assert datetime_to_micros(naive) == datetime_to_micros(aware)
+    assert datetime_to_micros(0) == 0
+    assert datetime_to_micros("not a date") == DATE_FILL
+
+
+def test_dictionary_ranks():
+    """Test that ranks follow the encoder and collapse equal keys."""
+    values = ["b", "B", "a", "c", "a"]
+
+    assert dictionary_ranks(values, encode_str) == [2, 0, 1, 3, 1]
+    folded = dictionary_ranks(values, lambda v: encode_str(v.lower()))
+    assert folded == [1, 1, 0, 2, 0]
+    descending = dictionary_ranks(values, lambda v: invert(encode_str(v)))
+    assert descending == [1, 3, 2, 0, 2]
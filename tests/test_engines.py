@@ -0,0 +1,200 @@
+"""
+Test vectorized sort engines.
+"""
+
+import pytest
+
+from sortdx.core import _convert_value, _select_engine, key, sort_iter
+
+np = pytest.importorskip("numpy")
+
+from sortdx.engines import (  # noqa: E402
+    DATE_FILL,
+    date_column,
+    numeric_column,
+    numpy_sort_order,
+    python_radix_sort_order,
+    radix_key_bytes,
+    vector_sort_order,
+)
+
+
+def test_numeric_column_types():
+    """Test bulk conversion of numeric key columns."""
+    values, missing = numeric_column(["3", " 1", "2"], _convert_value)
+    assert values.dtype == np.int64
+    assert values.tolist() == [3, 1, 2]
+    assert missing is None
+
+    values, missing = numeric_column(["3", "", "2"], _convert_value)
+    assert values.dtype == np.int64
+    assert missing.tolist() == [False, True, False]
+
+    values, missing = numeric_column(["3.5", "", "1e3"], _convert_value)
+    assert values.dtype == np.float64
+    assert values.tolist() == [3.5, float("-inf"), 1000.0]
+
+    # Unparsable values fall back to scalar conversion
+    values, _ = numeric_column(["7", "abc"], _convert_value)
+    assert values.tolist() == [7.0, float("-inf")]
+
+
+def test_engines_agree_on_unparsable_numbers():
+    """Test that bulk parsing rejects what _convert_value rejects."""
+    for values in (["3", "nan", "1", "", "inf", "-2"], ["1,5", ""], ["2", "1e999"]):
+        data = [{"v": value} for value in values]
+        for desc in (False, True):
+            keys = [key("v", "num", desc=desc)]
+            expected = [row["v"] for row in sort_iter(data, keys, engine="bytes")]
+            for engine in ("tuple", "numpy", "auto"):
+                rows = sort_iter(data, keys, engine=engine)
+                assert [row["v"] for row in rows] == expected
+
+
+def test_date_column():
+    """Test bulk conversion of date key columns."""
+    values, _ = date_column(
+        ["2025-01-15T10:30:00Z", "", "2025-01-15T12:30:00+02:00"], _convert_value
+    )
+    assert values[1] == DATE_FILL
+    assert values[0] == values[2]
+
+
+def test_numpy_sort_order_multi_key():
+    """Test multi-key ordering with per-key descending and missing values."""
+    order = numpy_sort_order(
+        [["1", "1", "2", "", "2"], ["5", "7", "1", "3", "1"]],
+        ["num", "num"],
+        [False, True],
+        _convert_value,
+    )
+    assert order.tolist() == [3, 1, 0, 2, 4]
+
+    # Missing values sort last on descending keys
+    order = numpy_sort_order([["1", "", "2"]], ["num"], [True], _convert_value)
+    assert order.tolist() == [2, 0, 1]
+
+
+def test_engine_matches_tuple_engine():
+    """Test that the NumPy engine agrees with tuple sorting."""
+    data = [
+        {"price": "10.5", "ts": "2024-03-01", "id": 1},
+        {"price": "", "ts": "2024-01-01", "id": 2},
+        {"price": "2", "ts": "2024-02-01", "id": 3},
+        {"price": "10.5", "ts": "2023-12-31", "id": 4},
+    ]
+    keys = [key("price", "num", desc=True), key("ts", "date")]
+
+    vectorized = [row["id"] for row in sort_iter(data, keys, engine="numpy")]
+    tuples = [row["id"] for row in sort_iter(data, keys, engine="tuple")]
+    assert vectorized == tuples == [4, 1, 3, 2]
+
+
+def test_select_engine():
+    """Test automatic engine selection."""
+    assert _select_engine([key("a", "num"), key("b", "date")]) == "numpy"
+    assert _select_engine([key("a", "num"), key("b", "str")]) == "radix"
+    assert _select_engine([key("a", "num"), key("b", "nat")]) == "bytes"
+    assert _select_engine([key("a", "str", locale_name="fr_FR")]) == "bytes"
+    assert _select_engine([key("a", "num")], "tuple") == "tuple"
+    dictionary = [False, True]
+    assert _select_engine([key("a", "num"), key("b", "nat")], None, dictionary) == (
+        "numpy"
+    )
+    assert _select_engine([key("a", "str"), key("b", "nat")], None, dictionary) == (
+        "radix"
+    )
+
+    with pytest.raises(ValueError):
+        _select_engine([key("a", "str")], "numpy")
+    with pytest.raises(ValueError):
+        _select_engine([key("a", "num")], "quantum")
+    with pytest.raises(ValueError):
+        _select_engine([key("a", "nat")], "radix")
+
+
+def test_radix_key_bytes():
+    """Test fixed-width radix key encoding."""
+    key_bytes = radix_key_bytes([["-1", "0", "1"]], ["num"], [False], _convert_value)
+    assert key_bytes.shape == (3, 8)
+    rows = [bytes(row) for row in key_bytes]
+    assert rows == sorted(rows)
+
+    # Descending keys are bit-inverted
+    key_bytes = radix_key_bytes([["a", "ab"]], ["str"], [True], _convert_value)
+    assert bytes(key_bytes[0]) > bytes(key_bytes[1])
+
+    # Floats and long strings are not radix-encodable
+    assert radix_key_bytes([["1.5"]], ["num"], [False], _convert_value) is None
+    assert radix_key_bytes([["x" * 40]], ["str"], [False], _convert_value) is None
+
+
+def test_vector_sort_order_engines():
+    """Test engine choice and ordering of vector_sort_order."""
+    columns = [["3", "", "1", "3"], ["b", "z", "a", "a"]]
+    order, engine = vector_sort_order(
+        columns, ["num", "str"], [False, False], _convert_value
+    )
+    assert engine == "radix"
+    assert order == [1, 2, 3, 0]
+
+    order, engine = vector_sort_order(
+        [["1.5", "0.5"]], ["num"], [False], _convert_value
+    )
+    assert engine == "numpy"
+    assert order == [1, 0]
+
+    order, engine = vector_sort_order(
+        [["1.5", "0.5"], ["a", "b"]], ["num", "str"], [False, False], _convert_value
+    )
+    assert (order, engine) == (None, "tuple")
+
+    # An explicit radix engine falls back for keys it cannot encode
+    order, engine = vector_sort_order(
+        [["1.5", "0.5"]], ["num"], [False], _convert_value, engine="radix"
+    )
+    assert (order, engine) == ([1, 0], "numpy")
+    data = [{"v": "1.5"}, {"v": "x" * 40}, {"v": "0.5"}]
+    rows = sort_iter(data, [key("v", "str")], engine="radix")
+    assert [row["v"] for row in rows] == ["0.5", "1.5", "x" * 40]
+
+
+def test_python_radix_sort_order():
+    """Test the array-based radix sort used without NumPy."""
+    keys = [b"\x02\x01", b"\x01\xff", b"\x02\x00", b"\x01\xff"]
+    assert list(python_radix_sort_order(keys)) == [1, 3, 2, 0]
+
+
+def test_radix_engine_matches_tuple_engine():
+    """Test that the radix engine agrees with tuple sorting."""
+    data = [
+        {"id": "10", "code": "FR", "n": 1},
+        {"id": "-5", "code": "de", "n": 2},
+        {"id": "10", "code": "BE", "n": 3},
+        {"id": "", "code": "us", "n": 4},
+    ]
+    keys = [key("id", "num", desc=True), key("code", "str")]
+
+    radix = [row["n"] for row in sort_iter(data, keys, engine="radix")]
+    tuples = [row["n"] for row in sort_iter(data, keys, engine="tuple")]
+    assert radix == tuples == [3, 1, 2, 4]
+
+
+def test_dictionary_encoding_matches_bytes_engine():
+    """Test that dictionary-encoded keys sort like plain binary keys."""
+    data = [
+        {"id": i, "country": f"Country{i % 7}", "file": f"file{i % 11}.txt"}
+        for i in range(500)
+    ]
+    specs = [("country", "str", True), ("file", "nat", False)]
+
+    plain = [key(c, t, desc=d, dict=False) for c, t, d in specs]
+    encoded = [key(c, t, desc=d, dict=True) for c, t, d in specs]
+    expected = [row["id"] for row in sort_iter(data, plain, engine="bytes")]
+
+    for engine in ("auto", "bytes", "radix"):
+        ids = [row["id"] for row in sort_iter(data, encoded, engine=engine)]
+        assert ids == expected
+    # 'nat' keys are dictionary-encoded automatically for repetitive samples
+    auto = [key(c, t, desc=d) for c, t, d in specs]
+    assert [row["id"] for row in sort_iter(data, auto)] == expected
@@ -0,0 +1,121 @@
+"""
+Test event hooks and profiling.
+"""
+
+import json
+import pstats
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+import sortdx.instrument
+from sortdx import key, sort_file
+from sortdx.instrument import active, emit, hook, profiled
+
+
+def test_sort_file_events():
+    """Test the events of an external sort with unconvertible values."""
+    rows = [{"id": i, "value": (i * 7) % 50} for i in range(300)]
+    rows[10]["value"] = "n/a"
+    rows[20]["value"] = "?"
+    events = []
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        stats = sort_file(
+            input_path,
+            output_path,
+            [key("value", "num")],
+            memory_limit="1K",
+            mode="external",
+            stats=True,
+            on_event=events.append,
+        )
+
+    assert not active()
+    names = [event.name for event in events]
+    assert names[0] == "sort_started"
+    assert names[-1] == "sort_finished"
+    assert names.count("run_started") == names.count("run_finished") == stats.runs
+    assert names.index("merge_started") < names.index("merge_finished")
+
+    finished = [event.data for event in events if event.name == "run_finished"]
+    assert sum(data["records"] for data in finished) == 300
+    assert sum(data["bytes"] for data in finished) == stats.temp_bytes
+
+    failures = [e.data["failures"] for e in events if e.name == "conversion_failures"]
+    assert sum(counts["value"] for counts in failures) == 2
+
+
+def test_conversion_failures_match_engines():
+    """Test that every engine reports the same conversion failures."""
+    rows = [{"v": i % 37} for i in range(1000)]
+    for i in range(0, 1000, 10):
+        rows[i]["v"] = " " if i % 100 == 0 else f"x{i % 30}"
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        runs = [
+            ("memory", engine) for engine in (None, "bytes", "tuple", "numpy", "radix")
+        ]
+        runs += [("mmap", None), ("external", None)]
+        for dictionary in (False, True):
+            for mode, engine in runs:
+                events = []
+                sort_file(
+                    input_path,
+                    output_path,
+                    [key("v", "num", dict=dictionary)],
+                    mode=mode,
+                    engine=engine,
+                    memory_limit="8K",
+                    on_event=events.append,
+                )
+                failures = Counter()
+                for event in events:
+                    if event.name == "conversion_failures":
+                        failures.update(event.data["failures"])
+                assert failures == {"v": 100}, (mode, engine, dictionary)
+
+
+def test_hook_and_profile():
+    """Test registering hooks directly and profiling a block."""
+    events = []
+
+    emit("ignored")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        profile_path = Path(temp_dir) / "out.pstats"
+        with profiled(profile_path):
+            with hook(events.append):
+                emit("custom", value=1)
+
+        assert pstats.Stats(str(profile_path)).total_calls > 0
+
+    assert [(event.name, event.data) for event in events] == [("custom", {"value": 1})]
+
+
+def test_read_progress_bytes(monkeypatch):
+    """Test that read progress reports bytes of the input file."""
+    monkeypatch.setattr(sortdx.instrument, "PROGRESS_INTERVAL", 50)
+    events = []
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.txt"
+        output_path = Path(temp_dir) / "sorted.txt"
+        input_path.write_text("".join(f"line {i % 37}\n" for i in range(200)))
+
+        sort_file(input_path, output_path, [key("line", "str")], on_event=events.append)
+        size = input_path.stat().st_size
+
+    read = [
+        e.data for e in events if e.name == "progress" and e.data["phase"] == "read"
+    ]
+    assert [data["records"] for data in read] == [50, 100, 150, 200]
+    offsets = [data["bytes_read"] for data in read]
+    assert offsets == sorted(offsets) and 0 < offsets[-1] <= size
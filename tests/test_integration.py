@@ -2,10 +2,15 @@
 Integration tests for sortdx - simplified version.
 """
 
+import gzip
+import json
 import tempfile
 from pathlib import Path
 
-from sortdx import key, sort_file
+import pytest
+
+from sortdx import key, merge_files, query, sort_file, update_file
+from sortdx.core import _merge_passes
 from sortdx.parsers import parse_file
 
 
@@ -107,3 +112,494 @@ cherry"""
     finally:
         input_path.unlink()
         output_path.unlink()
+
+
+def test_sort_jsonl_file_mmap_mode():
+    """Test sorting a JSONL file through the memory-mapped offset index."""
+    jsonl_content = """{"name": "Charlie", "age": 35}
+{"name": "Alice", "age": 25}
+not json
+{"name": "Bob", "age": 30}"""
+
+    with tempfile.NamedTemporaryFile(
+        mode="w", suffix=".jsonl", delete=False
+    ) as input_f:
+        input_f.write(jsonl_content)
+        input_path = Path(input_f.name)
+
+    with tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False) as output_f:
+        output_path = Path(output_f.name)
+
+    try:
+        stats = sort_file(
+            input_path, output_path, keys=[key("age", "num")], stats=True, mode="mmap"
+        )
+
+        with parse_file(output_path) as reader:
+            sorted_data = list(reader)
+
+        assert [row["name"] for row in sorted_data] == ["Alice", "Bob", "Charlie"]
+        assert stats.mode == "mmap"
+        assert stats.lines_processed == 3
+
+        # Records are copied byte-for-byte from the input
+        assert output_path.read_text().splitlines()[0] == '{"name": "Alice", "age": 25}'
+
+    finally:
+        input_path.unlink()
+        output_path.unlink()
+
+
+def test_sort_text_file_mmap_mode_reverse():
+    """Test reverse sorting a text file in mmap mode."""
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as input_f:
+        input_f.write("banana\r\napple\ncherry\n")
+        input_path = Path(input_f.name)
+
+    with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as output_f:
+        output_path = Path(output_f.name)
+
+    try:
+        sort_file(
+            input_path, output_path, keys=[key(None, "str")], reverse=True, mode="mmap"
+        )
+
+        assert output_path.read_text() == "cherry\nbanana\napple\n"
+
+    finally:
+        input_path.unlink()
+        output_path.unlink()
+
+
+def test_sort_jsonl_file_external():
+    """Test external sorting with descending keys and reverse order."""
+    rows = [{"group": "ab"[i % 2], "value": (i * 7) % 10} for i in range(40)]
+
+    with tempfile.NamedTemporaryFile(
+        mode="w", suffix=".jsonl", delete=False
+    ) as input_f:
+        for row in rows:
+            input_f.write(json.dumps(row) + "\n")
+        input_path = Path(input_f.name)
+
+    with tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False) as output_f:
+        output_path = Path(output_f.name)
+
+    try:
+        keys = [key("group", "str", desc=True), key("value", "num")]
+        stats = sort_file(input_path, output_path, keys, memory_limit="200", stats=True)
+
+        with parse_file(output_path) as reader:
+            sorted_data = list(reader)
+
+        expected = sorted(rows, key=lambda r: r["value"])
+        expected = sorted(expected, key=lambda r: r["group"], reverse=True)
+        assert sorted_data == expected
+        assert stats.external_sort_used
+
+        # reverse=True flips every key
+        sort_file(input_path, output_path, keys, memory_limit="200", reverse=True)
+        with parse_file(output_path) as reader:
+            assert list(reader) == sorted(rows, key=lambda r: (r["group"], -r["value"]))
+
+    finally:
+        input_path.unlink()
+        output_path.unlink()
+
+
+def test_sort_jsonl_file_external_unique():
+    """Test that external --unique keeps the first record seen per value."""
+    rows = [{"id": i, "user": f"u{(i * 7) % 13}", "score": i % 5} for i in range(60)]
+
+    with tempfile.NamedTemporaryFile(
+        mode="w", suffix=".jsonl", delete=False
+    ) as input_f:
+        for row in rows:
+            input_f.write(json.dumps(row) + "\n")
+        input_path = Path(input_f.name)
+
+    with tempfile.NamedTemporaryFile(suffix=".jsonl", delete=False) as output_f:
+        output_path = Path(output_f.name)
+
+    try:
+        first_seen = {}
+        for row in rows:
+            first_seen.setdefault(row["user"], row)
+
+        # Unique column as first sort key: duplicates dropped while merging
+        keys = [key("user", "str"), key("score", "num", desc=True)]
+        sort_file(input_path, output_path, keys, memory_limit="200", unique="user")
+        with parse_file(output_path) as reader:
+            assert list(reader) == sorted(first_seen.values(), key=lambda r: r["user"])
+
+        # Any other unique column: deduplicated through hash partitions
+        keys = [key("score", "num")]
+        sort_file(input_path, output_path, keys, memory_limit="200", unique="user")
+        with parse_file(output_path) as reader:
+            assert list(reader) == sorted(first_seen.values(), key=lambda r: r["score"])
+
+    finally:
+        input_path.unlink()
+        output_path.unlink()
+
+
+def test_sort_file_external_unique_splits_large_partitions(monkeypatch):
+    """Test that partitions over the chunk size are hash-partitioned again."""
+    import sortdx.core
+
+    rows = [{"id": i, "user": f"u{(i * 7919) % 1500}"} for i in range(3000)]
+    salts = []
+    partition_records = sortdx.core._partition_records
+
+    def spy(*args, **kwargs):
+        salts.append(kwargs.get("salt", 0))
+        return partition_records(*args, **kwargs)
+
+    monkeypatch.setattr(sortdx.core, "UNIQUE_MAX_PARTITIONS", 2)
+    monkeypatch.setattr(sortdx.core, "_partition_records", spy)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        stats = sort_file(
+            input_path,
+            output_path,
+            [key("id", "num", desc=True)],
+            mode="external",
+            memory_limit="20K",
+            unique="user",
+            stats=True,
+        )
+        with parse_file(output_path) as reader:
+            output = list(reader)
+
+    first_seen = {}
+    for row in rows:
+        first_seen.setdefault(row["user"], row)
+    assert output == sorted(first_seen.values(), key=lambda row: -row["id"])
+    assert stats.lines_processed == 3000
+    assert max(salts) > 0
+
+
+def test_sort_csv_file_external_keeps_header():
+    """Test that external sorts write proper CSV with the input header."""
+    csv_content = 'name,age,note\nCharlie,35,"x, y"\nAlice,25,\nBob,30,z\n'
+
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as input_f:
+        input_f.write(csv_content)
+        input_path = Path(input_f.name)
+
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as output_f:
+        output_path = Path(output_f.name)
+
+    try:
+        sort_file(input_path, output_path, [key("age", "num")], memory_limit="20")
+
+        assert output_path.read_text() == (
+            'name,age,note\nAlice,25,\nBob,30,z\nCharlie,35,"x, y"\n'
+        )
+
+    finally:
+        input_path.unlink()
+        output_path.unlink()
+
+
+def test_sort_file_external_gzip_output():
+    """Test that external sorts honour a compressed output suffix."""
+    rows = [{"value": (i * 7) % 10} for i in range(20)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl.gz"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        sort_file(input_path, output_path, [key("value", "num")], memory_limit="100")
+
+        with gzip.open(output_path, "rt") as f:
+            assert [json.loads(line) for line in f] == sorted(
+                rows, key=lambda r: r["value"]
+            )
+
+
+def test_sort_jsonl_file_external_parallel():
+    """Test parallel run generation over byte ranges."""
+    rows = [{"id": i, "value": (i * 7) % 10} for i in range(200)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        stats = sort_file(
+            input_path,
+            output_path,
+            [key("value", "num")],
+            memory_limit="1K",
+            workers=2,
+            stats=True,
+        )
+
+        with parse_file(output_path) as reader:
+            assert list(reader) == sorted(rows, key=lambda r: r["value"])
+
+        # Worker phase timings are collected too
+        assert stats.lines_processed == 200
+        assert stats.phases["parse"].records == 200
+        assert stats.phases["spill"].records == 200
+
+
+def test_sort_file_external_phase_stats():
+    """Test per-phase statistics of an external sort."""
+    rows = [{"id": i, "value": (i * 7) % 10} for i in range(300)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        stats = sort_file(
+            input_path,
+            output_path,
+            [key("value", "num")],
+            memory_limit="1K",
+            unique="id",
+            stats=True,
+        )
+
+        assert stats.lines_processed == 300
+        assert stats.runs > 1
+        # A 1K budget merges runs with the smallest fan-in
+        assert stats.plan["fan_in"] < stats.runs
+        assert stats.merge_passes == _merge_passes(stats.runs, stats.plan["fan_in"])
+        assert stats.merge_passes >= 2
+        assert stats.temp_bytes > 0
+        phases = ["probe", "partition", "parse", "keys", "sort", "spill", "merge"]
+        assert list(stats.phases) == phases
+        merge = stats.phases["merge"]
+        assert merge.records == 300
+        assert merge.bytes_in == stats.temp_bytes
+        assert merge.bytes_out == stats.output_size
+        total = sum(phase.wall_time for phase in stats.phases.values())
+        assert total <= stats.processing_time
+
+        data = json.loads(json.dumps(stats.to_dict()))
+        assert data["phases"]["spill"]["records"] == 300
+
+
+def test_update_file_merges_delta():
+    """Test merging new records into a sorted, indexed file."""
+    rows = [{"id": i, "value": (i * 7) % 50} for i in range(100)]
+    delta = [{"id": 100 + i, "value": (i * 3) % 60} for i in range(40)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        delta_path = Path(temp_dir) / "delta.jsonl"
+        sorted_path = Path(temp_dir) / "sorted.jsonl.gz"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        delta_path.write_text("".join(json.dumps(row) + "\n" for row in delta))
+
+        keys = [key("value", "num")]
+        sort_file(input_path, sorted_path, keys, index=True)
+        update_file(sorted_path, delta_path, keys, memory_limit="200")
+
+        with parse_file(sorted_path) as reader:
+            assert list(reader) == sorted(rows + delta, key=lambda r: r["value"])
+        assert list(query(sorted_path, 55)) == sorted(
+            [row for row in delta if row["value"] >= 55], key=lambda r: r["value"]
+        )
+
+
+def test_update_file_rejects_unsorted():
+    """Test that updating a file not sorted by the keys fails."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sorted_path = Path(temp_dir) / "sorted.jsonl"
+        delta_path = Path(temp_dir) / "delta.jsonl"
+        sorted_path.write_text('{"v": 2}\n{"v": 1}\n')
+        delta_path.write_text('{"v": 3}\n')
+
+        with pytest.raises(ValueError):
+            update_file(sorted_path, delta_path, [key("v", "num")])
+        assert sorted_path.read_text() == '{"v": 2}\n{"v": 1}\n'
+
+
+def test_merge_files_mixed_compression():
+    """Test merging sorted inputs in passes, across compressions and formats."""
+    shards = [[{"ts": t, "host": h} for t in range(h, 60, 5)] for h in range(5)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = []
+        for h, rows in enumerate(shards):
+            lines = "".join(json.dumps(row) + "\n" for row in rows)
+            if h % 2:
+                path = Path(temp_dir) / f"host{h}.jsonl.gz"
+                path.write_bytes(gzip.compress(lines.encode()))
+            else:
+                path = Path(temp_dir) / f"host{h}.jsonl"
+                path.write_text(lines)
+            paths.append(path)
+        output_path = Path(temp_dir) / "merged.jsonl"
+
+        expected = sorted(sum(shards, []), key=lambda r: r["ts"])
+        for fan_in in (2, 256):
+            merge_files(paths, output_path, [key("ts", "num")], fan_in=fan_in)
+            with parse_file(output_path) as reader:
+                assert list(reader) == expected
+
+        paths[0].write_text('{"ts": 2}\n{"ts": 1}\n')
+        with pytest.raises(ValueError):
+            merge_files(paths, output_path, [key("ts", "num")])
+
+
+def test_sort_file_glob_shards():
+    """Test sorting CSV shards given as a glob, with differing headers."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for i in range(3):
+            header = "id,name" if i < 2 else "id,name,extra"
+            rows = "".join(
+                f"{j * 3 + i},n{j}" + (",x" if i == 2 else "") + "\n" for j in range(10)
+            )
+            path = Path(temp_dir) / f"part-{i}.csv.gz"
+            path.write_bytes(gzip.compress(f"{header}\n{rows}".encode()))
+        pattern = str(Path(temp_dir) / "part-*.csv.gz")
+
+        for options in (
+            {},
+            {"memory_limit": "100"},
+            {"memory_limit": "100", "workers": 2},
+        ):
+            output_path = Path(temp_dir) / "sorted.csv"
+            sort_file(pattern, output_path, [key("id", "num")], **options)
+
+            with parse_file(output_path) as reader:
+                assert reader.fieldnames == ["id", "name", "extra"]
+                rows = list(reader)
+            assert [int(row["id"]) for row in rows] == list(range(30))
+            assert rows[2]["extra"] == "x" and rows[0]["extra"] == ""
+
+
+def test_sort_file_multiple_inputs_unique():
+    """Test that --unique keeps the first record across input files."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = Path(temp_dir) / "a.jsonl"
+        second = Path(temp_dir) / "b.jsonl"
+        first.write_text('{"id": 1, "src": "a"}\n{"id": 2, "src": "a"}\n')
+        second.write_text('{"id": 2, "src": "b"}\n{"id": 0, "src": "b"}\n')
+        output_path = Path(temp_dir) / "sorted.jsonl"
+
+        sort_file(
+            [first, second],
+            output_path,
+            [key("id", "num")],
+            unique="id",
+            memory_limit="10",
+            workers=2,
+        )
+
+        with parse_file(output_path) as reader:
+            assert [row["src"] for row in reader] == ["b", "a", "a"]
+
+
+def test_sort_file_partitions():
+    """Test range and hash partitioned outputs and their manifest."""
+    rows = [{"id": i, "user": f"u{i % 7}", "ts": (i * 37) % 100} for i in range(200)]
+    expected = sorted(rows, key=lambda r: r["ts"])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl.gz"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        for options in ({}, {"memory_limit": "500"}):
+            sort_file(
+                input_path, output_path, [key("ts", "num")], partitions=4, **options
+            )
+
+            manifest = json.loads(
+                (Path(temp_dir) / "sorted.jsonl.gz.manifest.json").read_text()
+            )
+            shards = []
+            for i, entry in enumerate(manifest["partitions"]):
+                assert entry["path"] == f"sorted-{i:05d}.jsonl.gz"
+                with parse_file(Path(temp_dir) / entry["path"]) as reader:
+                    shards.append(list(reader))
+                assert entry["records"] == len(shards[-1]) == 50
+                assert (entry["first"], entry["last"]) == (
+                    shards[-1][0]["ts"],
+                    shards[-1][-1]["ts"],
+                )
+            assert sum(shards, []) == expected
+
+        sort_file(
+            input_path,
+            output_path,
+            [key("ts", "num")],
+            partitions=3,
+            partition_by="hash:user",
+        )
+        users = []
+        for i in range(3):
+            with parse_file(Path(temp_dir) / f"sorted-{i:05d}.jsonl.gz") as reader:
+                shard = list(reader)
+            assert shard == sorted(shard, key=lambda r: r["ts"])
+            users.append({row["user"] for row in shard})
+        assert sum(len(u) for u in users) == len(set().union(*users)) == 7
+
+
+def test_sort_file_partitions_unique():
+    """Test that range partitions are cut by the records left after unique."""
+    rows = [{"id": i, "ts": i // 5} for i in range(400)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        for options in ({}, {"memory_limit": "2K"}):
+            sort_file(
+                input_path,
+                output_path,
+                [key("ts", "num")],
+                unique="ts",
+                partitions=4,
+                **options,
+            )
+
+            manifest = json.loads(
+                (Path(temp_dir) / "sorted.jsonl.manifest.json").read_text()
+            )
+            counts = [entry["records"] for entry in manifest["partitions"]]
+            assert counts == [20, 20, 20, 20]
+
+
+def test_sort_file_partitions_unique_keep_keys_together():
+    """Test that external unique range cuts fall between sort keys."""
+    rows = [{"id": i, "k": (i * 7) % 30} for i in range(300)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        manifest_path = Path(temp_dir) / "sorted.jsonl.manifest.json"
+        input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        manifests = []
+        for mode in ("memory", "external"):
+            sort_file(
+                input_path,
+                output_path,
+                [key("k", "num")],
+                unique="id",
+                partitions=3,
+                partition_by="range",
+                mode=mode,
+                memory_limit="2K",
+            )
+            manifests.append(json.loads(manifest_path.read_text()))
+            shards = []
+            for i in range(3):
+                with parse_file(Path(temp_dir) / f"sorted-{i:05d}.jsonl") as reader:
+                    shards.append({row["k"] for row in reader})
+            assert sum(map(len, shards)) == len(set().union(*shards)) == 30
+
+        assert manifests[0]["partitions"] == manifests[1]["partitions"]
@@ -0,0 +1,34 @@
+"""
+Test key conversion cost reports.
+"""
+
+import tempfile
+from pathlib import Path
+
+from sortdx import key
+from sortdx.keybench import bench_keys
+
+
+def test_bench_keys():
+    """Test failure, empty and distinct counts of sampled keys."""
+    lines = ["price,city"] + [f"{i % 10},city{i % 3}" for i in range(300)]
+    lines[5] = "n/a,city0"
+    lines[6] = ",city1"
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.csv"
+        input_path.write_text("\n".join(lines) + "\n")
+
+        report = bench_keys(
+            input_path, [key("price", "num"), key("city", "str")], sample_size=200
+        )
+
+    assert report.records == 200
+    price, city = report.keys
+    assert (price.failures, price.empty) == (1, 1)
+    assert price.distinct == 12
+    assert city.failures == city.empty == 0
+    assert city.distinct == 3
+    assert city.dictionary is False
+    assert price.encode_ns > 0
+    assert report.engine in ("bytes", "numpy", "radix")
@@ -2,17 +2,27 @@
 Test file parsing functionality - simplified version.
 """
 
+import gzip
 import tempfile
 from pathlib import Path
 
+import pytest
+
 from sortdx.parsers import (
     CSVReader,
     JSONLReader,
+    MappedLineReader,
+    RunWriter,
     TextReader,
     detect_csv_delimiter,
     detect_format,
+    open_output,
     parse_file,
+    probe_input,
+    read_run,
+    supports_line_index,
     write_file,
+    write_run,
 )
 
 
@@ -141,6 +151,24 @@ def test_write_file_csv():
         output_file.unlink()
 
 
+def test_write_file_csv_streaming_schema():
+    """Test streaming CSV output with a header schema from the reader."""
+    rows = ({"name": name, "note": "a, b"} for name in ("Alice", "Bob"))
+
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+        output_file = Path(f.name)
+
+    try:
+        write_file(output_file, rows, fieldnames=["note", "name"])
+        assert output_file.read_text() == 'note,name\n"a, b",Alice\n"a, b",Bob\n'
+
+        # The header is written even when there are no rows
+        write_file(output_file, iter([]), fieldnames=["name"])
+        assert output_file.read_text() == "name\n"
+    finally:
+        output_file.unlink()
+
+
 def test_detect_csv_delimiter():
     """Test CSV delimiter detection."""
     # Create temp files with different delimiters
@@ -168,3 +196,130 @@ def test_detect_csv_delimiter():
         comma_file.unlink()
         tab_file.unlink()
         semicolon_file.unlink()
+
+
+def test_mapped_line_reader():
+    """Test byte spans reported by MappedLineReader."""
+    with tempfile.NamedTemporaryFile(mode="wb", suffix=".txt", delete=False) as f:
+        f.write(b"first\r\nsecond\n\nlast")
+        text_file = Path(f.name)
+
+    try:
+        with MappedLineReader(text_file) as lines:
+            spans = list(lines.iter_spans())
+            assert [record for _, _, record in spans] == ["first", "second", "", "last"]
+            assert [lines.slice(start, end) for start, end, _ in spans] == [
+                b"first",
+                b"second",
+                b"",
+                b"last",
+            ]
+    finally:
+        text_file.unlink()
+
+
+def test_supports_line_index():
+    """Test which files can be sorted through an offset index."""
+    assert supports_line_index("data.jsonl")
+    assert supports_line_index("data.txt")
+    assert not supports_line_index("data.csv")
+    assert not supports_line_index("data.jsonl.gz")
+
+
+def test_run_roundtrip():
+    """Test writing and reading back a sorted run."""
+    records = [(b"\x01", {"name": "Alice"}), (b"\x02\x00", ["Bob", 30]), (b"", "x")]
+
+    with tempfile.NamedTemporaryFile(suffix=".run", delete=False) as f:
+        run_file = Path(f.name)
+
+    try:
+        assert write_run(run_file, records) == 3
+        assert list(read_run(run_file)) == records
+    finally:
+        run_file.unlink()
+
+
+def test_run_writer_appends_frames():
+    """Test writing a run incrementally."""
+    with tempfile.NamedTemporaryFile(suffix=".run", delete=False) as f:
+        run_file = Path(f.name)
+
+    try:
+        with RunWriter(run_file) as writer:
+            writer.write(b"\x02", "b")
+            writer.write(b"\x01", "a")
+        assert writer.count == 2
+        assert list(read_run(run_file)) == [(b"\x02", "b"), (b"\x01", "a")]
+    finally:
+        run_file.unlink()
+
+
+def test_probe_input_compressed_csv():
+    """Test probing a compressed CSV from a single sample."""
+    with tempfile.NamedTemporaryFile(suffix=".csv.gz", delete=False) as f:
+        f.write(gzip.compress(b"name;age\nBob;30\nAlice;25\n"))
+        file_path = Path(f.name)
+
+    try:
+        probe = probe_input(file_path)
+        try:
+            assert probe.file_format == "csv"
+            assert probe.delimiter == ";"
+            # The probed stream still starts at the beginning of the data
+            assert probe.open_text().readline() == "name;age\n"
+        finally:
+            probe.stream.close()
+
+        with parse_file(file_path) as reader:
+            assert list(reader) == [
+                {"name": "Bob", "age": "30"},
+                {"name": "Alice", "age": "25"},
+            ]
+    finally:
+        file_path.unlink()
+
+
+def test_parse_file_overrides():
+    """Test encoding and delimiter overrides."""
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+        f.write("name|city\nZo\xe9|Orl\xe9ans\n".encode("latin-1"))
+        file_path = Path(f.name)
+
+    try:
+        with parse_file(file_path, encoding="latin-1", delimiter="|") as reader:
+            assert list(reader) == [{"name": "Zoé", "city": "Orléans"}]
+    finally:
+        file_path.unlink()
+
+
+def test_open_output_compression():
+    """Test that output is compressed by suffix at the requested level."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_file = Path(temp_dir) / "out.txt.gz"
+        data = b"line\n" * 10000
+
+        with open_output(output_file, compress_level=1) as f:
+            f.write(data)
+        assert gzip.decompress(output_file.read_bytes()) == data
+
+        with pytest.raises(ValueError):
+            open_output(output_file, compress_level=12)
+
+
+def test_mapped_line_reader_split_ranges():
+    """Test that byte ranges start on lines and cover every record once."""
+    with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
+        f.write(b"alpha\nbeta\r\n\ngamma\ndelta")
+        file_path = Path(f.name)
+
+    try:
+        with MappedLineReader(file_path) as reader:
+            records = list(reader.iter_spans())
+            for parts in (1, 2, 3, 10):
+                ranges = reader.split_ranges(parts)
+                assert len(ranges) <= parts
+                split = [r for span in ranges for r in reader.iter_spans(*span)]
+                assert split == records
+    finally:
+        file_path.unlink()
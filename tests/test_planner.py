@@ -0,0 +1,76 @@
+"""
+Test the sort planner.
+"""
+
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+from sortdx import key, sort_file
+from sortdx.planner import plan_sort
+
+
+def _rows(count):
+    return "".join(
+        json.dumps({"id": i, "value": (i * 37) % 1000, "tag": f"t{i % 5}"}) + "\n"
+        for i in range(count)
+    )
+
+
+def test_plan_modes():
+    """Test that the mode follows the estimated memory of the records."""
+    text = _rows(5000)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        plain = Path(temp_dir) / "input.jsonl"
+        plain.write_text(text)
+        packed = Path(temp_dir) / "input.jsonl.gz"
+        with gzip.open(packed, "wt") as f:
+            f.write(text)
+        keys = [key("value", "num")]
+
+        plan = plan_sort(packed, keys, memory_limit="1G")
+        assert plan.mode == "memory"
+        assert plan.estimate.compressed
+        assert abs(plan.estimate.decoded_size - len(text)) < len(text) * 0.01
+        assert abs(plan.estimate.records - 5000) < 50
+        assert plan.estimate.cardinality == [1000]
+
+        # Records do not fit, but offsets and keys of a plain file do
+        plan = plan_sort(plain, keys, memory_limit="1M")
+        assert plan.mode == "mmap"
+
+        plan = plan_sort(packed, keys, memory_limit="1M")
+        assert plan.mode == "external"
+        assert plan.workers == 1
+        assert 0 < plan.chunk_size < 1024 * 1024
+        assert any("budget" in reason for reason in plan.reasons)
+
+        # Requested settings are kept
+        plan = plan_sort(plain, keys, memory_limit="1M", mode="external", workers=3)
+        assert (plan.mode, plan.workers) == ("external", 3)
+
+
+def test_sort_file_reports_plan():
+    """Test that sort_file follows its plan and reports it."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.csv"
+        input_path.write_text(_rows(2000))
+
+        stats = sort_file(
+            input_path,
+            output_path,
+            [key("value", "num")],
+            memory_limit="64K",
+            stats=True,
+        )
+
+        # mmap cannot change the format, so the sort is external
+        assert stats.mode == stats.plan["mode"] == "external"
+        assert stats.runs > 1
+        assert stats.plan["estimate"]["sampled"] == 2000
+        lines = output_path.read_text().splitlines()
+        values = [int(line.split(",")[1]) for line in lines[1:]]
+        assert values == sorted(values)
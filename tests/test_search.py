@@ -0,0 +1,89 @@
+"""
+Test range queries over indexed sorted outputs.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from sortdx import key, query, sort_file
+
+
+def _write_rows(path: Path, rows) -> None:
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+
+def test_query_jsonl_range():
+    """Test that a query returns exactly the rows within its bounds."""
+    rows = [{"id": i, "ts": (i * 37) % 500} for i in range(2000)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        _write_rows(input_path, rows)
+
+        sort_file(input_path, output_path, [key("ts", "num")], index=True)
+        sort_file(
+            input_path,
+            Path(temp_dir) / "small.jsonl",
+            [key("ts", "num")],
+            block_size=512,
+        )
+
+        expected = sorted(rows, key=lambda r: r["ts"])
+        for path in (output_path, Path(temp_dir) / "small.jsonl"):
+            result = list(query(path, 100, "120"))
+            assert result == [row for row in expected if 100 <= row["ts"] <= 120]
+            assert list(query(path)) == expected
+            assert list(query(path, 499)) == [r for r in expected if r["ts"] == 499]
+
+
+def test_query_csv_descending():
+    """Test queries over CSV outputs sorted in descending order."""
+    csv_content = "name,score\n" + "".join(f"n{i},{i % 50}\n" for i in range(300))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.csv"
+        output_path = Path(temp_dir) / "sorted.csv.gz"
+        input_path.write_text(csv_content)
+
+        sort_file(
+            input_path,
+            output_path,
+            [key("score", "num", desc=True)],
+            block_size=256,
+        )
+
+        result = list(query(output_path, 10, 12))
+        assert [row["score"] for row in result] == ["12"] * 6 + ["11"] * 6 + ["10"] * 6
+
+
+def test_query_descending_one_sided():
+    """Test that a single bound on a descending key keeps its meaning."""
+    rows = [{"id": i} for i in range(2000)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / "input.jsonl"
+        output_path = Path(temp_dir) / "sorted.jsonl"
+        _write_rows(input_path, rows)
+
+        sort_file(input_path, output_path, [key("id", "num", desc=True)], index=True)
+
+        assert [r["id"] for r in query(output_path, lo=1990)] == list(
+            range(1999, 1989, -1)
+        )
+        assert [r["id"] for r in query(output_path, hi=5)] == list(range(5, -1, -1))
+        assert [r["id"] for r in query(output_path, 3, 1)] == []
+        assert [r["id"] for r in query(output_path, 1, 3)] == [3, 2, 1]
+
+
+def test_query_requires_index():
+    """Test that querying a file without a key index fails clearly."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "plain.jsonl"
+        _write_rows(path, [{"a": 1}])
+
+        with pytest.raises(FileNotFoundError):
+            list(query(path, 0, 1))
@@ -2,9 +2,14 @@
 Test utility functions and classes.
 """
 
+from types import SimpleNamespace
+
 import pytest
 
+import sortdx.utils
 from sortdx.utils import (
+    PhaseTimer,
+    ProgressTracker,
     SortKey,
     SortStats,
     format_size,
@@ -69,6 +74,52 @@ def test_sort_stats():
     assert "2.50s" in stats_str  # Formatted time
 
 
+def test_phase_timer_nesting(monkeypatch):
+    """Test that nested phases are not counted in their outer phase."""
+    # Clock readings at: outer start, inner start, inner end, outer end
+    wall = iter([10.0, 11.0, 15.0, 16.5])
+    cpu = iter([1.0, 1.5, 3.5, 4.0])
+    clock = SimpleNamespace(perf_counter=wall.__next__, process_time=cpu.__next__)
+    monkeypatch.setattr(sortdx.utils, "time", clock)
+
+    timer = PhaseTimer()
+    with timer.phase("outer") as outer:
+        outer.records += 1
+        with timer.phase("inner"):
+            pass
+
+    assert timer.phases["outer"].records == 1
+    assert timer.phases["inner"].wall_time == 4.0
+    assert timer.phases["outer"].wall_time == 2.5
+    assert timer.phases["inner"].cpu_time == 2.0
+    assert timer.phases["outer"].cpu_time == 1.0
+
+    worker = PhaseTimer()
+    worker.add("inner", wall_time=1.0, records=5)
+    timer.update(worker)
+    assert timer.phases["inner"].records == 5
+    assert timer.phases["inner"].wall_time == 5.0
+
+
+def test_progress_tracker():
+    """Test progress lines with rate and ETA."""
+    lines = []
+    tracker = ProgressTracker(
+        1000, "Reading", unit="B", interval=0, output=lines.append
+    )
+    tracker._start -= 2
+    tracker.set_current(250)
+
+    assert lines[0].startswith(
+        'stage="Reading" current=250 total=1000 percent=25 unit="B" rate='
+    )
+    assert tracker.eta() == pytest.approx(6, rel=0.1)
+    assert " eta_s=6" in lines[0]
+
+    tracker.finish()
+    assert 'current=1000 total=1000 percent=100 unit="B"' in lines[-1]
+
+
 def test_parse_memory_size():
     """Test memory size parsing."""
     assert parse_memory_size("1024") == 1024